@@ -1,39 +1,40 @@
 import pandas as pd
-import json
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from jsonl_reader import iter_jsonl
+
 # --- Load the consensus JSONL file ---
 jsonl_path = Path('raw_data') / 'healthbench_consensus_data.jsonl'
 rows = []
-with open(jsonl_path, 'r') as f:
-    for line in f:
-        data = json.loads(line)
-        theme = None
-        physician_category = None
-        tags = data.get('example_tags', [])
-        for tag in tags:
-            if tag.startswith('theme:'):
-                theme = tag.split('theme:')[1]
-            if tag.startswith('physician_agreed_category:'):
-                physician_category = tag.split('physician_agreed_category:')[1]
-        rubrics = data.get('rubrics', [])
-        for rubric in rubrics:
-            criterion = rubric.get('criterion', '')
-            points = rubric.get('points', None)
-            # Extract axis from rubric tags
-            axis = None
-            rubric_tags = rubric.get('tags', [])
-            for rtag in rubric_tags:
-                if rtag.startswith('axis:'):
-                    axis = rtag.split('axis:')[1]
-                    break
-            rows.append({
-                'theme': theme,
-                'physician_category': physician_category,
-                'axis': axis,
-                'criterion': criterion,
-                'points': points
-            })
+for data in iter_jsonl(jsonl_path, fields=['example_tags', 'rubrics']):
+    theme = None
+    physician_category = None
+    tags = data.get('example_tags', [])
+    for tag in tags:
+        if tag.startswith('theme:'):
+            theme = tag.split('theme:')[1]
+        if tag.startswith('physician_agreed_category:'):
+            physician_category = tag.split('physician_agreed_category:')[1]
+    rubrics = data.get('rubrics', [])
+    for rubric in rubrics:
+        criterion = rubric.get('criterion', '')
+        points = rubric.get('points', None)
+        # Extract axis from rubric tags
+        axis = None
+        rubric_tags = rubric.get('tags', [])
+        for rtag in rubric_tags:
+            if rtag.startswith('axis:'):
+                axis = rtag.split('axis:')[1]
+                break
+        rows.append({
+            'theme': theme,
+            'physician_category': physician_category,
+            'axis': axis,
+            'criterion': criterion,
+            'points': points
+        })
 df = pd.DataFrame(rows)
 print('Sample of extracted DataFrame:')
 print(df.head())
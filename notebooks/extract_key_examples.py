@@ -1,9 +1,12 @@
 import pandas as pd
-import json
+import sys
 from pathlib import Path
 import argparse
 from datetime import datetime
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from jsonl_reader import read_columns_parallel, tag_value
+
 def generate_analysis_markdown(df, dataset_type, dataset_path, output_name):
     """Generate markdown analysis of the dataset and save to file."""
     timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
@@ -153,69 +156,29 @@ Generated on: {timestamp}
         f.write(markdown_template)
     print(f"Comparative analysis saved to {output_name}")
 
+def rubric_points(data):
+    """Numeric rubric points of one example."""
+    return [r.get('points') for r in data.get('rubrics', []) if isinstance(r.get('points'), (int, float))]
+
+# Only the columns the reports use are kept; shards are parsed in parallel into these typed columns
+ANALYSIS_COLUMNS = {
+    'example_id': (lambda data: data.get('example_id', ''), None),
+    'theme': (lambda data: tag_value(data.get('example_tags', []), 'theme:'), None),
+    'physician_category': (lambda data: tag_value(data.get('example_tags', []), 'physician_agreed_category:'), None),
+    'max_points': (lambda data: sum(p for p in rubric_points(data) if p >= 0), 'q'),
+    'max_penalty': (lambda data: sum(p for p in rubric_points(data) if p < 0), 'q'),
+    'rubric_count': (lambda data: len(data.get('rubrics', [])), 'q'),
+    'positive_rubric_count': (lambda data: sum(1 for p in rubric_points(data) if p >= 0), 'q'),
+    'negative_rubric_count': (lambda data: sum(1 for p in rubric_points(data) if p < 0), 'q'),
+}
+
 def main():
     # Process individual datasets
     dfs = []
     dataset_types = ['default', 'consensus', 'hard']
     for dataset_type in dataset_types:
         jsonl_path = Path('raw_data') / f'healthbench_{dataset_type}_data.jsonl'
-        rows = []
-        with open(jsonl_path, 'r') as f:
-            for line in f:
-                data = json.loads(line)
-                # Extract basic metadata
-                theme = None
-                physician_category = None
-                tags = data.get('example_tags', [])
-                for tag in tags:
-                    if tag.startswith('theme:'):
-                        theme = tag.split('theme:')[1]
-                    if tag.startswith('physician_agreed_category:'):
-                        physician_category = tag.split('physician_agreed_category:')[1]
-                # Extract example content and prompt
-                example = data.get('example', '')
-                example_id = data.get('example_id', '')
-                # Format prompt conversation
-                prompt_data = data.get('prompt', [])
-                formatted_prompt = []
-                for msg in prompt_data:
-                    role = msg.get('role', '')
-                    content = msg.get('content', '')
-                    formatted_prompt.append(f"{role.upper()}: {content}")
-                prompt = "\n".join(formatted_prompt)
-                # Extract rubrics and points
-                rubrics = data.get('rubrics', [])
-                rubric_texts = []
-                rubric_points = []
-                for rubric in rubrics:
-                    criterion = rubric.get('criterion', '')
-                    points = rubric.get('points', None)
-                    rubric_texts.append(criterion)
-                    rubric_points.append(points)
-                # Combine rubrics and points into a single string
-                rubrics_with_points = ' | '.join([f"{text} ({points})" for text, points in zip(rubric_texts, rubric_points)])
-                # Calculate new columns
-                points_list = [p for p in rubric_points if isinstance(p, (int, float))]
-                max_points = sum(p for p in points_list if p is not None and p >= 0)
-                max_penalty = sum(p for p in points_list if p is not None and p < 0)
-                rubric_count = len(rubric_points)
-                positive_rubric_count = sum(1 for p in points_list if p is not None and p >= 0)
-                negative_rubric_count = sum(1 for p in points_list if p is not None and p < 0)
-                rows.append({
-                    'example_id': example_id,
-                    'theme': theme,
-                    'physician_category': physician_category,
-                    'example': example,
-                    'prompt': prompt,
-                    'rubrics_with_points': rubrics_with_points,
-                    'all_tags': ', '.join(tags),
-                    'max_points': max_points,
-                    'max_penalty': max_penalty,
-                    'rubric_count': rubric_count,
-                    'positive_rubric_count': positive_rubric_count,
-                    'negative_rubric_count': negative_rubric_count
-                })
-        df = pd.DataFrame(rows)
+        df = pd.DataFrame(read_columns_parallel(jsonl_path, ANALYSIS_COLUMNS))
         dfs.append(df)
         generate_analysis_markdown(df, dataset_type, jsonl_path, f'computed_basic_analysis_{dataset_type}.md')
     
@@ -0,0 +1,55 @@
+"""
+Cluster the rubric criteria of all datasets into a topic taxonomy.
+
+Usage:
+    python scripts/analysis/build_criterion_taxonomy.py [--n-clusters 40] [--force]
+
+Reads the criteria of each dataset's example store (built by download_and_process.py),
+fits TF-IDF + mini-batch k-means and caches the model and assignments in
+outputs/criterion_taxonomy/, where the Criterion Taxonomy page reads them. The fit is
+skipped when the cache already covers the same criteria and parameters.
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'src'))
+from criterion_taxonomy import DEFAULT_BATCH_SIZE, DEFAULT_CLUSTERS, build_taxonomy, collect_criterion_usage, load_taxonomy, taxonomy_dir_for
+
+DATASETS = ['default', 'hard', 'consensus']
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent.parent.parent
+    parser = argparse.ArgumentParser(description='Build the rubric criterion taxonomy')
+    parser.add_argument('--n-clusters', type=int, default=DEFAULT_CLUSTERS)
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE, help='Rows per partial_fit (raised to --n-clusters if smaller)')
+    parser.add_argument('--random-state', type=int, default=0)
+    parser.add_argument('--force', action='store_true', help='Refit even if the cache is up to date')
+    args = parser.parse_args()
+
+    usage = collect_criterion_usage(base_dir / 'processed_data', DATASETS)
+    if usage.empty:
+        print('No example stores found. Run scripts/download_and_process.py first.')
+        return
+    print(f"{usage['criterion_id'].nunique()} distinct criteria in {usage['dataset'].nunique()} datasets")
+
+    out_dir = taxonomy_dir_for(base_dir)
+    start = time.perf_counter()
+    fitted = build_taxonomy(usage, out_dir, args.n_clusters, args.batch_size, args.random_state, force=args.force)
+    if not fitted:
+        print(f'Taxonomy in {out_dir} is up to date (use --force to refit)')
+        return
+    print(f'Fitted in {time.perf_counter() - start:.1f}s')
+
+    _, clusters = load_taxonomy(out_dir)
+    print('\nClusters:')
+    for cluster in sorted(clusters, key=lambda c: c['n_criteria'], reverse=True):
+        print(f"  {cluster['cluster']:>3} [{cluster['n_criteria']}] {cluster['label']}")
+    print(f'\nSaved taxonomy to {out_dir}')
+
+
+if __name__ == '__main__':
+    main()
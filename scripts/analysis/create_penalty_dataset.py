@@ -1,80 +1,72 @@
 import pandas as pd
-import json
+import array
+import sys
 from pathlib import Path
 
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'src'))
+from jsonl_reader import imap_shards, iter_shard_records, tag_value
+
+PENALTY_COLUMNS = [
+    'example_id', 'theme', 'physician_category', 'example', 'prompt',
+    'negative_rubrics_with_points', 'all_tags', 'total_penalty', 'penalty_count',
+    'negative_rubrics', 'negative_points',
+]
+
+def penalty_row(data):
+    """Build the penalty-only row for one example, or None if it has no negative rubrics."""
+    # Extract rubrics and points, but only keep negative ones
+    negative_rubrics = []
+    negative_points = []
+    for rubric in data.get('rubrics', []):
+        points = rubric.get('points', None)
+        if points is not None and points < 0:  # Only keep negative points
+            negative_rubrics.append(rubric.get('criterion', ''))
+            negative_points.append(points)
+    if not negative_rubrics:
+        return None
+    
+    # Format prompt conversation
+    prompt = "\n".join(f"{msg.get('role', '').upper()}: {msg.get('content', '')}" for msg in data.get('prompt', []))
+    tags = data.get('example_tags', [])
+    return {
+        'example_id': data.get('example_id', ''),
+        'theme': tag_value(tags, 'theme:'),
+        'physician_category': tag_value(tags, 'physician_agreed_category:'),
+        'example': data.get('example', ''),
+        'prompt': prompt,
+        # Combine rubrics and points into a single string
+        'negative_rubrics_with_points': ' | '.join([f"{text} ({points})" for text, points in zip(negative_rubrics, negative_points)]),
+        'all_tags': ', '.join(tags),
+        'total_penalty': sum(negative_points),
+        'penalty_count': len(negative_points),
+        'negative_rubrics': negative_rubrics,
+        'negative_points': negative_points
+    }
+
+def penalty_shard(jsonl_path, start, end):
+    """Penalty rows for one byte range of the JSONL file, as columns."""
+    rows = [row for row in (penalty_row(data) for data in iter_shard_records(jsonl_path, start, end)) if row is not None]
+    return {column: [row[column] for row in rows] for column in PENALTY_COLUMNS}
+
 def create_penalty_dataset():
     """Create a dataset containing only penalty rubrics from the default dataset."""
-    # Read the default dataset
+    # Parse the default dataset in parallel shards and append penalty rows to the CSV in file order
     jsonl_path = Path('raw_data') / 'healthbench_default_data.jsonl'
-    rows = []
-    
-    with open(jsonl_path, 'r') as f:
-        for line in f:
-            data = json.loads(line)
-            
-            # Extract basic metadata
-            theme = None
-            physician_category = None
-            tags = data.get('example_tags', [])
-            for tag in tags:
-                if tag.startswith('theme:'):
-                    theme = tag.split('theme:')[1]
-                if tag.startswith('physician_agreed_category:'):
-                    physician_category = tag.split('physician_agreed_category:')[1]
-            
-            # Extract example content and prompt
-            example = data.get('example', '')
-            example_id = data.get('example_id', '')
-            
-            # Format prompt conversation
-            prompt_data = data.get('prompt', [])
-            formatted_prompt = []
-            for msg in prompt_data:
-                role = msg.get('role', '')
-                content = msg.get('content', '')
-                formatted_prompt.append(f"{role.upper()}: {content}")
-            prompt = "\n".join(formatted_prompt)
-            
-            # Extract rubrics and points, but only keep negative ones
-            rubrics = data.get('rubrics', [])
-            negative_rubrics = []
-            negative_points = []
-            
-            for rubric in rubrics:
-                criterion = rubric.get('criterion', '')
-                points = rubric.get('points', None)
-                if points is not None and points < 0:  # Only keep negative points
-                    negative_rubrics.append(criterion)
-                    negative_points.append(points)
-            
-            # Only add to dataset if there are negative rubrics
-            if negative_rubrics:
-                # Combine rubrics and points into a single string
-                rubrics_with_points = ' | '.join([f"{text} ({points})" for text, points in zip(negative_rubrics, negative_points)])
-                
-                # Calculate penalty metrics
-                total_penalty = sum(negative_points)
-                penalty_count = len(negative_points)
-                
-                rows.append({
-                    'example_id': example_id,
-                    'theme': theme,
-                    'physician_category': physician_category,
-                    'example': example,
-                    'prompt': prompt,
-                    'negative_rubrics_with_points': rubrics_with_points,
-                    'all_tags': ', '.join(tags),
-                    'total_penalty': total_penalty,
-                    'penalty_count': penalty_count,
-                    'negative_rubrics': negative_rubrics,
-                    'negative_points': negative_points
-                })
-    
-    # Create DataFrame and save to CSV
-    df = pd.DataFrame(rows)
     output_path = Path('outputs/analysis') / 'penalty_only_dataset.csv'
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, index=False)
+    total_penalties = array.array('q')
+    penalty_counts = array.array('q')
+    
+    for columns in imap_shards(jsonl_path, penalty_shard):
+        if not columns['example_id']:
+            continue
+        first_chunk = len(penalty_counts) == 0
+        pd.DataFrame(columns, columns=PENALTY_COLUMNS).to_csv(output_path, mode='w' if first_chunk else 'a', header=first_chunk, index=False)
+        total_penalties.extend(columns['total_penalty'])
+        penalty_counts.extend(columns['penalty_count'])
+    if len(penalty_counts) == 0:
+        pd.DataFrame(columns=PENALTY_COLUMNS).to_csv(output_path, index=False)
+    df = pd.DataFrame({'total_penalty': total_penalties, 'penalty_count': penalty_counts})
     
     # Print summary statistics
     print(f"\nPenalty Dataset Summary:")
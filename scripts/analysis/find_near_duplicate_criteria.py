@@ -0,0 +1,83 @@
+"""
+Find near-duplicate (paraphrased) rubric criteria across the default, hard and consensus datasets.
+
+Usage:
+    python scripts/analysis/find_near_duplicate_criteria.py [--threshold 0.6] [--rebuild]
+
+Reads the criterion catalog of each dataset's example store (built by
+download_and_process.py), adds criteria not seen before to the MinHash index in
+outputs/criterion_clusters/, clusters the index and writes one CSV row per
+clustered criterion to outputs/analysis/near_duplicate_criteria.csv.
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'src'))
+from criterion_clusters import DEFAULT_THRESHOLD, CriterionClusterIndex, index_dir_for
+from data_versions import version_store_dir
+from example_store import ExampleStore, store_path
+
+DATASETS = ['default', 'hard', 'consensus']
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent.parent.parent
+    parser = argparse.ArgumentParser(description='Cluster near-duplicate rubric criteria')
+    parser.add_argument('--threshold', type=float, default=DEFAULT_THRESHOLD, help='Minimum estimated Jaccard similarity of character 5-grams')
+    parser.add_argument('--rebuild', action='store_true', help='Discard the existing index and re-hash every criterion')
+    parser.add_argument('--output', type=Path, default=base_dir / 'outputs' / 'analysis' / 'near_duplicate_criteria.csv')
+    args = parser.parse_args()
+
+    index_dir = index_dir_for(base_dir)
+    if args.rebuild and index_dir.exists():
+        shutil.rmtree(index_dir)
+    index = CriterionClusterIndex(index_dir)
+
+    start = time.perf_counter()
+    for dataset in DATASETS:
+        db_path = store_path(version_store_dir(base_dir / 'processed_data', dataset, raw_dir=base_dir / 'raw_data'), dataset)
+        if not db_path.exists():
+            print(f'Skipping {dataset}: no example store at {db_path}')
+            continue
+        with ExampleStore(db_path) as store:
+            version = store.metadata().get('version')
+            previous = index.versions.get(dataset)
+            added = index.add(store.criteria(), dataset, version)
+        changed = f' (replacing version {previous})' if previous and previous != version else ''
+        print(f'{dataset}: {added} new criteria indexed from version {version}{changed}')
+    index.save()
+    clusters = index.write_clusters(args.threshold)
+    print(f'Clustered {len(index.criteria)} criteria in {time.perf_counter() - start:.1f}s')
+
+    rows = [
+        {
+            'cluster_id': cluster['cluster_id'],
+            'cluster_size': len(cluster['members']),
+            'cluster_label': cluster['label'],
+            'criterion_id': member['criterion_id'],
+            'criterion': member['criterion'],
+            **{f'n_examples_{d}': member['datasets'].get(d, 0) for d in DATASETS},
+        }
+        for cluster in clusters
+        for member in cluster['members']
+    ]
+    df = pd.DataFrame(rows)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(args.output, index=False)
+
+    cross_dataset = sum(len(c['datasets']) > 1 for c in clusters)
+    print(f'\n{len(clusters)} clusters covering {len(rows)} criteria ({cross_dataset} span more than one dataset)')
+    print('\nLargest clusters:')
+    for cluster in clusters[:10]:
+        print(f"  [{len(cluster['members'])}] {cluster['label']}")
+    print(f'\nSaved report to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Measure the throughput of the HTTP JSON API (scripts/serve_api.py).
+
+Usage:
+    python scripts/serve_api.py &
+    python scripts/benchmarks/bench_api.py --dataset hard --clients 8 --requests 2000
+
+Each client thread keeps one connection open and loops over a mix of requests:
+example lookups, example metrics, filtered pages, criteria search and the rubric cube.
+Prompt IDs come from the API itself. With --revalidate every request sends the
+ETag of its previous response, so most of them are answered with 304.
+"""
+
+import argparse
+import gzip
+import http.client
+import json
+import statistics
+import sys
+import threading
+import time
+from urllib.parse import quote
+
+
+def fetch(conn: http.client.HTTPConnection, path: str, headers=None):
+    conn.request('GET', path, headers={'Accept-Encoding': 'gzip', **(headers or {})})
+    response = conn.getresponse()
+    body = response.read()
+    return response.status, response.getheader('ETag'), body
+
+
+def request_mix(host: str, port: int, dataset: str):
+    conn = http.client.HTTPConnection(host, port)
+    status, _, body = fetch(conn, f'/datasets/{dataset}/examples?limit=200')
+    if status != 200:
+        sys.exit(f'Could not list {dataset} examples (HTTP {status}); is the server running and the dataset ingested?')
+    page = json.loads(gzip.decompress(body) if body[:2] == b'\x1f\x8b' else body)
+    ids = [row['prompt_id'] for row in page['items']]
+    themes = list(page['facets']['theme'])
+    paths = []
+    for i, prompt_id in enumerate(ids):
+        paths.append(f'/datasets/{dataset}/examples/{quote(prompt_id)}')
+        paths.append(f'/datasets/{dataset}/examples/{quote(prompt_id)}/metrics')
+        if i % 4 == 0:
+            paths.append(f'/datasets/{dataset}/examples?theme={quote(themes[i % len(themes)])}&limit=20&offset={i % 3 * 20}')
+        if i % 8 == 0:
+            paths.append(f'/datasets/{dataset}/search?q=pain&limit=20')
+            paths.append(f'/datasets/{dataset}/cubes/rubrics')
+    return paths
+
+
+def client(host, port, paths, n, offset, revalidate, latencies, statuses):
+    conn = http.client.HTTPConnection(host, port)
+    etags = {}
+    for i in range(n):
+        path = paths[(offset + i) % len(paths)]
+        headers = {'If-None-Match': etags[path]} if revalidate and path in etags else None
+        start = time.perf_counter()
+        status, etag, _ = fetch(conn, path, headers)
+        latencies.append(time.perf_counter() - start)
+        statuses[status] = statuses.get(status, 0) + 1
+        if etag:
+            etags[path] = etag
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure HealthBench API throughput')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--dataset', default='default')
+    parser.add_argument('--clients', type=int, default=8, help='Concurrent keep-alive connections (default: 8)')
+    parser.add_argument('--requests', type=int, default=2000, help='Total requests (default: 2000)')
+    parser.add_argument('--revalidate', action='store_true', help='Send If-None-Match with the previous ETag of each path')
+    args = parser.parse_args()
+
+    paths = request_mix(args.host, args.port, args.dataset)
+    per_client = args.requests // args.clients
+    latencies, statuses = [], {}
+    threads = [
+        threading.Thread(target=client, args=(args.host, args.port, paths, per_client, i * 7, args.revalidate, latencies, statuses))
+        for i in range(args.clients)
+    ]
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    seconds = time.perf_counter() - start
+    ms = sorted(latency * 1000 for latency in latencies)
+    print(json.dumps({
+        'requests': len(ms),
+        'clients': args.clients,
+        'seconds': round(seconds, 3),
+        'requests_per_s': round(len(ms) / seconds, 1),
+        'mean_ms': round(statistics.fmean(ms), 2),
+        'p50_ms': round(ms[len(ms) // 2], 2),
+        'p95_ms': round(ms[int(len(ms) * 0.95)], 2),
+        'statuses': statuses,
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
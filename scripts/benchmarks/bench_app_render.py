@@ -0,0 +1,251 @@
+#!/usr/bin/env python3
+"""
+Benchmark Streamlit page render latency with AppTest.
+
+Usage:
+    python scripts/benchmarks/bench_app_render.py --output outputs/benchmarks/render.json
+    python scripts/benchmarks/bench_app_render.py --next-clicks 50 --trace-memory --baseline outputs/benchmarks/render.json
+
+Drives pages/data_explorer.py and pages/penalty_only_dataset.py headlessly
+through streamlit.testing's AppTest, the way a user would: pick a dataset, click
+every theme, press Next repeatedly and search prompt IDs. Every rerun is
+recorded with its wall time, the number of elements it emitted and the memory
+in use afterwards (traced Python allocations with --trace-memory, otherwise the
+process's peak RSS).
+
+The Data Explorer's Next sequence is repeated under display variants (rubrics
+hidden, detailed criteria, no ideal completion), so the difference between
+variants isolates the cost of the rubric and ideal-completion rendering paths;
+what remains in the "no_rubrics" variant is mostly the conversation.
+
+Pages read the stores and outputs of this checkout, so run
+download_and_process.py (or point processed_data at synthetic data) first.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+import streamlit
+from streamlit.testing.v1 import AppTest
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+PAGES_DIR = BASE_DIR / 'src' / 'pages'
+sys.path.insert(0, str(BASE_DIR / 'src'))
+
+DATASETS = ['default', 'hard', 'consensus']
+# Sidebar checkboxes of the Data Explorer set by each variant
+VARIANTS = {
+    'default': {},
+    'detailed_criteria': {'Show detailed criteria': True},
+    'no_rubrics': {'Show positive rubrics': False, 'Show negative rubrics': False},
+    'no_ideal_completion': {'Show ideal completion': False},
+}
+
+
+def count_elements(node) -> int:
+    children = getattr(node, 'children', None)
+    if children is None:
+        return 1
+    return 1 + sum(count_elements(child) for child in children.values())
+
+
+def memory_mb() -> float:
+    if tracemalloc.is_tracing():
+        return tracemalloc.get_traced_memory()[0] / 1e6
+    if resource is not None:
+        # ru_maxrss is in KB on Linux
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1e3
+    return None
+
+
+class Recorder:
+    """Times reruns of one page and collects a row per rerun."""
+
+    def __init__(self, page: str, scenario: str):
+        self.page = page
+        self.scenario = scenario
+        self.steps = []
+        self.failed = False
+
+    def run(self, at: AppTest, step: str, action=None) -> bool:
+        """Apply `action` (a widget interaction returning the AppTest) or a plain rerun, and record it."""
+        if self.failed:
+            return False
+        start = time.perf_counter()
+        (action() if action else at).run()
+        seconds = time.perf_counter() - start
+        row = {
+            'page': self.page,
+            'scenario': self.scenario,
+            'step': step,
+            'seconds': seconds,
+            'elements': count_elements(at.main) + count_elements(at.sidebar),
+            'memory_mb': memory_mb(),
+        }
+        if at.exception:
+            row['error'] = at.exception[0].message
+            self.failed = True
+        self.steps.append(row)
+        return not self.failed
+
+
+def find_button(at: AppTest, label: str):
+    return next((b for b in at.button if b.label == label), None)
+
+
+def find_by_label(elements, label: str):
+    return next((e for e in elements if e.label == label), None)
+
+
+def bench_data_explorer(dataset: str, variant: str, next_clicks: int, searches: int, timeout: float):
+    recorder = Recorder('data_explorer', f'{dataset}/{variant}')
+    at = AppTest.from_file(str(PAGES_DIR / 'data_explorer.py'), default_timeout=timeout)
+    if not recorder.run(at, 'initial'):
+        return recorder.steps
+    recorder.run(at, 'select_dataset', lambda: find_by_label(at.selectbox, 'Select Dataset').set_value(dataset))
+    for label, value in VARIANTS[variant].items():
+        recorder.run(at, 'set_option', lambda: find_by_label(at.checkbox, label).set_value(value))
+    for key in [b.key for b in at.button if b.key and b.key.startswith('theme_')]:
+        recorder.run(at, 'theme', lambda: at.button(key=key).click())
+    for _ in range(next_clicks):
+        button = find_button(at, 'Next')
+        if button is None or button.disabled:
+            break
+        recorder.run(at, 'next', button.click)
+    current = at.session_state['current_examples'] if 'current_examples' in at.session_state else None
+    prompt_ids = list(current['ID'][:searches]) if current is not None and len(current) else []
+    for prompt_id in prompt_ids:
+        recorder.run(at, 'search', lambda: find_by_label(at.text_input, 'Enter prompt ID').input(prompt_id))
+    return recorder.steps
+
+
+def bench_penalty_only(next_clicks: int, timeout: float):
+    recorder = Recorder('penalty_only_dataset', 'default')
+    at = AppTest.from_file(str(PAGES_DIR / 'penalty_only_dataset.py'), default_timeout=timeout)
+    if not recorder.run(at, 'initial'):
+        return recorder.steps
+    theme_select = find_by_label(at.selectbox, 'Select Theme')
+    if theme_select is None:
+        # The page stopped early, e.g. because the penalty dataset has not been built
+        recorder.steps[-1]['error'] = at.error[0].value if at.error else 'Theme selector not rendered'
+        return recorder.steps
+    themes = [t for t in theme_select.options if t != 'All']
+    for theme in themes:
+        recorder.run(at, 'theme', lambda: find_by_label(at.selectbox, 'Select Theme').set_value(theme))
+    recorder.run(at, 'theme', lambda: find_by_label(at.selectbox, 'Select Theme').set_value('All'))
+    for _ in range(next_clicks):
+        button = find_button(at, 'Next')
+        if button is None or button.disabled:
+            break
+        recorder.run(at, 'next', button.click)
+    return recorder.steps
+
+
+def summarize(steps):
+    """Latency and element statistics per (page, scenario, step), plus memory growth per scenario."""
+    groups = {}
+    for row in steps:
+        groups.setdefault((row['page'], row['scenario'], row['step']), []).append(row)
+    summary = []
+    for (page, scenario, step), rows in groups.items():
+        ms = sorted(r['seconds'] * 1000 for r in rows)
+        summary.append({
+            'page': page,
+            'scenario': scenario,
+            'step': step,
+            'n': len(rows),
+            'mean_ms': statistics.fmean(ms),
+            'p50_ms': ms[len(ms) // 2],
+            'p95_ms': ms[min(len(ms) - 1, int(len(ms) * 0.95))],
+            'max_ms': ms[-1],
+            'mean_elements': statistics.fmean(r['elements'] for r in rows),
+        })
+    growth = {}
+    for row in steps:
+        if row['memory_mb'] is not None:
+            first, _ = growth.get((row['page'], row['scenario']), (row['memory_mb'], None))
+            growth[(row['page'], row['scenario'])] = (first, row['memory_mb'])
+    memory = [{'page': page, 'scenario': scenario, 'growth_mb': last - first} for (page, scenario), (first, last) in growth.items()]
+    return summary, memory
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(summary, baseline):
+    """Add each step's mean latency in `baseline` and the ratio of the new mean to it."""
+    previous = {(s['page'], s['scenario'], s['step']): s['mean_ms'] for s in baseline['summary']}
+    for row in summary:
+        before = previous.get((row['page'], row['scenario'], row['step']))
+        if before:
+            row['baseline_mean_ms'] = before
+            row['ratio'] = row['mean_ms'] / before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark Streamlit page render latency with AppTest')
+    parser.add_argument('--datasets', nargs='+', choices=DATASETS, default=['default'])
+    parser.add_argument('--variants', nargs='+', choices=list(VARIANTS), default=list(VARIANTS))
+    parser.add_argument('--next-clicks', type=int, default=20, help='Next presses per scenario (default: 20)')
+    parser.add_argument('--searches', type=int, default=5, help='Prompt IDs searched per scenario (default: 5)')
+    parser.add_argument('--pages', nargs='+', choices=['data_explorer', 'penalty_only_dataset'], default=['data_explorer', 'penalty_only_dataset'])
+    parser.add_argument('--timeout', type=float, default=120, help='Seconds allowed per rerun')
+    parser.add_argument('--trace-memory', action='store_true', help='Record traced Python allocations (slower) instead of peak RSS')
+    parser.add_argument('--baseline', type=Path, default=None, help='Earlier results JSON to compare against')
+    parser.add_argument('--output', type=Path, default=None, help='Write results JSON here as well as to stdout')
+    args = parser.parse_args()
+
+    if args.trace_memory:
+        tracemalloc.start()
+    steps = []
+    if 'data_explorer' in args.pages:
+        for dataset in args.datasets:
+            for variant in args.variants:
+                steps.extend(bench_data_explorer(dataset, variant, args.next_clicks, args.searches, args.timeout))
+    if 'penalty_only_dataset' in args.pages:
+        steps.extend(bench_penalty_only(args.next_clicks, args.timeout))
+    summary, memory = summarize(steps)
+
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'streamlit_version': streamlit.__version__,
+        'memory_metric': 'traced_mb' if args.trace_memory else 'peak_rss_mb',
+        'summary': summary,
+        'memory': memory,
+        'errors': [row for row in steps if 'error' in row],
+        'steps': steps,
+    }
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(summary, json.load(f))
+    for row in summary:
+        ratio = f"  {row['ratio']:.2f}x baseline" if 'ratio' in row else ''
+        print(f"{row['page']:<22} {row['scenario']:<28} {row['step']:<15} n={row['n']:<3} mean {row['mean_ms']:8.1f} ms  p95 {row['p95_ms']:8.1f} ms  {row['mean_elements']:6.0f} elements{ratio}", file=sys.stderr)
+    for row in report['errors']:
+        print(f"ERROR {row['page']} {row['scenario']} {row['step']}: {row['error']}", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+"""
+Measure the end-to-end latency of scripts/healthbench.py, interpreter start included.
+
+Usage:
+    python scripts/benchmarks/bench_cli.py --dataset hard --runs 40
+
+Each run starts a fresh interpreter, as a shell user would. Runs of a bare
+interpreter (`python -c pass`) are interleaved with the commands, so machine
+noise affects every row alike and the difference is the tool's own cost. A
+prompt ID and a search term are taken from the store itself.
+
+Whether the store modules' bytecode is cached changes the result by about
+25 ms: with PYTHONDONTWRITEBYTECODE set (or on the first run of a fresh
+checkout) every module is compiled from source on each call. The report
+records which case was measured; run it both ways to compare.
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+CLI = BASE_DIR / 'scripts' / 'healthbench.py'
+
+
+def run(cmd) -> float:
+    start = time.perf_counter()
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, check=True)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure scripts/healthbench.py latency')
+    parser.add_argument('--dataset', default='default')
+    parser.add_argument('--runs', type=int, default=40, help='Runs of each command (default: 40)')
+    parser.add_argument('--python', default=sys.executable, help='Interpreter to run the tool with (default: this one)')
+    args = parser.parse_args()
+
+    cli = [args.python, str(CLI), '--dataset', args.dataset]
+    prompt_id = subprocess.run(cli + ['filter', '--limit', '1', '--format', 'ids'], capture_output=True, text=True, check=True).stdout.strip()
+    if not prompt_id:
+        sys.exit(f'No examples in the {args.dataset} store; run scripts/download_and_process.py --dataset {args.dataset} first')
+    commands = {
+        'bare_interpreter': [args.python, '-c', 'pass'],
+        'show': cli + ['show', prompt_id],
+        'search': cli + ['search', 'pain', '--limit', '20'],
+        'filter': cli + ['filter', '--axis', 'accuracy', '--limit', '20'],
+    }
+    times = {name: [] for name in commands}
+    for _ in range(args.runs):
+        for name, cmd in commands.items():
+            times[name].append(run(cmd) * 1000)
+
+    # The first lookup above wrote the bytecode unless writing is disabled
+    pyc = subprocess.run([args.python, '-c', 'import importlib.util, sys; print(importlib.util.cache_from_source(sys.argv[1]))', str(BASE_DIR / 'src' / 'example_store.py')],
+                         capture_output=True, text=True, check=True).stdout.strip()
+    bytecode_cached = Path(pyc).exists()
+    report = {'dataset': args.dataset, 'runs': args.runs, 'python': args.python, 'bytecode_cached': bytecode_cached, 'commands': {}}
+    for name, ms in times.items():
+        ms.sort()
+        report['commands'][name] = {
+            'p50_ms': round(statistics.median(ms), 1),
+            'p90_ms': round(ms[int(len(ms) * 0.9)], 1),
+            'min_ms': round(ms[0], 1),
+        }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
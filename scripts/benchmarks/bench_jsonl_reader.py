@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark JSONL parse throughput.
+
+Usage:
+    python scripts/benchmarks/bench_jsonl_reader.py raw_data/healthbench_default_data.jsonl
+
+Times the old read-everything-into-a-list pattern against the streaming readers in
+src/jsonl_reader.py (records, record batches, typed column batches and the sharded
+parallel reader at 1, 2, 4, ... workers), and reports rows/s, MB/s and peak traced
+memory for each as JSON. Peak memory of the parallel cases covers this process only.
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent.parent / 'src'))
+from compression import open_binary
+from jsonl_reader import default_workers, iter_column_batches, iter_column_batches_parallel, iter_jsonl, iter_jsonl_batches, json_backend, tag_value
+
+BENCH_COLUMNS = {
+    'prompt_id': (lambda data: data.get('prompt_id'), None),
+    'theme': (lambda data: tag_value(data.get('example_tags', []), 'theme:'), None),
+    'rubric_count': (lambda data: len(data.get('rubrics', [])), 'q'),
+    'total_points': (lambda data: sum(r.get('points', 0) for r in data.get('rubrics', [])), 'q'),
+}
+
+
+def read_all_as_list(path):
+    """The pattern the scripts used before: accumulate every parsed row in a list."""
+    with open_binary(path) as f:
+        rows = [json.loads(line) for line in f if line.strip()]
+    return len(rows)
+
+
+def stream_records(path):
+    return sum(1 for _ in iter_jsonl(path))
+
+
+def stream_batches(path, batch_size):
+    return sum(len(batch) for batch in iter_jsonl_batches(path, batch_size=batch_size))
+
+
+def stream_columns(path, batch_size):
+    return sum(len(batch['prompt_id']) for batch in iter_column_batches(path, BENCH_COLUMNS, batch_size=batch_size))
+
+
+def parallel_columns(path, workers):
+    return sum(len(batch['prompt_id']) for batch in iter_column_batches_parallel(path, BENCH_COLUMNS, workers=workers))
+
+
+def measure(name, fn, path, size_bytes, repeat):
+    """Time `fn(path)` (best of `repeat`) and trace its peak memory on a separate run."""
+    best = float('inf')
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rows = fn(path)
+        best = min(best, time.perf_counter() - start)
+    tracemalloc.start()
+    fn(path)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'name': name,
+        'rows': rows,
+        'seconds': best,
+        'rows_per_s': rows / best if best else None,
+        'mb_per_s': size_bytes / 1e6 / best if best else None,
+        'peak_traced_mb': peak / 1e6,
+    }
+
+
+def run(path: Path, batch_size: int = 1000, repeat: int = 3, max_workers: int = None):
+    """Run all reader benchmarks on one file and return the results."""
+    size_bytes = path.stat().st_size
+    max_workers = max_workers or default_workers()
+    cases = [
+        ('list_of_dicts', read_all_as_list),
+        ('iter_jsonl', stream_records),
+        (f'iter_jsonl_batches[{batch_size}]', lambda p: stream_batches(p, batch_size)),
+        (f'iter_column_batches[{batch_size}]', lambda p: stream_columns(p, batch_size)),
+    ]
+    # Parallel parsing at doubling worker counts, to check how throughput scales with cores
+    workers = 1
+    while workers <= max_workers:
+        cases.append((f'iter_column_batches_parallel[workers={workers}]', lambda p, w=workers: parallel_columns(p, w)))
+        workers *= 2
+    return {
+        'file': str(path),
+        'size_mb': size_bytes / 1e6,
+        'cpu_count': default_workers(),
+        'json_backend': json_backend(),
+        'results': [measure(name, fn, path, size_bytes, repeat) for name, fn in cases],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark JSONL parse throughput')
+    parser.add_argument('path', type=Path, help='JSONL file to parse')
+    parser.add_argument('--batch-size', type=int, default=1000)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-workers', type=int, default=None, help='Largest worker count for the parallel reader (default: all cores)')
+    parser.add_argument('--output', type=Path, default=None, help='Write results JSON here as well as to stdout')
+    args = parser.parse_args()
+
+    report = run(args.path, args.batch_size, args.repeat, args.max_workers)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,196 @@
+#!/usr/bin/env python3
+"""
+Benchmark the data pipeline on synthetic datasets of increasing size.
+
+Usage:
+    python scripts/benchmarks/bench_scale.py --sizes 5000 50000 200000 --output outputs/benchmarks/scale.json
+    python scripts/benchmarks/bench_scale.py --sizes 5000 50000 --baseline outputs/benchmarks/scale.json
+
+For each size a synthetic JSONL file is generated (once; it is reused on later
+runs with the same size and seed) in a scratch workspace under
+outputs/benchmarks/workspace/<size>/, laid out like the repo so the analysis
+scripts run unchanged. Each stage is timed on it without any download:
+
+    ingest                  build the SQLite example store
+    csv                     jsonl_to_csv
+    example_files           write per-example JSON files (first --max-files examples)
+    get_all_examples        load those files back
+    create_examples_dataframe
+    points_metrics          calculate_points_metrics for every loaded example
+    extract_key_examples    scripts/analysis/extract_key_examples.py (subprocess)
+    penalty_dataset         scripts/analysis/create_penalty_dataset.py (subprocess)
+
+Results are written as JSON. With --baseline, each stage is also compared with
+the same stage and size in an earlier results file, so regressions show up as
+ratios above 1.
+"""
+
+import argparse
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR / 'src'))
+sys.path.insert(0, str(BASE_DIR / 'scripts'))
+from download_and_process import save_example_file
+from example_store import build_example_store_from_jsonl, store_path
+from jsonl_reader import default_workers, iter_jsonl, json_backend
+from synthetic_data import write_synthetic_jsonl
+from utils import calculate_points_metrics, create_examples_dataframe, get_all_examples, jsonl_to_csv
+
+DATASETS = ['default', 'hard', 'consensus']
+
+# One log line per written file would dominate the example_files timing
+logging.getLogger('download_and_process').setLevel(logging.WARNING)
+
+
+def prepare_workspace(size: int) -> Path:
+    """Scratch directory with a synthetic file behind every raw_data/healthbench_<dataset>_data.jsonl."""
+    workspace = BASE_DIR / 'outputs' / 'benchmarks' / 'workspace' / str(size)
+    for sub in ['raw_data', 'processed_data/default', 'notebooks', 'outputs/analysis']:
+        (workspace / sub).mkdir(parents=True, exist_ok=True)
+    return workspace
+
+
+def synthetic_file(workspace: Path, size: int, seed: int):
+    """The workspace's synthetic JSONL file, generated if missing; returns (path, generation seconds or None)."""
+    path = workspace / f'synthetic_{size}_seed{seed}.jsonl'
+    seconds = None
+    if not path.exists():
+        start = time.perf_counter()
+        write_synthetic_jsonl(path, size, seed)
+        seconds = time.perf_counter() - start
+    for dataset in DATASETS:
+        link = workspace / 'raw_data' / f'healthbench_{dataset}_data.jsonl'
+        if link.is_symlink() or link.exists():
+            link.unlink()
+        os.symlink(os.path.relpath(path, link.parent), link)
+    return path, seconds
+
+
+def run_script(workspace: Path, script: str) -> None:
+    subprocess.run([sys.executable, str(BASE_DIR / 'scripts' / 'analysis' / script)], cwd=workspace, check=True, stdout=subprocess.DEVNULL)
+
+
+def run_size(size: int, seed: int, max_files: int):
+    """Time every stage on one synthetic dataset; returns the result rows."""
+    workspace = prepare_workspace(size)
+    jsonl_path, generate_seconds = synthetic_file(workspace, size, seed)
+    files_dir = workspace / 'processed_data' / 'default'
+    n_files = min(size, max_files)
+    state = {}
+
+    def ingest():
+        db_path = store_path(workspace / 'processed_data' / 'default', 'default')
+        return build_example_store_from_jsonl(jsonl_path, db_path, 'default')
+
+    def csv():
+        return jsonl_to_csv(jsonl_path, workspace / 'processed_data' / 'default' / 'synthetic.csv')
+
+    def example_files():
+        # Remove files left by a run with a larger --max-files so get_all_examples loads exactly n_files
+        for stale in files_dir.glob('synthetic_example_*.json*'):
+            stale.unlink()
+        for i, example in enumerate(iter_jsonl(jsonl_path, max_rows=n_files)):
+            save_example_file(example, files_dir, 'synthetic', i + 1)
+        return n_files
+
+    def load_examples():
+        state['examples'] = get_all_examples(files_dir)
+        return len(state['examples'])
+
+    def examples_dataframe():
+        return len(create_examples_dataframe(state['examples']))
+
+    def points_metrics():
+        return len([calculate_points_metrics(example.rubrics) for example in state['examples']])
+
+    def extract_key_examples():
+        run_script(workspace, 'extract_key_examples.py')
+        return size * len(DATASETS)
+
+    def penalty_dataset():
+        run_script(workspace, 'create_penalty_dataset.py')
+        return size
+
+    stages = [
+        ('ingest', ingest),
+        ('csv', csv),
+        ('example_files', example_files),
+        ('get_all_examples', load_examples),
+        ('create_examples_dataframe', examples_dataframe),
+        ('points_metrics', points_metrics),
+        ('extract_key_examples', extract_key_examples),
+        ('penalty_dataset', penalty_dataset),
+    ]
+    results = []
+    if generate_seconds is not None:
+        results.append({'size': size, 'stage': 'generate', 'rows': size, 'seconds': generate_seconds, 'rows_per_s': size / generate_seconds})
+    for name, fn in stages:
+        start = time.perf_counter()
+        rows = fn()
+        seconds = time.perf_counter() - start
+        results.append({'size': size, 'stage': name, 'rows': rows, 'seconds': seconds, 'rows_per_s': rows / seconds if seconds else None})
+        print(f'{size:>9,} {name:<26} {seconds:8.2f}s', file=sys.stderr)
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    """Add each stage's time in `baseline` and the ratio of the new time to it."""
+    previous = {(r['size'], r['stage']): r['seconds'] for r in baseline['results']}
+    for result in results:
+        before = previous.get((result['size'], result['stage']))
+        if before:
+            result['baseline_seconds'] = before
+            result['ratio'] = result['seconds'] / before
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the data pipeline on synthetic data')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[5000, 50000], help='Numbers of examples to benchmark (default: 5000 50000)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--max-files', type=int, default=50000, help='Cap on per-example JSON files written and loaded back (default: 50000)')
+    parser.add_argument('--baseline', type=Path, default=None, help='Earlier results JSON to compare against')
+    parser.add_argument('--output', type=Path, default=None, help='Write results JSON here as well as to stdout')
+    args = parser.parse_args()
+
+    results = []
+    for size in args.sizes:
+        results.extend(run_size(size, args.seed, args.max_files))
+    report = {
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'git_commit': git_commit(),
+        'seed': args.seed,
+        'max_files': args.max_files,
+        'cpu_count': default_workers(),
+        'json_backend': json_backend(),
+        'results': results,
+    }
+    if args.baseline:
+        with open(args.baseline, 'r') as f:
+            compare(results, json.load(f))
+        for result in results:
+            if 'ratio' in result:
+                print(f"{result['size']:>9,} {result['stage']:<26} {result['ratio']:6.2f}x baseline", file=sys.stderr)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(text)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Profile how much memory each dataset costs in the viewer, and where it goes.
+
+Usage:
+    python scripts/benchmarks/profile_memory.py [--datasets default hard consensus] [--top 10]
+
+Loads every dataset through the same functions the pages use, under tracemalloc,
+one structure at a time, keeping each alive so the next is measured on top:
+
+    example_files          Example objects from get_all_examples over the per-example files
+    examples_dataframe     create_examples_dataframe over those examples
+    example_map            a prompt_id -> example map over them (what the old explorer kept)
+    example_files_packed   the same examples with their text in a block-compressed text store
+    example_store          open_example_store plus its catalog lookups
+    session_examples       the navigator DataFrame a filter puts in session state (200 rows)
+    current_example        one example from get_example
+    analysis_cubes         load_analysis_cubes (Main Analysis)
+    analysis_cubes_copy    a second load_analysis_cubes call: st.cache_data returns a fresh copy every rerun
+    incidence              open_incidence (Co-occurrence)
+
+For each structure it reports the traced bytes allocated, the deep size
+(pandas memory_usage(deep=True) per column for DataFrames, a recursive
+getsizeof otherwise), the RSS delta where /proc is available and the top
+allocation sites. Results go to outputs/benchmarks/memory_profile.json and a
+comparison table to memory_profile.md. Memory that SQLite allocates for its
+page cache is not traced; the RSS delta includes it.
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(BASE_DIR / 'src'))
+from utils import create_examples_dataframe, get_all_examples, get_example, load_analysis_cubes, open_example_store, open_incidence, query_examples
+from data_versions import version_store_dir
+
+DATASETS = ['default', 'hard', 'consensus']
+SESSION_ROWS = 200
+
+
+def current_rss():
+    """Resident set size in bytes, or None where /proc is not available."""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):
+        return None
+
+
+def deep_getsizeof(obj, seen=None) -> int:
+    """Size of an object and everything it references through dicts, lists, tuples, sets and __slots__."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_getsizeof(k, seen) + deep_getsizeof(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple, set, frozenset)):
+        size += sum(deep_getsizeof(item, seen) for item in obj)
+    elif hasattr(type(obj), '__slots__'):
+        size += sum(deep_getsizeof(getattr(obj, name), seen) for name in type(obj).__slots__ if hasattr(obj, name))
+    return size
+
+
+def frame_columns(df: pd.DataFrame):
+    """Deep bytes per column of a DataFrame (the index under 'Index')."""
+    return {str(column): int(size) for column, size in df.memory_usage(deep=True).items()}
+
+
+def deep_size(obj):
+    """(deep bytes, per-column bytes or None) of a structure; tuples of DataFrames are summed and prefixed."""
+    if isinstance(obj, pd.DataFrame):
+        columns = frame_columns(obj)
+        return sum(columns.values()), columns
+    if isinstance(obj, tuple) and obj and all(isinstance(part, pd.DataFrame) for part in obj):
+        columns = {f'{i}.{column}': size for i, part in enumerate(obj) for column, size in frame_columns(part).items()}
+        return sum(columns.values()), columns
+    if hasattr(obj, '__dict__') and not isinstance(obj, type):
+        return deep_getsizeof(vars(obj)), None
+    return deep_getsizeof(obj), None
+
+
+def snapshot():
+    gc.collect()
+    return tracemalloc.take_snapshot().filter_traces([tracemalloc.Filter(False, tracemalloc.__file__)])
+
+
+def measure(dataset, name, build, keep, top):
+    """Build one structure under tracemalloc and describe the memory it added."""
+    before = snapshot()
+    rss_before = current_rss()
+    start = time.perf_counter()
+    obj = build()
+    seconds = time.perf_counter() - start
+    after = snapshot()
+    rss_after = current_rss()
+    keep.append(obj)
+    stats = after.compare_to(before, 'lineno')
+    deep_bytes, columns = deep_size(obj)
+    sites = [
+        {'site': f'{s.traceback[0].filename}:{s.traceback[0].lineno}', 'bytes': s.size_diff, 'blocks': s.count_diff}
+        for s in stats if s.size_diff > 0
+    ][:top]
+    return {
+        'dataset': dataset,
+        'structure': name,
+        'items': len(obj) if hasattr(obj, '__len__') and not isinstance(obj, tuple) else None,
+        'seconds': seconds,
+        'traced_bytes': sum(s.size_diff for s in stats),
+        'deep_bytes': deep_bytes,
+        'rss_delta_bytes': rss_after - rss_before if rss_before is not None and rss_after is not None else None,
+        'columns': columns,
+        'top_sites': sites,
+    }
+
+
+def profile_dataset(dataset: str, data_dir: Path, top: int):
+    """Measure every structure of one dataset; returns one row per structure that could be built."""
+    keep = []
+    rows = []
+    files_dir = version_store_dir(data_dir, dataset)
+    if any(files_dir.glob('*_example_*.json*')):
+        rows.append(measure(dataset, 'example_files', lambda: get_all_examples(files_dir), keep, top))
+        examples = keep[-1]
+        rows.append(measure(dataset, 'examples_dataframe', lambda: create_examples_dataframe(examples), keep, top))
+        rows.append(measure(dataset, 'example_map', lambda: {e.prompt_id: e for e in examples}, keep, top))
+        text_path = files_dir / f'{dataset}_profile.texts'
+        rows.append(measure(dataset, 'example_files_packed', lambda: get_all_examples(files_dir, text_path), keep, top))
+        text_path.unlink()
+    else:
+        print(f'{dataset}: no per-example files in {files_dir}, skipping the file-based structures', file=sys.stderr)
+
+    def open_store():
+        store = open_example_store(dataset)
+        if store is not None:
+            # The lookups every Data Explorer rerun makes
+            store.count(), store.themes(), store.physician_categories(), store.axes()
+        return store
+    store_row = measure(dataset, 'example_store', open_store, keep, top)
+    store = keep[-1]
+    if store is None:
+        print(f'{dataset}: no example store, skipping the store-based structures', file=sys.stderr)
+        return rows
+    rows.append(store_row)
+    rows.append(measure(dataset, 'session_examples', lambda: query_examples(store, limit=SESSION_ROWS), keep, top))
+    first_id = keep[-1]['ID'].iloc[0] if len(keep[-1]) else None
+    if first_id is not None:
+        rows.append(measure(dataset, 'current_example', lambda: get_example(store, first_id), keep, top))
+    rows.append(measure(dataset, 'analysis_cubes', lambda: load_analysis_cubes([dataset]), keep, top))
+    rows.append(measure(dataset, 'analysis_cubes_copy', lambda: load_analysis_cubes([dataset]), keep, top))
+    incidence = measure(dataset, 'incidence', lambda: open_incidence(dataset), keep, top)
+    if keep[-1] is not None:
+        rows.append(incidence)
+    return rows
+
+
+def comparison_table(rows, datasets):
+    """Markdown table of traced and deep MB per structure (rows) and dataset (columns)."""
+    structures = list(dict.fromkeys(r['structure'] for r in rows))
+    by_key = {(r['structure'], r['dataset']): r for r in rows}
+    header = '| Structure | ' + ' | '.join(f'{d} traced MB | {d} deep MB' for d in datasets) + ' |'
+    lines = [header, '|' + '---|' * (1 + 2 * len(datasets))]
+    for structure in structures:
+        cells = []
+        for dataset in datasets:
+            row = by_key.get((structure, dataset))
+            cells += [f"{row['traced_bytes'] / 1e6:.2f}", f"{row['deep_bytes'] / 1e6:.2f}"] if row else ['', '']
+        lines.append(f'| {structure} | ' + ' | '.join(cells) + ' |')
+    totals = []
+    for dataset in datasets:
+        totals += [f"**{sum(r['traced_bytes'] for r in rows if r['dataset'] == dataset) / 1e6:.2f}**", '']
+    lines.append('| **total traced** | ' + ' | '.join(totals) + ' |')
+    return '\n'.join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Profile per-dataset memory of the viewer data structures')
+    parser.add_argument('--datasets', nargs='+', choices=DATASETS, default=DATASETS)
+    parser.add_argument('--data-dir', type=Path, default=BASE_DIR / 'processed_data', help='Directory with the per-example JSON files of each dataset')
+    parser.add_argument('--top', type=int, default=10, help='Allocation sites reported per structure')
+    parser.add_argument('--output-dir', type=Path, default=BASE_DIR / 'outputs' / 'benchmarks')
+    args = parser.parse_args()
+
+    tracemalloc.start()
+    rows = []
+    for dataset in args.datasets:
+        dataset_rows = profile_dataset(dataset, args.data_dir, args.top)
+        rows.extend(dataset_rows)
+        for row in dataset_rows:
+            print(f"{dataset:<10} {row['structure']:<20} traced {row['traced_bytes'] / 1e6:9.2f} MB  deep {row['deep_bytes'] / 1e6:9.2f} MB", file=sys.stderr)
+        # Each dataset is measured on a clean slate; its structures are dropped here
+        gc.collect()
+    tracemalloc.stop()
+
+    args.output_dir.mkdir(parents=True, exist_ok=True)
+    report = {'created_at': datetime.now(timezone.utc).isoformat(), 'results': rows}
+    json_path = args.output_dir / 'memory_profile.json'
+    json_path.write_text(json.dumps(report, indent=2))
+    table = comparison_table(rows, args.datasets)
+    md_path = args.output_dir / 'memory_profile.md'
+    md_path.write_text(f"# Viewer Memory Profile\nGenerated on: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n\n{table}\n")
+    print(table)
+    print(f'\nSaved {json_path} and {md_path}')
+
+
+if __name__ == '__main__':
+    main()
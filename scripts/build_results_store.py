@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""
+Load model result files into the columnar results store used by the Model Comparison page.
+
+Usage:
+    python scripts/build_results_store.py --dataset hard outputs/results/*.jsonl
+
+Each results file is JSONL as written by grade_completions.py. The store for a
+dataset lives in outputs/results_store/<dataset>/; its prompt/criterion index is
+built from raw_data/healthbench_<dataset>_data.jsonl the first time (or with --rebuild).
+The index is also rebuilt when the dataset's current raw version is no longer the
+one it was built from; results added against the old index are dropped and the
+files given on the command line are added again.
+"""
+
+import argparse
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from results_store import add_model_results, build_results_index, index_mismatch, store_dir_for
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description='Build the columnar model results store')
+    parser.add_argument('results', type=Path, nargs='+', help='Results JSONL files')
+    parser.add_argument('--dataset', type=str, choices=['default', 'hard', 'consensus'], default='default')
+    parser.add_argument('--rebuild', action='store_true', help='Rebuild the prompt/criterion index from the raw dataset')
+    args = parser.parse_args()
+
+    store_dir = store_dir_for(args.dataset, base_dir)
+    mismatch = index_mismatch(store_dir) if (store_dir / 'index.json').exists() else None
+    if mismatch:
+        logger.warning(f"The {mismatch}; rebuilding it. Results added before must be added again.")
+    if args.rebuild or mismatch or not (store_dir / 'index.json').exists():
+        raw_path = base_dir / 'raw_data' / f'healthbench_{args.dataset}_data.jsonl'
+        logger.info(f"Building results index from {raw_path}")
+        build_results_index(raw_path, store_dir)
+    for results_path in args.results:
+        model = add_model_results(store_dir, results_path)
+        logger.info(f"Added results for {model} from {results_path}")
+    logger.info(f"Results store ready at {store_dir}")
+
+
+if __name__ == '__main__':
+    main()
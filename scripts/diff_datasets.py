@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Diff two versions of a HealthBench JSONL file.
+
+Usage:
+    python scripts/diff_datasets.py old_release.jsonl new_release.jsonl
+
+Reports examples and rubric criteria that were added, removed or changed, and
+the resulting point deltas. The full diff is saved to
+outputs/diffs/<old>__<new>.json, which the Dataset Diff page of the app browses.
+"""
+
+import argparse
+import json
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from dataset_diff import diff_datasets, save_diff
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description='Diff two versions of a HealthBench JSONL file')
+    parser.add_argument('old', type=Path, help='Older JSONL version')
+    parser.add_argument('new', type=Path, help='Newer JSONL version')
+    parser.add_argument('--output', type=Path, default=None, help='Diff JSON (default: outputs/diffs/<old>__<new>.json)')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    diff = diff_datasets(args.old, args.new)
+    logger.info(f"Diffed {args.old.name} and {args.new.name} in {time.perf_counter() - start:.1f}s")
+    logger.info(f"Summary: {json.dumps(diff['summary'])}")
+
+    output_path = args.output or base_dir / 'outputs' / 'diffs' / f'{args.old.stem}__{args.new.stem}.json'
+    save_diff(diff, output_path)
+    logger.info(f"Saved diff to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
@@ -2,22 +2,38 @@
 """
 Data download and processing script for HealthBench.
 This script downloads the raw data, processes it, and generates CSV files.
+
+Every stage is timed, with rows/s or MB/s where it applies, and a JSON summary
+of the run (stages, totals, peak RSS) is written to outputs/ingest_metrics/.
 """
 
-import requests
 from pathlib import Path
 import logging
 import json
+import time
 import pandas as pd
-from typing import Dict, List, Any
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from typing import Dict, List, Any, Tuple
 import argparse
 from enum import Enum
 import sys
 import subprocess
 
+try:
+    import resource
+except ImportError:
+    resource = None
+
 # Add src to path for importing utils
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from src.utils import jsonl_to_dataframe
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from utils import jsonl_to_csv
+from example_store import ExampleStore, build_example_store_from_jsonl, store_path
+from example_neighbors import build_example_neighbors
+from incidence import build_incidence
+from data_versions import current_version, fetch_version, import_legacy_file, list_versions, load_registry, set_current_version, version_name, version_store_dir
+from compression import SUFFIXES, available_codecs, compress_bytes
+from jsonl_reader import count_shard_records, imap_shards, iter_jsonl, iter_shard_records, shard_ranges
 
 # Set up logging
 logging.basicConfig(
@@ -37,52 +53,162 @@ DATASET_URLS = {
     DatasetType.CONSENSUS: "https://openaipublic.blob.core.windows.net/simple-evals/healthbench/consensus_2025-05-09-20-00-46.jsonl"
 }
 
-def download_data(url: str, output_path: Path) -> None:
-    """Download data from URL and save to file."""
+class StageMetrics:
+    """Wall time, rows and bytes of each stage of a run, summarised as JSON at the end."""
+
+    def __init__(self):
+        self.started_at = datetime.now(timezone.utc)
+        self.start = time.perf_counter()
+        self.stages = []
+
+    @contextmanager
+    def stage(self, dataset: str, name: str):
+        """Time a stage; the block may set 'rows' and 'bytes' on the yielded record."""
+        record = {'dataset': dataset, 'stage': name}
+        start = time.perf_counter()
+        yield record
+        seconds = time.perf_counter() - start
+        record['seconds'] = round(seconds, 3)
+        if record.get('rows') is not None and seconds > 0:
+            record['rows_per_s'] = round(record['rows'] / seconds, 1)
+        if record.get('bytes') and seconds > 0:
+            record['mb_per_s'] = round(record['bytes'] / 1e6 / seconds, 2)
+        self.stages.append(record)
+        rate = ', '.join(f"{record[k]:,} {label}" for k, label in [('rows_per_s', 'rows/s'), ('mb_per_s', 'MB/s')] if k in record)
+        logger.info(f"[{dataset}] {name} took {seconds:.2f}s" + (f" ({rate})" if rate else ""))
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'started_at': self.started_at.isoformat(),
+            'total_seconds': round(time.perf_counter() - self.start, 3),
+            'peak_rss_mb': peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+            'peak_child_rss_mb': peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+            'stages': self.stages,
+        }
+
+    def save(self, metrics_dir: Path) -> Path:
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        path = metrics_dir / f"{self.started_at.strftime('%Y%m%dT%H%M%SZ')}.json"
+        with open(path, 'w') as f:
+            json.dump(self.summary(), f, indent=2)
+        return path
+
+def peak_rss_mb(who) -> float:
+    """Peak resident set size of this process (or its waited-for children) in MB."""
+    # ru_maxrss is in KB on Linux and in bytes on macOS
+    scale = 1e6 if sys.platform == 'darwin' else 1e3
+    return round(resource.getrusage(who).ru_maxrss / scale, 1)
+
+def progress_bar(enabled: bool, **kwargs):
+    """A tqdm progress bar, or a no-op stand-in when progress display is off."""
+    from tqdm import tqdm
+    return tqdm(disable=not enabled, **kwargs)
+
+def download_data(raw_data_dir: Path, dataset: str, url: str, refresh: bool = False, codec: str = None) -> Tuple[str, bool]:
+    """Make sure the release at `url` is in the raw blob store and current; returns (version, downloaded)."""
+    if import_legacy_file(raw_data_dir, dataset, version_name(url), url, codec):
+        logger.info(f"Moved existing raw {dataset} file into the blob store as version {version_name(url)}")
     try:
-        logger.info(f"Downloading data from {url}")
-        response = requests.get(url)
-        response.raise_for_status()
-        
-        # Create directory if it doesn't exist
-        output_path.parent.mkdir(parents=True, exist_ok=True)
-        
-        # Save the data
-        with open(output_path, 'wb') as f:
-            f.write(response.content)
-        logger.info(f"Data downloaded successfully to {output_path}")
+        version, downloaded = fetch_version(raw_data_dir, dataset, url, refresh=refresh, codec=codec)
     except Exception as e:
         logger.error(f"Error downloading data: {str(e)}")
         raise
+    if downloaded:
+        logger.info(f"Downloaded {dataset} version {version} from {url}")
+    else:
+        logger.info(f"{dataset} version {version} is up to date. Skipping download.")
+    return version, downloaded
 
-def process_and_save_data(jsonl_file: Path, output_dir: Path, base_filename: str, num_examples: int = None):
-    """Process the JSONL file and save both individual JSON files and CSV."""
-    # Load and process data
-    data = []
-    with open(jsonl_file, 'r') as f:
-        for i, line in enumerate(f):
-            if num_examples is not None and i >= num_examples:
-                break
-            if line.strip():
-                data.append(json.loads(line))
-    
-    # Save individual JSON files
-    for i, example in enumerate(data):
-        output_file = output_dir / f"{base_filename}_example_{i+1}.json"
-        with open(output_file, 'w') as f:
-            json.dump(example, f, indent=2)
-        logger.info(f"Saved example {i+1} to {output_file}")
-    
-    # Generate and save CSV
-    df = jsonl_to_dataframe(str(jsonl_file))
+def save_example_file(example: Dict[str, Any], output_dir: Path, base_filename: str, index: int, codec: str = None) -> Path:
+    """Write one example to its JSON file, compressed as <name>.json.gz / .json.zst when `codec` is given."""
+    output_file = output_dir / f"{base_filename}_example_{index}.json{SUFFIXES.get(codec, '')}"
+    data = json.dumps(example, indent=2).encode('utf-8')
+    with open(output_file, 'wb') as f:
+        f.write(compress_bytes(data, codec) if codec else data)
+    # Drop the copy written with another codec by an earlier run
+    for suffix in [''] + list(SUFFIXES.values()):
+        stale = output_dir / f"{base_filename}_example_{index}.json{suffix}"
+        if stale != output_file and stale.exists():
+            stale.unlink()
+    logger.debug(f"Saved example {index} to {output_file}")
+    return output_file
+
+def save_example_files(jsonl_file: Path, start: int, end: int, output_dir: Path, base_filename: str, first_index: int, codec: str = None) -> int:
+    """Write the examples in one byte range of the JSONL file to individual JSON files."""
+    count = 0
+    for count, example in enumerate(iter_shard_records(jsonl_file, start, end), start=1):
+        save_example_file(example, output_dir, base_filename, first_index + count, codec)
+    return count
+
+def save_examples(jsonl_file: Path, output_dir: Path, base_filename: str, num_examples: int = None, codec: str = None, progress: bool = False) -> int:
+    """Save each example of the JSONL file as an individual JSON file; returns how many were saved."""
     if num_examples is not None:
-        df = df.head(num_examples)
+        # Stream the first num_examples straight to their individual JSON files
+        saved = 0
+        for saved, example in enumerate(progress_bar(progress, iterable=iter_jsonl(jsonl_file, max_rows=num_examples), total=num_examples, desc='Example files', unit='example'), start=1):
+            save_example_file(example, output_dir, base_filename, saved, codec)
+    else:
+        # Count examples per shard first so each worker knows where its file numbering starts
+        ranges = shard_ranges(jsonl_file)
+        counts = list(imap_shards(jsonl_file, count_shard_records, ranges=ranges))
+        first_indices = [sum(counts[:i]) for i in range(len(counts))]
+        shard_args = [(output_dir, base_filename, first, codec) for first in first_indices]
+        saved = 0
+        with progress_bar(progress, total=sum(counts), desc='Example files', unit='example') as bar:
+            for shard_saved in imap_shards(jsonl_file, save_example_files, ranges=ranges, shard_args=shard_args):
+                saved += shard_saved
+                bar.update(shard_saved)
+    logger.info(f"Saved {saved} example files to {output_dir}")
+    return saved
+
+def save_csv(jsonl_file: Path, output_dir: Path, base_filename: str, num_examples: int = None) -> int:
+    """Generate the per-example CSV; returns its number of rows."""
     csv_file = output_dir / f"{base_filename}.csv"
-    df.to_csv(csv_file, index=False)
+    rows = jsonl_to_csv(jsonl_file, csv_file, max_rows=num_examples)
     logger.info(f"Saved CSV file to {csv_file}")
+    return rows
+
+def build_store(jsonl_file: Path, output_dir: Path, dataset: str, num_examples: int = None, version: str = None, metrics: StageMetrics = None, progress: bool = False):
+    """Ingest the JSONL file into the SQLite example store the viewer queries, then build its derived indexes."""
+    metrics = metrics or StageMetrics()
+    db_path = store_path(output_dir, dataset)
+    with metrics.stage(dataset, 'ingest') as stage:
+        bar = lambda examples: progress_bar(progress, iterable=examples, total=num_examples, desc='Ingest', unit='example')
+        count = build_example_store_from_jsonl(jsonl_file, db_path, dataset, max_rows=num_examples, version=version, progress=bar)
+        stage['rows'] = count
+        if num_examples is None:
+            # Bytes as stored (compressed for a .gz/.zst blob), so MB/s is the rate the file is read at
+            stage['bytes'] = jsonl_file.stat().st_size
+    logger.info(f"Saved example store with {count} examples to {db_path}")
+    with metrics.stage(dataset, 'neighbors') as stage:
+        build_example_neighbors(db_path)
+        stage['rows'] = count
+    logger.info(f"Saved nearest-neighbour index for {count} examples")
+    with metrics.stage(dataset, 'incidence') as stage:
+        n_criteria, n_axes = build_incidence(db_path)
+        stage['rows'] = count
+    logger.info(f"Saved incidence matrices of {count} examples x {n_criteria} criteria and {n_axes} axes")
+
+def clear_outputs(output_dir: Path, base_filename: str):
+    """Remove the example files and CSV an earlier run wrote, so a shorter rewrite leaves no stale higher-numbered files behind."""
+    for stale in output_dir.glob(f"{base_filename}_example_*.json*"):
+        stale.unlink()
+    (output_dir / f"{base_filename}.csv").unlink(missing_ok=True)
+
+def outputs_are_complete(output_dir: Path, dataset: str, base_filename: str) -> bool:
+    """Whether a version's example files, CSV and store all exist and hold the whole file."""
+    return (output_dir / f"{base_filename}.csv").exists() and store_is_complete(store_path(output_dir, dataset))
 
-def run_analysis_scripts():
+def store_is_complete(db_path: Path) -> bool:
+    """Whether an example store exists and holds the whole file rather than a --num_examples sample."""
+    if not db_path.exists():
+        return False
+    with ExampleStore(db_path) as store:
+        return store.metadata().get('max_rows') is None
+
+def run_analysis_scripts(metrics: StageMetrics = None):
     """Run the analysis scripts to generate markdown and CSV outputs."""
+    metrics = metrics or StageMetrics()
     analysis_scripts_dir = Path(__file__).resolve().parent / 'analysis'
     output_dir = Path(__file__).resolve().parent.parent / 'outputs' / 'analysis'
     output_dir.mkdir(parents=True, exist_ok=True)
@@ -91,7 +217,8 @@ def run_analysis_scripts():
     extract_script = analysis_scripts_dir / 'extract_key_examples.py'
     if extract_script.exists():
         logger.info("Running extract_key_examples.py...")
-        subprocess.run([sys.executable, str(extract_script)], check=True)
+        with metrics.stage('all', 'extract_key_examples'):
+            subprocess.run([sys.executable, str(extract_script)], check=True)
     else:
         logger.warning(f"Analysis script {extract_script} not found.")
     
@@ -99,7 +226,8 @@ def run_analysis_scripts():
     penalty_script = analysis_scripts_dir / 'create_penalty_dataset.py'
     if penalty_script.exists():
         logger.info("Running create_penalty_dataset.py...")
-        subprocess.run([sys.executable, str(penalty_script)], check=True)
+        with metrics.stage('all', 'create_penalty_dataset'):
+            subprocess.run([sys.executable, str(penalty_script)], check=True)
     else:
         logger.warning(f"Analysis script {penalty_script} not found.")
 
@@ -115,12 +243,33 @@ def main():
                       type=int,
                       default=None,
                       help='Number of examples to process (default: all)')
+    parser.add_argument('--refresh',
+                      action='store_true',
+                      help='Ask upstream (with a conditional request) whether the release has changed')
+    parser.add_argument('--version',
+                      type=str,
+                      default=None,
+                      help='Switch to an already downloaded version instead of fetching')
+    parser.add_argument('--force',
+                      action='store_true',
+                      help='Re-ingest even if the example store of this version already exists')
+    parser.add_argument('--compress',
+                      type=str,
+                      choices=['none'] + available_codecs(),
+                      default='gzip',
+                      help='Codec for newly stored raw files and the per-example JSON files (default: gzip)')
+    parser.add_argument('--progress',
+                      action='store_true',
+                      help='Show progress bars while writing example files and ingesting')
     args = parser.parse_args()
+    codec = None if args.compress == 'none' else args.compress
 
     # Define paths
     base_dir = Path(__file__).parent.parent
     raw_data_dir = base_dir / 'raw_data'
     processed_data_dir = base_dir / 'processed_data'
+    metrics_dir = base_dir / 'outputs' / 'ingest_metrics'
+    metrics = StageMetrics()
     
     # Determine which datasets to process
     if args.dataset == 'all':
@@ -129,6 +278,8 @@ def main():
         datasets_to_process = [DatasetType(args.dataset)]
     
     # Process each dataset
+    processed = []
+    switched = []
     for dataset_type in datasets_to_process:
         logger.info(f"\nProcessing {dataset_type.value} dataset...")
         
@@ -136,30 +287,53 @@ def main():
         input_url = DATASET_URLS[dataset_type]
         output_file = raw_data_dir / f"healthbench_{dataset_type.value}_data.jsonl"
         
-        # Check if the raw dataset already exists
-        if output_file.exists():
-            logger.info(f"Raw dataset {output_file} already exists. Skipping download.")
+        # Fetch the release (or switch to a stored one); output_file links to its blob
+        if args.version:
+            if args.version not in list_versions(raw_data_dir, dataset_type.value):
+                logger.error(f"Unknown {dataset_type.value} version {args.version}; known: {list_versions(raw_data_dir, dataset_type.value)}")
+                continue
+            if current_version(raw_data_dir, dataset_type.value) != args.version:
+                switched.append(dataset_type.value)
+            set_current_version(raw_data_dir, dataset_type.value, args.version)
+            version = args.version
         else:
-            # Download the data
-            download_data(input_url, output_file)
+            with metrics.stage(dataset_type.value, 'download') as stage:
+                version, downloaded = download_data(raw_data_dir, dataset_type.value, input_url, refresh=args.refresh, codec=codec)
+                if downloaded:
+                    stage['bytes'] = load_registry(raw_data_dir)[dataset_type.value]['versions'][version].get('size')
         
-        # Create dataset-specific output directory
-        output_dir = processed_data_dir / dataset_type.value
+        # Everything processed from this version goes in its own directory next to its store
+        output_dir = version_store_dir(processed_data_dir, dataset_type.value, version)
         output_dir.mkdir(parents=True, exist_ok=True)
         
+        if args.num_examples is None and not args.force and outputs_are_complete(output_dir, dataset_type.value, output_file.stem):
+            logger.info(f"Outputs of {dataset_type.value} version {version} already exist. Skipping processing.")
+            continue
+        
         # Process and save the data
-        process_and_save_data(
-            output_file, 
-            output_dir, 
-            output_file.stem,
-            args.num_examples
-        )
+        clear_outputs(output_dir, output_file.stem)
+        with metrics.stage(dataset_type.value, 'example_files') as stage:
+            stage['rows'] = save_examples(output_file, output_dir, output_file.stem, args.num_examples, codec, args.progress)
+        with metrics.stage(dataset_type.value, 'csv') as stage:
+            stage['rows'] = save_csv(output_file, output_dir, output_file.stem, args.num_examples)
+        if args.num_examples is None and not args.force and store_is_complete(store_path(output_dir, dataset_type.value)):
+            logger.info(f"Example store of {dataset_type.value} version {version} already exists. Skipping ingest.")
+        else:
+            build_store(output_file, output_dir, dataset_type.value, args.num_examples, version, metrics, args.progress)
+        processed.append(dataset_type.value)
         
         logger.info(f"Completed processing {dataset_type.value} dataset!")
     
-    # Run analysis scripts after processing
-    run_analysis_scripts()
+    # Run analysis scripts after processing; they read the current raw files, so only a
+    # reprocessed dataset or a switched version can change what they write
+    if processed or switched:
+        run_analysis_scripts(metrics)
+    else:
+        logger.info("No dataset changed. Skipping analysis scripts.")
     
+    metrics_file = metrics.save(metrics_dir)
+    summary = metrics.summary()
+    logger.info(f"Finished in {summary['total_seconds']:.1f}s (peak RSS {summary['peak_rss_mb']} MB); stage metrics saved to {metrics_file}")
     logger.info("\nAll data download and processing completed successfully!")
 
 if __name__ == "__main__":
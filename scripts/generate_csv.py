@@ -21,8 +21,8 @@ Example:
 """
 import sys
 from pathlib import Path
-sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
-from src.utils import jsonl_to_dataframe
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from utils import jsonl_to_csv
 
 def main():
     # Default input and output paths
@@ -35,12 +35,10 @@ def main():
     if len(sys.argv) > 2:
         output_path = Path(sys.argv[2])
 
-    print(f"Loading data from: {input_path}")
-    df = jsonl_to_dataframe(str(input_path))
-    print(f"Saving CSV to: {output_path}")
+    print(f"Streaming data from {input_path} to CSV: {output_path}")
     output_path.parent.mkdir(parents=True, exist_ok=True)
-    df.to_csv(output_path, index=False)
-    print(f"Done! Saved {len(df)} rows.")
+    rows_written = jsonl_to_csv(input_path, output_path)
+    print(f"Done! Saved {rows_written} rows.")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""
+Generate a synthetic HealthBench-shaped JSONL file.
+
+Usage:
+    python scripts/generate_synthetic_data.py --num_examples 100000 --output raw_data/synthetic_100k.jsonl
+
+The records follow the schema of the real releases (see src/synthetic_data.py),
+so every script and page can be pointed at them to find out how the app behaves
+at 5k to 1M examples.
+"""
+
+import argparse
+import logging
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from compression import available_codecs
+from synthetic_data import write_synthetic_jsonl
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Generate synthetic HealthBench data')
+    parser.add_argument('--num_examples', type=int, default=5000, help='Number of examples (default: 5000)')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed; the same seed gives the same file')
+    parser.add_argument('--compress', choices=['none'] + available_codecs(), default='none', help='Block-compress the output')
+    parser.add_argument('--output', type=Path, required=True, help='JSONL file to write')
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    write_synthetic_jsonl(args.output, args.num_examples, args.seed, None if args.compress == 'none' else args.compress)
+    logger.info(f"Wrote {args.num_examples:,} examples ({args.output.stat().st_size / 1e6:.1f} MB) to {args.output} in {time.perf_counter() - start:.1f}s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Grade model completions against HealthBench rubrics.
+
+Usage:
+    python scripts/grade_completions.py --dataset hard --completions my_model.jsonl --model my-model
+
+The completions file is JSONL with one {"prompt_id": ..., "completion": ...} per line.
+Grades are cached in outputs/grade_cache.sqlite, so re-running after a failure or
+after changing a few completions only calls the grader for the new pairs. Results
+are written to outputs/results/<model>.jsonl with one line per example.
+"""
+
+import argparse
+import json
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from grade_cache import GradeCache
+from grading import make_openai_grader
+from jsonl_reader import iter_jsonl
+from scoring import aggregate_scores, score_completions
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    base_dir = Path(__file__).resolve().parent.parent
+    parser = argparse.ArgumentParser(description='Grade model completions against HealthBench rubrics')
+    parser.add_argument('--dataset', type=str, choices=['default', 'hard', 'consensus'], default='default')
+    parser.add_argument('--completions', type=Path, required=True, help='JSONL of {"prompt_id", "completion"}')
+    parser.add_argument('--model', type=str, required=True, help='Name of the model that produced the completions')
+    parser.add_argument('--grader-model', type=str, default='gpt-4.1-2025-04-14')
+    parser.add_argument('--cache', type=Path, default=base_dir / 'outputs' / 'grade_cache.sqlite')
+    parser.add_argument('--output', type=Path, default=None, help='Results JSONL (default: outputs/results/<model>.jsonl)')
+    parser.add_argument('--max-workers', type=int, default=8)
+    args = parser.parse_args()
+
+    raw_path = base_dir / 'raw_data' / f'healthbench_{args.dataset}_data.jsonl'
+    examples = {ex['prompt_id']: ex for ex in iter_jsonl(raw_path, fields=['prompt_id', 'prompt', 'rubrics'])}
+    completions = {row['prompt_id']: row['completion'] for row in iter_jsonl(args.completions, fields=['prompt_id', 'completion'])}
+    unknown = set(completions) - set(examples)
+    if unknown:
+        logger.warning(f"Skipping {len(unknown)} completions whose prompt_id is not in the {args.dataset} dataset")
+        completions = {pid: c for pid, c in completions.items() if pid in examples}
+
+    grade_fn, grader_config = make_openai_grader(args.grader_model)
+    with GradeCache(args.cache) as cache:
+        results = score_completions(examples, completions, grade_fn, grader_config, cache=cache, max_workers=args.max_workers)
+        logger.info(f"Grade cache: {cache.stats()}")
+
+    output_path = args.output or base_dir / 'outputs' / 'results' / f'{args.model}.jsonl'
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        for result in results:
+            f.write(json.dumps({'model': args.model, 'dataset': args.dataset, **result}) + '\n')
+    logger.info(f"Overall score: {aggregate_scores([r['score'] for r in results])}")
+    logger.info(f"Saved {len(results)} results to {output_path}")
+
+
+if __name__ == '__main__':
+    main()
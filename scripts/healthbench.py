@@ -0,0 +1,22 @@
+#!/usr/bin/env python3
+"""
+Query the example stores from the command line.
+
+Usage:
+    python scripts/healthbench.py [--dataset hard] show <prompt_id> [--format text|markdown|json]
+    python scripts/healthbench.py search "dosage" [--scope criteria|conversations]
+    python scripts/healthbench.py filter --theme emergency_referrals --axis accuracy --max-points -5
+    python scripts/healthbench.py stats
+    python scripts/healthbench.py --dataset consensus export --rubrics --unique --format csv -o criteria.csv
+
+See src/cli.py for the commands. Run download_and_process.py first so the stores exist.
+"""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from cli import main
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+"""
+Serve the example stores as a local HTTP JSON API.
+
+Usage:
+    python scripts/serve_api.py [--host 127.0.0.1] [--port 8765] [--workers 8]
+
+    curl 'http://127.0.0.1:8765/datasets/hard/examples?theme=emergency_referrals&limit=5'
+
+See src/api.py for the routes. Run download_and_process.py first so the stores exist.
+"""
+
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+from api import HealthBenchApi, serve
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve HealthBench examples, rubrics and aggregates as a JSON API')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    parser.add_argument('--workers', type=int, default=8, help='Threads answering queries (default: 8)')
+    parser.add_argument('--processed-dir', type=Path, default=None, help='Directory with the example stores (default: processed_data)')
+    parser.add_argument('--verbose', action='store_true', help='Log every request')
+    args = parser.parse_args()
+    if args.verbose:
+        logging.getLogger('api').setLevel(logging.DEBUG)
+
+    try:
+        asyncio.run(serve(HealthBenchApi(args.processed_dir), args.host, args.port, args.workers))
+    except KeyboardInterrupt:
+        logger.info("Stopped")
+
+
+if __name__ == '__main__':
+    main()
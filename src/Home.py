@@ -1,5 +1,7 @@
 import streamlit as st
 from pathlib import Path
+from utils import performance_panel
+from instrumentation import end_rerun
 
 def load_markdown_content(page_name: str) -> str:
     content_path = Path(__file__).parent / 'content' / f'{page_name}.md'
@@ -11,6 +13,7 @@ def load_markdown_content(page_name: str) -> str:
 st.set_page_config(page_title="HealthBench Viewer", page_icon="🏥", layout="wide")
 
 st.title("HealthBench Dataset")
+performance_panel("Home")
 
 st.markdown("""
 ## Welcome to the HealthBench Viewer!
@@ -31,4 +34,6 @@ This app allows you to:
 _This tool is designed to help researchers, clinicians, and developers explore and analyze HealthBench data efficiently._
 """)
 
-st.markdown(load_markdown_content("intro")) 
\ No newline at end of file
+st.markdown(load_markdown_content("intro")) 
+
+end_rerun()
@@ -0,0 +1,297 @@
+"""
+HTTP JSON API over the example stores, for tools that need the viewer's data without Streamlit.
+
+Only the standard library is used: an asyncio server speaking HTTP/1.1 with
+keep-alive, with each request answered on a thread pool (ExampleStore gives
+every thread its own read-only SQLite connection). Run it with
+scripts/serve_api.py.
+
+Routes (GET or HEAD; `?version=` selects an ingested version, the current one by default):
+
+    /datasets                                         datasets with a store, their versions and sizes
+    /datasets/<dataset>/examples                      paginated summaries with theme and physician category facets
+        ?theme= &physician_category= &axis= &min_points= &max_points= &criterion_search= &text_search=
+        &criterion_id= &limit= (default 50, at most 1000) &offset=
+    /datasets/<dataset>/examples/<prompt_id>          the full example, in the raw JSONL shape
+    /datasets/<dataset>/examples/<prompt_id>/metrics  points metrics (total, max score, max penalty, per axis)
+    /datasets/<dataset>/search?q= &scope=criteria|conversations &limit=
+    /datasets/<dataset>/cubes/examples                the aggregate cubes of the analysis dashboard
+    /datasets/<dataset>/cubes/rubrics
+
+A response depends only on the URL and the store file, so its ETag is a hash of
+the URL and the store's size and mtime. A request whose If-None-Match matches
+gets a 304 before any query runs. Bodies over GZIP_MIN_BYTES are gzipped for
+clients that send Accept-Encoding: gzip.
+"""
+
+import asyncio
+import gzip
+import hashlib
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from data_versions import default_raw_dir, list_versions, version_store_dir
+from example_model import points_metrics
+from example_store import ExampleStore, store_path
+
+logger = logging.getLogger(__name__)
+
+DATASETS = ['default', 'hard', 'consensus']
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 1000
+GZIP_MIN_BYTES = 1024
+MAX_HEADER_BYTES = 64 * 1024
+REASONS = {200: 'OK', 304: 'Not Modified', 400: 'Bad Request', 404: 'Not Found', 405: 'Method Not Allowed', 500: 'Internal Server Error'}
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _int_param(query: Dict[str, str], name: str, default: int = None, minimum: int = None, maximum: int = None) -> Optional[int]:
+    if name not in query:
+        return default
+    try:
+        value = int(query[name])
+    except ValueError:
+        raise ApiError(400, f"{name} must be an integer")
+    if minimum is not None and value < minimum:
+        raise ApiError(400, f"{name} must be at least {minimum}")
+    return min(value, maximum) if maximum is not None else value
+
+
+class HealthBenchApi:
+    """Resolves requests to store queries. Transport-free, so it can be called directly (or from tests)."""
+
+    def __init__(self, processed_dir: Path = None, raw_dir: Path = None, datasets: List[str] = None):
+        self.processed_dir = Path(processed_dir or Path(__file__).resolve().parent.parent / 'processed_data')
+        self.raw_dir = Path(raw_dir or default_raw_dir())
+        self.datasets = datasets or DATASETS
+        self._stores = {}
+        self._lock = threading.Lock()
+
+    def store_file(self, dataset: str, version: str = None) -> Path:
+        if dataset not in self.datasets:
+            raise ApiError(404, f"Unknown dataset: {dataset}")
+        if version is not None and version not in list_versions(self.raw_dir, dataset):
+            raise ApiError(404, f"Unknown {dataset} version: {version}")
+        return store_path(version_store_dir(self.processed_dir, dataset, version, self.raw_dir), dataset)
+
+    def store(self, db_path: Path) -> ExampleStore:
+        """The open store at `db_path`, reopened if the file was rebuilt since."""
+        mtime = db_path.stat().st_mtime_ns
+        with self._lock:
+            cached = self._stores.get(db_path)
+            if cached is None or cached[0] != mtime:
+                cached = self._stores[db_path] = (mtime, ExampleStore(db_path))
+            return cached[1]
+
+    def etag(self, target: str, files: List[Path]) -> str:
+        h = hashlib.sha1(target.encode('utf-8'))
+        for path in files:
+            stat = path.stat()
+            h.update(f'{path}:{stat.st_size}:{stat.st_mtime_ns}'.encode('utf-8'))
+        return f'"{h.hexdigest()[:20]}"'
+
+    def respond(self, method: str, target: str, headers: Dict[str, str]) -> Tuple[int, Dict[str, str], bytes]:
+        """Answer one request: (status, response headers, body)."""
+        try:
+            if method not in ('GET', 'HEAD'):
+                raise ApiError(405, f"Method not allowed: {method}")
+            url = urlsplit(target)
+            parts = [unquote(p) for p in url.path.strip('/').split('/') if p]
+            query = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            files, handler = self.route(parts, query)
+            etag = self.etag(target, files)
+            if etag in [t.strip() for t in headers.get('if-none-match', '').split(',')]:
+                return 304, {'ETag': etag}, b''
+            status, payload = 200, handler()
+        except ApiError as e:
+            etag, status, payload = None, e.status, {'error': e.message}
+        except FileNotFoundError as e:
+            etag, status, payload = None, 404, {'error': f"Not ingested: {e.filename or e}"}
+        except Exception:
+            logger.exception(f"Error answering {method} {target}")
+            etag, status, payload = None, 500, {'error': 'Internal server error'}
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        response_headers = {'Content-Type': 'application/json; charset=utf-8', 'Vary': 'Accept-Encoding'}
+        if etag:
+            response_headers['ETag'] = etag
+            response_headers['Cache-Control'] = 'no-cache'
+        if len(body) >= GZIP_MIN_BYTES and 'gzip' in headers.get('accept-encoding', ''):
+            body = gzip.compress(body, compresslevel=5)
+            response_headers['Content-Encoding'] = 'gzip'
+        return status, response_headers, body
+
+    def route(self, parts: List[str], query: Dict[str, str]):
+        """(files the response depends on, zero-argument handler) for a path."""
+        if parts == ['datasets']:
+            files = [f for f in [self.raw_dir / 'registry.json'] + [self.store_file(d) for d in self.datasets] if f.exists()]
+            return files, self.list_datasets
+        if len(parts) < 3 or parts[0] != 'datasets':
+            raise ApiError(404, f"No route for /{'/'.join(parts)}")
+        db_path = self.store_file(parts[1], query.get('version'))
+        if not db_path.exists():
+            raise ApiError(404, f"{parts[1]} has not been ingested; run scripts/download_and_process.py")
+        store = self.store(db_path)
+        rest = parts[2:]
+        if rest == ['examples']:
+            return [db_path], lambda: self.list_examples(store, query)
+        if len(rest) == 2 and rest[0] == 'examples':
+            return [db_path], lambda: self.example(store, rest[1])
+        if len(rest) == 3 and rest[0] == 'examples' and rest[2] == 'metrics':
+            return [db_path], lambda: self.example_metrics(store, rest[1])
+        if rest == ['search']:
+            return [db_path], lambda: self.search(store, query)
+        if rest == ['cubes', 'examples']:
+            return [db_path], store.example_cube
+        if rest == ['cubes', 'rubrics']:
+            return [db_path], store.rubric_cube
+        raise ApiError(404, f"No route for /{'/'.join(parts)}")
+
+    def list_datasets(self) -> List[Dict[str, Any]]:
+        datasets = []
+        for dataset in self.datasets:
+            db_path = self.store_file(dataset)
+            if db_path.exists():
+                metadata = self.store(db_path).metadata()
+                datasets.append({
+                    'dataset': dataset,
+                    'version': metadata.get('version'),
+                    'versions': list_versions(self.raw_dir, dataset),
+                    'num_examples': metadata.get('num_examples'),
+                })
+        return datasets
+
+    def list_examples(self, store: ExampleStore, query: Dict[str, str]) -> Dict[str, Any]:
+        filters = {
+            'theme': query.get('theme'),
+            'physician_category': query.get('physician_category'),
+            'axis': query.get('axis'),
+            'criterion_search': query.get('criterion_search'),
+            'text_search': query.get('text_search'),
+            'min_points': _int_param(query, 'min_points'),
+            'max_points': _int_param(query, 'max_points'),
+            'criterion_ids': [query['criterion_id']] if query.get('criterion_id') else None,
+        }
+        limit = _int_param(query, 'limit', DEFAULT_LIMIT, minimum=1, maximum=MAX_LIMIT)
+        offset = _int_param(query, 'offset', 0, minimum=0)
+        return {
+            'total': store.count_examples(**filters),
+            'limit': limit,
+            'offset': offset,
+            'items': store.query_examples(limit=limit, offset=offset, **filters),
+            'facets': {column: store.facet_counts(column, **filters) for column in ('theme', 'physician_category')},
+        }
+
+    def _example(self, store: ExampleStore, prompt_id: str):
+        example = store.get_example(prompt_id)
+        if example is None:
+            raise ApiError(404, f"No example with prompt_id {prompt_id}")
+        return example
+
+    def example(self, store: ExampleStore, prompt_id: str) -> Dict[str, Any]:
+        return self._example(store, prompt_id).to_dict()
+
+    def example_metrics(self, store: ExampleStore, prompt_id: str) -> Dict[str, Any]:
+        return {'prompt_id': prompt_id, **points_metrics(self._example(store, prompt_id).rubrics)}
+
+    def search(self, store: ExampleStore, query: Dict[str, str]) -> Dict[str, Any]:
+        text = query.get('q', '').strip()
+        if not text:
+            raise ApiError(400, "q is required")
+        scope = query.get('scope', 'criteria')
+        limit = _int_param(query, 'limit', DEFAULT_LIMIT, minimum=1, maximum=MAX_LIMIT)
+        if scope == 'criteria':
+            items = store.search_criteria(text, limit=limit)
+        elif scope == 'conversations':
+            items = store.query_examples(text_search=text, limit=limit)
+        else:
+            raise ApiError(400, "scope must be 'criteria' or 'conversations'")
+        return {'q': text, 'scope': scope, 'items': items}
+
+
+async def _read_request(reader: asyncio.StreamReader):
+    """(method, target, version, lower-cased headers) of the next request, or None at end of stream."""
+    try:
+        head = await reader.readuntil(b'\r\n\r\n')
+    except asyncio.IncompleteReadError:
+        return None
+    except asyncio.LimitOverrunError:
+        raise ApiError(400, "Request headers too large")
+    lines = head.decode('latin-1').split('\r\n')
+    try:
+        method, target, version = lines[0].split(' ', 2)
+    except ValueError:
+        raise ApiError(400, "Malformed request line")
+    headers = {}
+    for line in lines[1:]:
+        if ':' in line:
+            name, value = line.split(':', 1)
+            headers[name.strip().lower()] = value.strip()
+    # GET and HEAD carry no body; anything else is drained so the connection stays usable
+    try:
+        length = int(headers.get('content-length', 0) or 0)
+    except ValueError:
+        raise ApiError(400, "Malformed Content-Length")
+    if length < 0:
+        raise ApiError(400, "Malformed Content-Length")
+    if length:
+        await reader.readexactly(length)
+    return method, target, version, headers
+
+
+def _write_response(writer: asyncio.StreamWriter, status: int, headers: Dict[str, str], body: bytes, keep_alive: bool, head_only: bool) -> None:
+    lines = [f'HTTP/1.1 {status} {REASONS.get(status, "")}']
+    headers = {**headers, 'Content-Length': str(len(body)), 'Connection': 'keep-alive' if keep_alive else 'close'}
+    lines += [f'{name}: {value}' for name, value in headers.items()]
+    writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+    if not head_only and status != 304:
+        writer.write(body)
+
+
+async def handle_connection(api: HealthBenchApi, executor: ThreadPoolExecutor, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except ApiError as e:
+                _write_response(writer, e.status, {'Content-Type': 'application/json'}, json.dumps({'error': e.message}).encode(), False, False)
+                break
+            if request is None:
+                break
+            method, target, version, headers = request
+            keep_alive = headers.get('connection', '').lower() != 'close' and version == 'HTTP/1.1'
+            status, response_headers, body = await loop.run_in_executor(executor, api.respond, method, target, headers)
+            logger.debug(f"{method} {target} {status}")
+            _write_response(writer, status, response_headers, body, keep_alive, method == 'HEAD')
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve(api: HealthBenchApi, host: str = '127.0.0.1', port: int = 8765, workers: int = 8) -> None:
+    """Serve `api` until cancelled."""
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='api')
+    server = await asyncio.start_server(
+        lambda reader, writer: handle_connection(api, executor, reader, writer), host, port, limit=MAX_HEADER_BYTES,
+    )
+    logger.info(f"Serving HealthBench API on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        executor.shutdown(wait=False)
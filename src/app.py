@@ -12,7 +12,7 @@ st.title("HealthBench Analysis")
 
 # Navigation
 st.sidebar.title("Navigation")
-page = st.sidebar.radio("Go to", ["Home", "Main Analysis", "Penalty Only Dataset", "Data Explorer"])
+page = st.sidebar.radio("Go to", ["Home", "Main Analysis", "Penalty Only Dataset", "Data Explorer", "Model Comparison", "Criterion Taxonomy", "Co-occurrence", "Dataset Diff"])
 
 # Load the appropriate page based on user selection
 if page == "Home":
@@ -22,4 +22,12 @@ elif page == "Main Analysis":
 elif page == "Penalty Only Dataset":
     import pages.penalty_only_dataset
 elif page == "Data Explorer":
-    import pages.data_explorer 
\ No newline at end of file
+    import pages.data_explorer
+elif page == "Model Comparison":
+    import pages.model_comparison 
+elif page == "Criterion Taxonomy":
+    import pages.taxonomy_browser
+elif page == "Co-occurrence":
+    import pages.cooccurrence
+elif page == "Dataset Diff":
+    import pages.dataset_diff
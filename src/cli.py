@@ -0,0 +1,251 @@
+"""
+Command-line queries over the example stores (run it as scripts/healthbench.py).
+
+Commands:
+    show <prompt_id>     one example as text, Markdown or JSON
+    search <text>        full-text search over rubric criteria or conversations
+    filter               examples matching the Data Explorer filters, paginated
+    stats                counts by theme, physician category and axis; most reused criteria
+    export               matching examples (JSONL) or their rubric items (JSONL/CSV)
+
+A lookup runs a few indexed queries on the store written by
+download_and_process.py instead of loading the dataset. The store modules are
+imported only after the arguments are parsed, and nothing here imports pandas,
+streamlit or plotly; the store modules defer their codecs, hashlib and the text
+store, and argparse is kept from importing shutil. A lookup takes about 70 ms
+including interpreter start, or about 90 ms when bytecode cannot be cached (see
+scripts/benchmarks/bench_cli.py).
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+FILTER_ARGS = ('theme', 'physician_category', 'axis', 'min_points', 'max_points', 'criterion_search', 'text_search')
+TABLE_COLUMNS = ['prompt_id', 'theme', 'physician_category', 'n_turns', 'n_criteria', 'total_points']
+RUBRIC_COLUMNS = ['prompt_id', 'theme', 'physician_category', 'axis', 'criterion', 'points']
+
+
+def open_store(args):
+    from data_versions import version_store_dir
+    from example_store import ExampleStore, store_path
+
+    processed_dir = args.processed_dir or Path(__file__).resolve().parent.parent / 'processed_data'
+    path = store_path(version_store_dir(processed_dir, args.dataset, args.version), args.dataset)
+    if not path.exists():
+        sys.exit(f"No example store for dataset '{args.dataset}' at {path}; run scripts/download_and_process.py --dataset {args.dataset} first")
+    return ExampleStore(path)
+
+
+def filters(args):
+    return {name: getattr(args, name) for name in FILTER_ARGS if getattr(args, name) is not None}
+
+
+def print_json(value) -> None:
+    import json
+    json.dump(value, sys.stdout, indent=2, ensure_ascii=False)
+    sys.stdout.write('\n')
+
+
+def print_table(rows, columns, max_width: int = 60) -> None:
+    """Rows as left-aligned columns, cutting cells longer than `max_width`."""
+    cells = [[str(row.get(c, '')) for c in columns] for row in rows]
+    cells = [[c if len(c) <= max_width else c[:max_width - 1] + '…' for c in line] for line in cells]
+    widths = [max([len(c)] + [len(line[i]) for line in cells]) for i, c in enumerate(columns)]
+    for line in [columns] + cells:
+        print('  '.join(cell.ljust(width) for cell, width in zip(line, widths)).rstrip())
+
+
+def show(args) -> None:
+    with open_store(args) as store:
+        example = store.get_example(args.prompt_id)
+        if example is None:
+            sys.exit(f"No example with prompt_id '{args.prompt_id}' in dataset '{args.dataset}'")
+        if args.format == 'json':
+            print_json(example.to_dict())
+            return
+        from example_text import example_markdown, example_text
+        text = example_markdown(example, args.dataset) if args.format == 'markdown' else example_text(example)
+    if args.output:
+        args.output.write_text(text)
+        print(f"Saved to {args.output}", file=sys.stderr)
+    else:
+        sys.stdout.write(text)
+
+
+def search(args) -> None:
+    with open_store(args) as store:
+        if args.scope == 'criteria':
+            rows, columns = store.search_criteria(args.text, limit=args.limit), ['prompt_id', 'theme', 'axis', 'points', 'criterion']
+        else:
+            rows, columns = store.query_examples(text_search=args.text, limit=args.limit), TABLE_COLUMNS
+    if args.format == 'json':
+        print_json(rows)
+    elif not rows:
+        print(f"No {'rubric items' if args.scope == 'criteria' else 'examples'} match '{args.text}'")
+    else:
+        print_table(rows, columns)
+        print(f"\n{len(rows)} matching {'rubric items' if args.scope == 'criteria' else 'examples'}" + (f" (--limit {args.limit})" if len(rows) == args.limit else ''))
+
+
+def filter_examples(args) -> None:
+    with open_store(args) as store:
+        rows = store.query_examples(**filters(args), limit=args.limit, offset=args.offset)
+        total = store.count_examples(**filters(args))
+    if args.format == 'json':
+        print_json({'total': total, 'offset': args.offset, 'examples': rows})
+    elif args.format == 'ids':
+        for row in rows:
+            print(row['prompt_id'])
+    else:
+        print_table(rows, TABLE_COLUMNS)
+        print(f"\n{len(rows)} of {total} matching examples (offset {args.offset})")
+
+
+def stats(args) -> None:
+    with open_store(args) as store:
+        axes = {}
+        for cell in store.rubric_cube():
+            axis = axes.setdefault(cell['axis'] or 'Unspecified', {'n_rubrics': 0, 'positive': 0, 'negative': 0})
+            axis['n_rubrics'] += cell['n_rubrics']
+            axis['positive' if cell['points'] >= 0 else 'negative'] += cell['n_rubrics']
+        result = {
+            'dataset': args.dataset,
+            'version': store.metadata().get('version'),
+            'n_examples': store.count(),
+            'n_rubrics': sum(a['n_rubrics'] for a in axes.values()),
+            'themes': store.facet_counts('theme'),
+            'physician_categories': store.facet_counts('physician_category'),
+            'axes': dict(sorted(axes.items())),
+            'top_criteria': [
+                {'criterion_id': c['criterion_id'], 'n_examples': c['n_examples'], 'criterion': c['criterion']}
+                for c in store.top_criteria(args.top)
+            ],
+        }
+    if args.format == 'json':
+        print_json(result)
+        return
+    print(f"Dataset {result['dataset']} (version {result['version'] or 'unversioned'}): "
+          f"{result['n_examples']} examples, {result['n_rubrics']} rubric items")
+    for title, counts in (('Themes', result['themes']), ('Physician categories', result['physician_categories'])):
+        print(f"\n{title}")
+        print_table([{'value': value or '-', 'examples': n} for value, n in counts.items()], ['value', 'examples'])
+    print('\nAxes')
+    print_table([{'axis': axis, **counts} for axis, counts in result['axes'].items()], ['axis', 'n_rubrics', 'positive', 'negative'])
+    print('\nMost reused criteria')
+    print_table(result['top_criteria'], ['n_examples', 'criterion'], max_width=90)
+
+
+def export(args) -> None:
+    import csv
+    import json
+
+    out = open(args.output, 'w', newline='') if args.output else sys.stdout
+    n = 0
+    try:
+        with open_store(args) as store:
+            if args.rubrics:
+                rows = store.rubric_rows(**filters(args))
+                if args.unique:
+                    rows = unique_rows(rows, RUBRIC_COLUMNS[1:])
+                columns = RUBRIC_COLUMNS[1:] if args.unique else RUBRIC_COLUMNS
+            else:
+                rows = store.query_examples(**filters(args), limit=args.limit)
+                columns = TABLE_COLUMNS + ['max_possible_score', 'max_possible_penalty']
+            if args.format == 'csv':
+                writer = csv.DictWriter(out, columns, extrasaction='ignore')
+                writer.writeheader()
+                for n, row in enumerate(rows, start=1):
+                    writer.writerow(row)
+            else:
+                for n, row in enumerate(rows, start=1):
+                    # Examples are written whole, in the shape of the raw JSONL
+                    record = row if args.rubrics else store.get_example(row['prompt_id']).to_dict()
+                    out.write(json.dumps(record, ensure_ascii=False) + '\n')
+    finally:
+        if out is not sys.stdout:
+            out.close()
+    print(f"Exported {n} {'rubric items' if args.rubrics else 'examples'}" + (f" to {args.output}" if args.output else ''), file=sys.stderr)
+
+
+def unique_rows(rows, columns):
+    """Distinct rows over `columns`, sorted by them (as the consensus criteria table is)."""
+    seen = {tuple(row[c] for c in columns) for row in rows}
+    for key in sorted(seen, key=lambda k: tuple('' if v is None else str(v) for v in k)):
+        yield dict(zip(columns, key))
+
+
+class HelpFormatter(argparse.HelpFormatter):
+    """argparse's formatter, sized from COLUMNS or the terminal without importing shutil (and with it bz2 and lzma)."""
+
+    def __init__(self, prog, **kwargs):
+        if kwargs.get('width') is None:
+            try:
+                columns = int(os.environ['COLUMNS'])
+            except (KeyError, ValueError):
+                try:
+                    columns = os.get_terminal_size(sys.__stdout__.fileno()).columns
+                except (AttributeError, ValueError, OSError):
+                    columns = 80
+            kwargs['width'] = columns - 2
+        super().__init__(prog, **kwargs)
+
+
+def add_filter_args(parser) -> None:
+    parser.add_argument('--theme', help='Example theme, e.g. emergency_referrals')
+    parser.add_argument('--physician-category', dest='physician_category', help='Physician-agreed category')
+    parser.add_argument('--axis', help='A rubric item on this axis, e.g. accuracy')
+    parser.add_argument('--min-points', dest='min_points', type=int, help='A rubric item worth at least this many points')
+    parser.add_argument('--max-points', dest='max_points', type=int, help='A rubric item worth at most this many points')
+    parser.add_argument('--criterion', dest='criterion_search', help='A rubric item whose criterion contains this text')
+    parser.add_argument('--text', dest='text_search', help='A conversation turn containing this text')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Look up, search, filter and export HealthBench examples from the indexed stores', formatter_class=HelpFormatter)
+    parser.add_argument('--dataset', default='default', help='Dataset to query (default: default)')
+    parser.add_argument('--version', default=None, help='Dataset version (default: the current version)')
+    parser.add_argument('--processed-dir', type=Path, default=None, help='Directory with the example stores (default: processed_data)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    p = commands.add_parser('show', help='Print one example', formatter_class=HelpFormatter)
+    p.add_argument('prompt_id')
+    p.add_argument('--format', choices=['text', 'markdown', 'json'], default='text')
+    p.add_argument('-o', '--output', type=Path, help='Write to this file instead of stdout')
+    p.set_defaults(run=show)
+
+    p = commands.add_parser('search', help='Full-text search over rubric criteria or conversations', formatter_class=HelpFormatter)
+    p.add_argument('text')
+    p.add_argument('--scope', choices=['criteria', 'conversations'], default='criteria')
+    p.add_argument('--limit', type=int, default=20)
+    p.add_argument('--format', choices=['table', 'json'], default='table')
+    p.set_defaults(run=search)
+
+    p = commands.add_parser('filter', help='List the examples matching the Data Explorer filters', formatter_class=HelpFormatter)
+    add_filter_args(p)
+    p.add_argument('--limit', type=int, default=50)
+    p.add_argument('--offset', type=int, default=0)
+    p.add_argument('--format', choices=['table', 'json', 'ids'], default='table')
+    p.set_defaults(run=filter_examples)
+
+    p = commands.add_parser('stats', help='Counts by theme, physician category and axis, and the most reused criteria', formatter_class=HelpFormatter)
+    p.add_argument('--top', type=int, default=10, help='Number of most reused criteria to list (default: 10)')
+    p.add_argument('--format', choices=['text', 'json'], default='text')
+    p.set_defaults(run=stats)
+
+    p = commands.add_parser('export', help='Write the matching examples or their rubric items as JSONL or CSV', formatter_class=HelpFormatter)
+    add_filter_args(p)
+    p.add_argument('--rubrics', action='store_true', help='One row per rubric item instead of per example')
+    p.add_argument('--unique', action='store_true', help='With --rubrics, distinct (theme, category, axis, criterion, points) rows only')
+    p.add_argument('--limit', type=int, default=None, help='At most this many examples (ignored with --rubrics)')
+    p.add_argument('--format', choices=['jsonl', 'csv'], default='jsonl')
+    p.add_argument('-o', '--output', type=Path, help='Write to this file instead of stdout')
+    p.set_defaults(run=export)
+
+    args = parser.parse_args()
+    try:
+        args.run(args)
+    except BrokenPipeError:
+        # Output piped into head or similar
+        sys.stderr.close()
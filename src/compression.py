@@ -0,0 +1,188 @@
+"""
+Block-compressed JSONL and transparent decompression.
+
+A block-compressed file is a sequence of independent gzip members (or zstd
+frames) that each hold whole lines, about BLOCK_BYTES of them uncompressed. Any
+gzip/zstd tool reads it as one ordinary compressed file, and a sidecar index
+(`<file>.idx`, JSON) records where every block starts:
+
+    {"codec": "gzip", "blocks": [[compressed_offset, uncompressed_offset, n_lines], ...],
+     "compressed_size": ..., "uncompressed_size": ..., "n_lines": ...}
+
+so a reader can seek to any block and decompress only what it needs; the
+sharded JSONL reader splits work on block boundaries instead of newlines.
+
+Compression is detected from the file's magic bytes rather than its name, so a
+raw dataset link keeps its `.jsonl` name whichever codec its blob uses. gzip is
+always available; zstd needs the optional `zstandard` package.
+"""
+
+import functools
+import gzip
+import io
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, IO, Iterator, List, Optional
+
+BLOCK_BYTES = 1024 * 1024
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+SUFFIXES = {'gzip': '.gz', 'zstd': '.zst'}
+
+
+@functools.lru_cache(maxsize=None)
+def _zstandard():
+    """The zstandard module, or None if it is not installed. Imported on first use, as it is slow to import."""
+    try:
+        import zstandard
+    except ImportError:
+        return None
+    return zstandard
+
+
+def available_codecs() -> List[str]:
+    return ['gzip'] + (['zstd'] if _zstandard() is not None else [])
+
+
+def detect_codec(path: Path) -> Optional[str]:
+    """'gzip', 'zstd' or None (uncompressed), from the first bytes of the file."""
+    with open(path, 'rb') as f:
+        head = f.read(4)
+    if head.startswith(GZIP_MAGIC):
+        return 'gzip'
+    if head == ZSTD_MAGIC:
+        return 'zstd'
+    return None
+
+
+def _require(codec: str) -> None:
+    if codec not in SUFFIXES:
+        raise ValueError(f"Unknown codec: {codec}")
+    if codec == 'zstd' and _zstandard() is None:
+        raise ImportError("zstd compression needs the zstandard package (pip install zstandard)")
+
+
+def compress_bytes(data: bytes, codec: str, level: int = None) -> bytes:
+    """Compress `data` as one self-contained gzip member or zstd frame."""
+    _require(codec)
+    if codec == 'gzip':
+        return gzip.compress(data, compresslevel=6 if level is None else level, mtime=0)
+    return _zstandard().ZstdCompressor(level=3 if level is None else level).compress(data)
+
+
+def decompress_bytes(data: bytes, codec: str) -> bytes:
+    """Decompress one or more concatenated gzip members or zstd frames."""
+    _require(codec)
+    if codec == 'gzip':
+        return gzip.decompress(data)
+    with _zstandard().ZstdDecompressor().stream_reader(io.BytesIO(data), read_across_frames=True) as reader:
+        return reader.read()
+
+
+def open_binary(path: Path) -> IO[bytes]:
+    """Open a file for reading, decompressing it as a stream if it is gzip or zstd compressed."""
+    codec = detect_codec(path)
+    if codec is None:
+        return open(path, 'rb')
+    _require(codec)
+    if codec == 'gzip':
+        return gzip.open(path, 'rb')
+    # Buffered so that iterating yields lines
+    raw = open(path, 'rb')
+    return io.BufferedReader(_zstandard().ZstdDecompressor().stream_reader(raw, read_across_frames=True, closefd=True))
+
+
+def index_path(path: Path) -> Path:
+    """Sidecar block index of a compressed file (next to the real file if `path` is a link)."""
+    path = Path(path).resolve()
+    return path.with_name(path.name + '.idx')
+
+
+def read_block_index(path: Path) -> Optional[Dict[str, Any]]:
+    """The block index of a block-compressed file, or None if it has none."""
+    idx = index_path(path)
+    if not idx.exists():
+        return None
+    with open(idx, 'r') as f:
+        return json.load(f)
+
+
+def _write_index(path: Path, index: Dict[str, Any]) -> None:
+    idx = index_path(path)
+    tmp_path = idx.with_name(idx.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(index, f)
+    os.replace(tmp_path, idx)
+
+
+def compress_lines(lines: Iterator[bytes], target: Path, codec: str = 'gzip', block_bytes: int = BLOCK_BYTES) -> Dict[str, Any]:
+    """Write newline-terminated lines to `target` as a block-compressed file and index it; returns the index."""
+    _require(codec)
+    target = Path(target)
+    blocks = []
+    compressed_offset = uncompressed_offset = n_lines = 0
+    with open(target, 'wb') as out:
+        pending, pending_bytes, pending_lines = [], 0, 0
+
+        def flush():
+            nonlocal compressed_offset, uncompressed_offset, n_lines
+            data = b''.join(pending)
+            blocks.append([compressed_offset, uncompressed_offset, pending_lines])
+            compressed = compress_bytes(data, codec)
+            out.write(compressed)
+            compressed_offset += len(compressed)
+            uncompressed_offset += len(data)
+            n_lines += pending_lines
+
+        for line in lines:
+            if not line.endswith(b'\n'):
+                line += b'\n'
+            pending.append(line)
+            pending_bytes += len(line)
+            pending_lines += line.strip() != b''
+            if pending_bytes >= block_bytes:
+                flush()
+                pending, pending_bytes, pending_lines = [], 0, 0
+        if pending:
+            flush()
+    index = {
+        'codec': codec,
+        'blocks': blocks,
+        'compressed_size': compressed_offset,
+        'uncompressed_size': uncompressed_offset,
+        'n_lines': n_lines,
+    }
+    _write_index(target, index)
+    return index
+
+
+def compress_file(source: Path, target: Path, codec: str = 'gzip', block_bytes: int = BLOCK_BYTES) -> Dict[str, Any]:
+    """Block-compress a (possibly already compressed) JSONL file into `target`."""
+    with open_binary(source) as f:
+        return compress_lines(f, target, codec, block_bytes)
+
+
+def block_ranges(index: Dict[str, Any]) -> List[List[int]]:
+    """(start, end) compressed byte range of every block."""
+    starts = [block[0] for block in index['blocks']]
+    return [[start, end] for start, end in zip(starts, starts[1:] + [index['compressed_size']])]
+
+
+def iter_block_lines(path: Path, start: int, end: int, index: Dict[str, Any] = None) -> Iterator[bytes]:
+    """Yield the lines of the blocks whose compressed offset lies in [start, end)."""
+    index = index or read_block_index(path)
+    codec = index['codec']
+    with open(path, 'rb') as f:
+        for block_start, block_end in block_ranges(index):
+            if block_start < start or block_start >= end:
+                continue
+            f.seek(block_start)
+            data = decompress_bytes(f.read(block_end - block_start), codec)
+            yield from data.splitlines(keepends=True)
+
+
+def count_block_lines(path: Path, start: int, end: int, index: Dict[str, Any] = None) -> int:
+    """Number of non-blank lines in the blocks starting within [start, end), read from the index."""
+    index = index or read_block_index(path)
+    return sum(block[2] for block in index['blocks'] if start <= block[0] < end)
@@ -0,0 +1,191 @@
+"""
+Near-duplicate clustering of rubric criteria with MinHash and locality-sensitive hashing.
+
+Each criterion (as catalogued by the example stores, see example_store.criterion_id)
+is reduced to a MinHash signature over the character 5-grams of its normalized text.
+Signatures are split into bands; criteria that share any band land in the same
+bucket and become candidates, and a candidate is joined to its bucket's first
+member when their estimated Jaccard similarity reaches the threshold. Clusters
+are the connected components of those links. Work is linear in the number of
+criteria, instead of comparing every pair.
+
+Signatures are persisted in an index directory, so adding a new dataset or a new
+release only computes signatures for criteria that were not indexed before.
+Re-adding a dataset replaces its counts, so criteria a new release dropped leave
+the index once no dataset uses them:
+
+    signatures.npy   uint32, one row of NUM_PERM hash minima per criterion
+    criteria.json    criterion id, text and example counts per dataset, in row order
+    versions.json    the raw data version each dataset was last added from
+    clusters.json    the clusters of the last run, read by the Data Explorer
+"""
+
+import json
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+
+from example_store import normalize_criterion
+
+NUM_PERM = 128
+BANDS = 32
+SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.6
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+# Fixed seed: signatures stay comparable across runs, which incremental updates rely on
+_rng = np.random.RandomState(1)
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def index_dir_for(base_dir: Path = None) -> Path:
+    """Default location of the cluster index."""
+    if base_dir is None:
+        base_dir = Path(__file__).resolve().parent.parent
+    return base_dir / 'outputs' / 'criterion_clusters'
+
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Character n-grams of the normalized text (the whole text if it is shorter)."""
+    text = normalize_criterion(text)
+    if len(text) <= size:
+        return [text]
+    return [text[i:i + size] for i in range(len(text) - size + 1)]
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature of a criterion: the minimum of each of NUM_PERM hash permutations over its shingles."""
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in set(shingles(text))), dtype=np.uint64)
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME & _MAX_HASH
+    return permuted.min(axis=1).astype(np.uint32)
+
+
+class _DisjointSet:
+    def __init__(self, n: int):
+        self.parent = list(range(n))
+
+    def find(self, i: int) -> int:
+        while self.parent[i] != i:
+            self.parent[i] = self.parent[self.parent[i]]
+            i = self.parent[i]
+        return i
+
+    def union(self, i: int, j: int) -> None:
+        ri, rj = self.find(i), self.find(j)
+        if ri != rj:
+            self.parent[max(ri, rj)] = min(ri, rj)
+
+
+class CriterionClusterIndex:
+    """MinHash signatures of every indexed criterion, with LSH clustering on top."""
+
+    def __init__(self, index_dir: Path):
+        self.index_dir = Path(index_dir)
+        self.criteria: List[Dict[str, Any]] = []
+        self.signatures = np.empty((0, NUM_PERM), dtype=np.uint32)
+        self.versions: Dict[str, Optional[str]] = {}
+        if (self.index_dir / 'criteria.json').exists():
+            with open(self.index_dir / 'criteria.json', 'r') as f:
+                self.criteria = json.load(f)
+            self.signatures = np.load(self.index_dir / 'signatures.npy')
+        if (self.index_dir / 'versions.json').exists():
+            with open(self.index_dir / 'versions.json', 'r') as f:
+                self.versions = json.load(f)
+        self._row_of = {c['criterion_id']: i for i, c in enumerate(self.criteria)}
+
+    def add(self, criteria: Iterable[Dict[str, Any]], dataset: str, version: str = None) -> int:
+        """
+        Index catalog entries (dicts with criterion_id, criterion and n_examples) of one dataset, as of `version`.
+
+        The dataset's earlier counts are replaced, and criteria no dataset uses any
+        more are dropped. Only criteria not seen before get a signature; returns how
+        many those were.
+        """
+        for entry in self.criteria:
+            entry['datasets'].pop(dataset, None)
+        new_rows = []
+        for entry in criteria:
+            row = self._row_of.get(entry['criterion_id'])
+            if row is None:
+                row = len(self.criteria)
+                self._row_of[entry['criterion_id']] = row
+                self.criteria.append({'criterion_id': entry['criterion_id'], 'criterion': entry['criterion'], 'datasets': {}})
+                new_rows.append(minhash_signature(entry['criterion']))
+            self.criteria[row]['datasets'][dataset] = entry['n_examples']
+        if new_rows:
+            self.signatures = np.vstack([self.signatures, np.stack(new_rows)])
+        self.versions[dataset] = version
+        self._drop_unused()
+        return len(new_rows)
+
+    def _drop_unused(self) -> None:
+        """Remove the criteria (and their signatures) that no dataset uses."""
+        keep = [i for i, c in enumerate(self.criteria) if c['datasets']]
+        if len(keep) == len(self.criteria):
+            return
+        self.criteria = [self.criteria[i] for i in keep]
+        self.signatures = self.signatures[keep]
+        self._row_of = {c['criterion_id']: i for i, c in enumerate(self.criteria)}
+
+    def save(self) -> None:
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        np.save(self.index_dir / 'signatures.npy', self.signatures)
+        with open(self.index_dir / 'criteria.json', 'w') as f:
+            json.dump(self.criteria, f)
+        with open(self.index_dir / 'versions.json', 'w') as f:
+            json.dump(self.versions, f)
+
+    def clusters(self, threshold: float = DEFAULT_THRESHOLD) -> List[List[int]]:
+        """Groups of two or more near-duplicate criteria (row numbers), largest first."""
+        n = len(self.criteria)
+        components = _DisjointSet(n)
+        rows_per_band = NUM_PERM // BANDS
+        for band in range(BANDS):
+            keys = np.ascontiguousarray(self.signatures[:, band * rows_per_band:(band + 1) * rows_per_band])
+            _, bucket, sizes = np.unique(keys.view(np.dtype((np.void, keys.dtype.itemsize * rows_per_band))).ravel(), return_inverse=True, return_counts=True)
+            shared = sizes[bucket] > 1
+            if not shared.any():
+                continue
+            rows = np.flatnonzero(shared)
+            order = np.argsort(bucket[rows], kind='stable')
+            rows, buckets = rows[order], bucket[rows][order]
+            starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+            for members in np.split(rows, starts[1:]):
+                leader = members[0]
+                similarity = (self.signatures[members[1:]] == self.signatures[leader]).mean(axis=1)
+                for member in members[1:][similarity >= threshold]:
+                    components.union(leader, int(member))
+        groups: Dict[int, List[int]] = {}
+        for i in range(n):
+            groups.setdefault(components.find(i), []).append(i)
+        return sorted((g for g in groups.values() if len(g) > 1), key=len, reverse=True)
+
+    def write_clusters(self, threshold: float = DEFAULT_THRESHOLD) -> List[Dict[str, Any]]:
+        """Cluster the index, save the result as clusters.json and return it."""
+        result = []
+        for cluster_id, rows in enumerate(self.clusters(threshold)):
+            members = [self.criteria[i] for i in rows]
+            members.sort(key=lambda c: sum(c['datasets'].values()), reverse=True)
+            result.append({
+                'cluster_id': cluster_id,
+                'label': members[0]['criterion'],
+                'datasets': sorted({d for c in members for d in c['datasets']}),
+                'members': members,
+            })
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        with open(self.index_dir / 'clusters.json', 'w') as f:
+            json.dump({'threshold': threshold, 'clusters': result}, f)
+        return result
+
+
+def load_clusters(index_dir: Path) -> List[Dict[str, Any]]:
+    """Clusters written by the last run, or an empty list."""
+    path = Path(index_dir) / 'clusters.json'
+    if not path.exists():
+        return []
+    with open(path, 'r') as f:
+        return json.load(f)['clusters']
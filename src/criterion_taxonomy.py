@@ -0,0 +1,148 @@
+"""
+Rubric taxonomy: clusters of criteria by topic, from sparse TF-IDF vectors and mini-batch k-means.
+
+Every distinct criterion of the example stores is vectorized into a sparse TF-IDF
+matrix, and MiniBatchKMeans is fitted with partial_fit over row slices of it, so
+the matrix is never densified and memory grows with the batch size and the
+number of clusters rather than with the corpus. Clusters are labelled with the
+highest-weighted terms of their centroid.
+
+The fitted model and the assignments are cached in outputs/criterion_taxonomy/:
+
+    model.joblib    fitted TfidfVectorizer and MiniBatchKMeans
+    criteria.csv    one row per (dataset, criterion, axis, points) with its cluster
+    clusters.json   cluster labels and sizes
+    meta.json       fit parameters and a key of the criterion usage, to reuse the cache
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+from data_versions import version_store_dir
+from example_store import ExampleStore, store_path
+
+DEFAULT_CLUSTERS = 40
+DEFAULT_BATCH_SIZE = 4096
+N_EPOCHS = 3
+N_LABEL_TERMS = 5
+MIN_DF_CORPUS_SIZE = 1000
+
+
+def taxonomy_dir_for(base_dir: Path = None) -> Path:
+    """Default location of the taxonomy cache."""
+    if base_dir is None:
+        base_dir = Path(__file__).resolve().parent.parent
+    return base_dir / 'outputs' / 'criterion_taxonomy'
+
+
+def collect_criterion_usage(processed_dir: Path, datasets: Sequence[str]) -> pd.DataFrame:
+    """Criterion usage rows (see ExampleStore.criterion_usage) of the current version of every dataset whose store exists."""
+    frames = []
+    for dataset in datasets:
+        db_path = store_path(version_store_dir(processed_dir, dataset), dataset)
+        if not db_path.exists():
+            continue
+        with ExampleStore(db_path) as store:
+            df = pd.DataFrame(store.criterion_usage())
+        df.insert(0, 'dataset', dataset)
+        frames.append(df)
+    if not frames:
+        return pd.DataFrame(columns=['dataset', 'criterion_id', 'criterion', 'axis', 'points', 'n_examples'])
+    return pd.concat(frames, ignore_index=True)
+
+
+def fit_taxonomy(texts: Sequence[str], n_clusters: int = DEFAULT_CLUSTERS, batch_size: int = DEFAULT_BATCH_SIZE,
+                 random_state: int = 0) -> Tuple[TfidfVectorizer, MiniBatchKMeans, np.ndarray]:
+    """Fit the vectorizer and k-means on `texts`; returns both and the cluster of each text."""
+    # Terms used by a single criterion say nothing about clusters and would widen every centroid
+    min_df = 2 if len(texts) >= MIN_DF_CORPUS_SIZE else 1
+    vectorizer = TfidfVectorizer(stop_words='english', ngram_range=(1, 2), min_df=min_df, sublinear_tf=True, dtype=np.float32)
+    matrix = vectorizer.fit_transform(texts)
+    n_clusters = min(n_clusters, matrix.shape[0])
+    # partial_fit needs at least n_clusters rows, so smaller batches could never fit the model
+    batch_size = max(batch_size, n_clusters)
+    kmeans = MiniBatchKMeans(n_clusters=n_clusters, batch_size=batch_size, random_state=random_state)
+    order = np.random.RandomState(random_state).permutation(matrix.shape[0])
+    for _ in range(N_EPOCHS):
+        for start in range(0, len(order), batch_size):
+            rows = order[start:start + batch_size]
+            # partial_fit needs at least n_clusters rows, so a short final slice is skipped
+            if len(rows) >= n_clusters:
+                kmeans.partial_fit(matrix[rows])
+    labels = np.concatenate([
+        kmeans.predict(matrix[start:start + batch_size]) for start in range(0, matrix.shape[0], batch_size)
+    ]) if matrix.shape[0] else np.empty(0, dtype=np.int32)
+    return vectorizer, kmeans, labels
+
+
+def top_terms(vectorizer: TfidfVectorizer, kmeans: MiniBatchKMeans, n: int = N_LABEL_TERMS) -> List[List[str]]:
+    """The `n` highest-weighted terms of each cluster centroid."""
+    terms = vectorizer.get_feature_names_out()
+    return [[terms[i] for i in np.argsort(center)[::-1][:n]] for center in kmeans.cluster_centers_]
+
+
+def _cache_key(usage: pd.DataFrame, n_clusters: int, batch_size: int, random_state: int) -> str:
+    """
+    Digest of the fit parameters and every usage row, not only the criterion ids.
+
+    criteria.csv carries each criterion's per-dataset axis, points and example
+    counts, so a release that changes those under the same ids must refit.
+    """
+    digest = hashlib.sha1()
+    columns = ['dataset', 'criterion_id', 'criterion', 'axis', 'points', 'n_examples']
+    for row in usage[columns].sort_values(columns).itertuples(index=False):
+        digest.update(json.dumps(list(row), default=str).encode('utf-8'))
+    digest.update(f'{n_clusters}:{batch_size}:{random_state}'.encode('ascii'))
+    return digest.hexdigest()
+
+
+def build_taxonomy(usage: pd.DataFrame, out_dir: Path, n_clusters: int = DEFAULT_CLUSTERS, batch_size: int = DEFAULT_BATCH_SIZE,
+                   random_state: int = 0, force: bool = False) -> bool:
+    """
+    Fit the taxonomy on the distinct criteria in `usage` and write the cache to `out_dir`.
+
+    Returns False without refitting when the cache already covers the same criterion usage and parameters.
+    """
+    out_dir = Path(out_dir)
+    criteria = usage.drop_duplicates('criterion_id')[['criterion_id', 'criterion']].reset_index(drop=True)
+    key = _cache_key(usage, n_clusters, batch_size, random_state)
+    meta_path = out_dir / 'meta.json'
+    if not force and meta_path.exists():
+        with open(meta_path, 'r') as f:
+            if json.load(f).get('key') == key:
+                return False
+
+    vectorizer, kmeans, labels = fit_taxonomy(criteria['criterion'].tolist(), n_clusters, batch_size, random_state)
+    criteria['cluster'] = labels
+    assigned = usage.merge(criteria[['criterion_id', 'cluster']], on='criterion_id')
+    sizes = criteria['cluster'].value_counts()
+    clusters = [
+        {'cluster': i, 'label': ', '.join(terms), 'terms': terms, 'n_criteria': int(sizes.get(i, 0))}
+        for i, terms in enumerate(top_terms(vectorizer, kmeans))
+    ]
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    joblib.dump({'vectorizer': vectorizer, 'kmeans': kmeans}, out_dir / 'model.joblib')
+    assigned.to_csv(out_dir / 'criteria.csv', index=False)
+    with open(out_dir / 'clusters.json', 'w') as f:
+        json.dump(clusters, f)
+    with open(meta_path, 'w') as f:
+        json.dump({'key': key, 'n_clusters': kmeans.n_clusters, 'batch_size': kmeans.batch_size, 'random_state': random_state,
+                   'n_criteria': len(criteria), 'n_terms': len(vectorizer.vocabulary_)}, f)
+    return True
+
+
+def load_taxonomy(out_dir: Path) -> Tuple[pd.DataFrame, List[Dict[str, Any]]]:
+    """Cached assignments and cluster labels, as written by build_taxonomy."""
+    out_dir = Path(out_dir)
+    with open(out_dir / 'clusters.json', 'r') as f:
+        clusters = json.load(f)
+    return pd.read_csv(out_dir / 'criteria.csv', keep_default_na=False), clusters
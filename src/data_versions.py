@@ -0,0 +1,237 @@
+"""
+Content-addressed storage of raw dataset versions.
+
+Every downloaded release is stored once under raw_data/blobs/, named by the
+SHA-256 of its content, and raw_data/registry.json maps each dataset and version
+to its blob along with the HTTP validators (ETag, Last-Modified) it was served
+with:
+
+    {"default": {"current": "2025-05-07-06-14-12_oss_eval",
+                 "versions": {"2025-05-07-06-14-12_oss_eval": {"blob": "...", "url": "...", "etag": "...", ...}}}}
+
+Refreshing sends a conditional request, so an unchanged upstream file costs one
+304 round-trip and is never downloaded again. raw_data/healthbench_<dataset>_data.jsonl
+stays the path every script reads: it is a link to the current version's blob.
+Processed stores live in processed_data/<dataset>/<version>/, so several versions
+can be ingested side by side and switching between them needs no re-ingest.
+
+Blobs can be block-compressed (see compression.py) as blobs/ab/<sha>.jsonl.gz or
+.jsonl.zst; the digest is always that of the uncompressed content, so the same
+release is stored once whatever the codec, and the registry entry records which
+codec its blob uses. Readers detect compression themselves, so the link keeps
+its .jsonl name.
+
+Only json, os, pathlib and typing are imported at module level; requests is
+imported when a download is needed, and hashlib, shutil, datetime and the
+compression codecs when a version is added, so resolving a version's store
+path stays cheap for command-line tools.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+REGISTRY_NAME = 'registry.json'
+CHUNK_SIZE = 1024 * 1024
+
+
+def default_raw_dir() -> Path:
+    return Path(__file__).resolve().parent.parent / 'raw_data'
+
+
+def raw_link_path(raw_dir: Path, dataset: str) -> Path:
+    """The stable path of a dataset's current raw file."""
+    return Path(raw_dir) / f'healthbench_{dataset}_data.jsonl'
+
+
+def blob_path(raw_dir: Path, digest: str, codec: str = None) -> Path:
+    from compression import SUFFIXES
+    return Path(raw_dir) / 'blobs' / digest[:2] / f"{digest}.jsonl{SUFFIXES.get(codec, '')}"
+
+
+def load_registry(raw_dir: Path) -> Dict[str, Any]:
+    path = Path(raw_dir) / REGISTRY_NAME
+    if not path.exists():
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def save_registry(raw_dir: Path, registry: Dict[str, Any]) -> None:
+    path = Path(raw_dir) / REGISTRY_NAME
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'w') as f:
+        json.dump(registry, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def current_version(raw_dir: Path, dataset: str) -> Optional[str]:
+    return load_registry(raw_dir).get(dataset, {}).get('current')
+
+
+def list_versions(raw_dir: Path, dataset: str) -> List[str]:
+    """Registered versions of a dataset, oldest first."""
+    versions = load_registry(raw_dir).get(dataset, {}).get('versions', {})
+    return sorted(versions, key=lambda v: versions[v].get('fetched_at', ''))
+
+
+def version_blob(raw_dir: Path, dataset: str, version: str) -> Path:
+    entry = load_registry(raw_dir)[dataset]['versions'][version]
+    return blob_path(raw_dir, entry['blob'], entry.get('codec'))
+
+
+def add_blob(raw_dir: Path, source: Path, codec: str = None) -> Tuple[str, Optional[str]]:
+    """
+    Move a file into the blob store, block-compressing it with `codec` if given;
+    returns (digest, codec of the stored blob).
+
+    If that content is already stored, under any codec, the existing blob is kept
+    and `source` is dropped.
+    """
+    import hashlib
+    from compression import SUFFIXES, compress_file, open_binary
+    digest = hashlib.sha256()
+    with open_binary(source) as f:
+        for chunk in iter(lambda: f.read(CHUNK_SIZE), b''):
+            digest.update(chunk)
+    digest = digest.hexdigest()
+    for existing in [codec] + [None] + list(SUFFIXES):
+        if blob_path(raw_dir, digest, existing).exists():
+            Path(source).unlink()
+            return digest, existing
+    target = blob_path(raw_dir, digest, codec)
+    target.parent.mkdir(parents=True, exist_ok=True)
+    if codec is None:
+        os.replace(source, target)
+    else:
+        tmp_path = target.with_name(target.name + '.tmp')
+        compress_file(source, tmp_path, codec)
+        os.replace(tmp_path.with_name(tmp_path.name + '.idx'), target.with_name(target.name + '.idx'))
+        os.replace(tmp_path, target)
+        Path(source).unlink()
+    return digest, codec
+
+
+def _link(target: Path, link: Path) -> None:
+    tmp_link = link.with_name(link.name + '.tmp')
+    if tmp_link.exists() or tmp_link.is_symlink():
+        tmp_link.unlink()
+    try:
+        os.symlink(os.path.relpath(target, link.parent), tmp_link)
+    except OSError:
+        # No symlink support (e.g. some Windows setups): fall back to a copy
+        import shutil
+        shutil.copyfile(target, tmp_link)
+    os.replace(tmp_link, link)
+
+
+def set_current_version(raw_dir: Path, dataset: str, version: str) -> None:
+    """Make `version` the one behind raw_data/healthbench_<dataset>_data.jsonl."""
+    registry = load_registry(raw_dir)
+    entry = registry[dataset]['versions'][version]
+    registry[dataset]['current'] = version
+    save_registry(raw_dir, registry)
+    _link(blob_path(raw_dir, entry['blob'], entry.get('codec')), raw_link_path(raw_dir, dataset))
+
+
+def register_version(raw_dir: Path, dataset: str, version: str, digest: str, codec: str = None, **info) -> None:
+    """Record a version's blob and metadata and make it current."""
+    from datetime import datetime, timezone
+    registry = load_registry(raw_dir)
+    versions = registry.setdefault(dataset, {}).setdefault('versions', {})
+    now = datetime.now(timezone.utc).isoformat()
+    versions[version] = {'blob': digest, 'codec': codec, 'fetched_at': now, 'checked_at': now, **info}
+    save_registry(raw_dir, registry)
+    set_current_version(raw_dir, dataset, version)
+
+
+def import_legacy_file(raw_dir: Path, dataset: str, version: str, url: str = None, codec: str = None) -> bool:
+    """Move a raw file downloaded before the registry existed into the blob store as `version`."""
+    link = raw_link_path(raw_dir, dataset)
+    if link.is_symlink() or not link.exists() or dataset in load_registry(raw_dir):
+        return False
+    moved = link.with_name(link.name + '.import')
+    size = link.stat().st_size
+    os.replace(link, moved)
+    digest, codec = add_blob(raw_dir, moved, codec)
+    register_version(raw_dir, dataset, version, digest, codec, url=url, etag=None, last_modified=None, size=size)
+    return True
+
+
+def version_name(url: str) -> str:
+    """Version name of a release URL: its file name without extension (the dated snapshot)."""
+    return Path(url.split('?', 1)[0]).stem
+
+
+def fetch_version(raw_dir: Path, dataset: str, url: str, refresh: bool = False, codec: str = None) -> Tuple[str, bool]:
+    """
+    Make sure the release at `url` is stored and current; returns (version, downloaded).
+
+    A URL that was fetched before is not contacted again unless `refresh` is set,
+    in which case a conditional request is sent with the stored ETag and
+    Last-Modified; only a changed response body is downloaded. The request
+    accepts gzip transfer encoding, and a new blob is stored block-compressed
+    with `codec` when one is given.
+    """
+    registry = load_registry(raw_dir)
+    versions = registry.get(dataset, {}).get('versions', {})
+    known = sorted((v for v in versions if versions[v].get('url') == url), key=lambda v: versions[v].get('fetched_at', ''))
+    latest = known[-1] if known else None
+    if latest and not refresh:
+        if registry[dataset].get('current') != latest:
+            set_current_version(raw_dir, dataset, latest)
+        return latest, False
+
+    import requests
+    from datetime import datetime, timezone
+
+    headers = {'Accept-Encoding': 'gzip'}
+    if latest:
+        if versions[latest].get('etag'):
+            headers['If-None-Match'] = versions[latest]['etag']
+        if versions[latest].get('last_modified'):
+            headers['If-Modified-Since'] = versions[latest]['last_modified']
+    with requests.get(url, headers=headers, stream=True, timeout=60) as response:
+        if response.status_code == 304:
+            versions[latest]['checked_at'] = datetime.now(timezone.utc).isoformat()
+            save_registry(raw_dir, registry)
+            set_current_version(raw_dir, dataset, latest)
+            return latest, False
+        response.raise_for_status()
+        tmp_path = Path(raw_dir) / 'blobs' / f'download-{dataset}.tmp'
+        tmp_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'wb') as f:
+            for chunk in response.iter_content(CHUNK_SIZE):
+                f.write(chunk)
+        info = {
+            'url': url,
+            'etag': response.headers.get('ETag'),
+            'last_modified': response.headers.get('Last-Modified'),
+            'size': tmp_path.stat().st_size,
+        }
+    digest, codec = add_blob(raw_dir, tmp_path, codec)
+    if latest and versions[latest]['blob'] == digest:
+        # Same content served without validators (or with new ones): keep the version, refresh its metadata
+        register_version(raw_dir, dataset, latest, digest, codec, **info)
+        return latest, False
+    version = version_name(url)
+    if version in versions:
+        version = f'{version}@{digest[:12]}'
+    register_version(raw_dir, dataset, version, digest, codec, **info)
+    return version, True
+
+
+def version_store_dir(processed_dir: Path, dataset: str, version: str = None, raw_dir: Path = None) -> Path:
+    """
+    Directory of a dataset version's processed stores: processed_data/<dataset>/<version>.
+
+    Defaults to the current version; datasets processed before versions were
+    registered keep their stores directly in processed_data/<dataset>.
+    """
+    if version is None:
+        version = current_version(raw_dir or default_raw_dir(), dataset)
+    if version is None:
+        return Path(processed_dir) / dataset
+    return Path(processed_dir) / dataset / version
@@ -0,0 +1,157 @@
+"""
+Streaming diff of two versions of a HealthBench JSONL file.
+
+Records are matched by prompt_id and rubric items by criterion id (see
+example_store.criterion_id) and occurrence, so criteria that normalize to the
+same text within one example are matched in order rather than merged. A matched
+criterion whose raw text differs (an edit to case, punctuation or spacing) is
+reported as modified. The old file is read once into a table of short
+hashes per example: one per part (conversation, tags, ideal completions) and one
+per rubric item plus its points. The new file is then streamed against that
+table, so memory is bounded by the hashes rather than the records. Criterion
+texts of removed and modified rubric items are fetched with one more pass over
+the old file, only for the examples that need them.
+"""
+
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from example_store import criterion_id
+from jsonl_reader import iter_jsonl, tag_value
+
+DIGEST_SIZE = 8
+RECORD_PARTS = {
+    'prompt': 'conversation',
+    'example_tags': 'tags',
+    'ideal_completions_data': 'ideal completion',
+}
+
+
+def _digest(value: Any) -> bytes:
+    return hashlib.blake2b(json.dumps(value, sort_keys=True, separators=(',', ':')).encode('utf-8'), digest_size=DIGEST_SIZE).digest()
+
+
+def rubric_keys(rubrics: Iterable[Dict[str, Any]]) -> Iterator[Tuple[Tuple[str, int], Dict[str, Any]]]:
+    """Each rubric item with its key (criterion id, occurrence of that id so far in the example)."""
+    occurrences = {}
+    for rubric in rubrics or []:
+        cid = criterion_id(rubric.get('criterion', ''))
+        occurrences[cid] = occurrences.get(cid, -1) + 1
+        yield (cid, occurrences[cid]), rubric
+
+
+def record_fingerprint(record: Dict[str, Any]) -> Tuple[Dict[str, bytes], Dict[Tuple[str, int], Tuple[bytes, int, bytes]]]:
+    """Hashes of a record's parts, and (hash of tags, points, hash of raw text) of every rubric item keyed by rubric_keys."""
+    parts = {field: _digest(record.get(field)) for field in RECORD_PARTS}
+    rubrics = {key: (_digest(rubric.get('tags', [])), rubric.get('points', 0), _digest(rubric.get('criterion', '')))
+               for key, rubric in rubric_keys(record.get('rubrics', []))}
+    return parts, rubrics
+
+
+def _rubric_changes(old_rubrics, new_record) -> Dict[str, Any]:
+    changes = {'added': [], 'removed': [], 'modified': [], 'points_changed': [], 'tags_changed': []}
+    seen = set()
+    for key, rubric in rubric_keys(new_record.get('rubrics', [])):
+        seen.add(key)
+        points = rubric.get('points', 0)
+        item = {'criterion_id': key[0], 'criterion': rubric.get('criterion', ''), 'points': points}
+        if key not in old_rubrics:
+            changes['added'].append(item)
+            continue
+        old_tags, old_points, old_text = old_rubrics[key]
+        if old_text != _digest(rubric.get('criterion', '')):
+            # Old text is filled in from the old file later
+            changes['modified'].append({**item, 'occurrence': key[1], 'old_criterion': None})
+        if old_points != points:
+            changes['points_changed'].append({**item, 'old_points': old_points})
+        if old_tags != _digest(rubric.get('tags', [])):
+            changes['tags_changed'].append(item)
+    for key, (_, points, _) in old_rubrics.items():
+        if key not in seen:
+            # Criterion text is filled in from the old file later
+            changes['removed'].append({'criterion_id': key[0], 'criterion': None, 'points': points})
+    return changes
+
+
+def _point_totals(rubric_points) -> Tuple[int, int]:
+    positive = sum(p for p in rubric_points if p > 0)
+    penalty = sum(-p for p in rubric_points if p < 0)
+    return positive, penalty
+
+
+def iter_changes(old_path: Path, new_path: Path) -> Iterator[Dict[str, Any]]:
+    """Yield one change record per added, removed or changed example (new-file order, then removals)."""
+    old = {}
+    for record in iter_jsonl(old_path, fields=['prompt_id', 'rubrics', *RECORD_PARTS]):
+        old[record['prompt_id']] = record_fingerprint(record)
+
+    for record in iter_jsonl(new_path, fields=['prompt_id', 'rubrics', *RECORD_PARTS]):
+        prompt_id = record['prompt_id']
+        theme = tag_value(record.get('example_tags'), 'theme:')
+        new_points = [r.get('points', 0) for r in record.get('rubrics', [])]
+        if prompt_id not in old:
+            positive, penalty = _point_totals(new_points)
+            yield {'prompt_id': prompt_id, 'status': 'added', 'theme': theme, 'changed_parts': [],
+                   'n_criteria_delta': len(new_points), 'max_score_delta': positive, 'max_penalty_delta': penalty,
+                   'rubrics': _rubric_changes({}, record)}
+            continue
+        old_parts, old_rubrics = old.pop(prompt_id)
+        new_parts, _ = record_fingerprint(record)
+        changed_parts = [RECORD_PARTS[f] for f in RECORD_PARTS if old_parts[f] != new_parts[f]]
+        rubrics = _rubric_changes(old_rubrics, record)
+        if not changed_parts and not any(rubrics.values()):
+            continue
+        old_positive, old_penalty = _point_totals([p for _, p, _ in old_rubrics.values()])
+        new_positive, new_penalty = _point_totals(new_points)
+        yield {'prompt_id': prompt_id, 'status': 'changed', 'theme': theme, 'changed_parts': changed_parts,
+               'n_criteria_delta': len(new_points) - len(old_rubrics), 'max_score_delta': new_positive - old_positive,
+               'max_penalty_delta': new_penalty - old_penalty, 'rubrics': rubrics}
+
+    for prompt_id, (_, old_rubrics) in old.items():
+        positive, penalty = _point_totals([p for _, p, _ in old_rubrics.values()])
+        yield {'prompt_id': prompt_id, 'status': 'removed', 'theme': None, 'changed_parts': [],
+               'n_criteria_delta': -len(old_rubrics), 'max_score_delta': -positive, 'max_penalty_delta': -penalty,
+               'rubrics': {'added': [], 'removed': [{'criterion_id': cid, 'criterion': None, 'points': p} for (cid, _), (_, p, _) in old_rubrics.items()],
+                           'modified': [], 'points_changed': [], 'tags_changed': []}}
+
+
+def _fill_removed_details(old_path: Path, changes: Dict[str, Dict[str, Any]]) -> None:
+    """Fill in old criterion texts of removed and modified rubric items (and themes of removed examples) from the old file."""
+    needed = {pid for pid, change in changes.items()
+              if change['rubrics']['removed'] or change['rubrics']['modified'] or change['status'] == 'removed'}
+    if not needed:
+        return
+    for record in iter_jsonl(old_path, fields=['prompt_id', 'example_tags', 'rubrics']):
+        change = changes.get(record['prompt_id'])
+        if change is None or record['prompt_id'] not in needed:
+            continue
+        texts = {criterion_id(r.get('criterion', '')): r.get('criterion', '') for r in record.get('rubrics', [])}
+        for item in change['rubrics']['removed']:
+            item['criterion'] = texts.get(item['criterion_id'])
+        if change['rubrics']['modified']:
+            old_texts = {key: r.get('criterion', '') for key, r in rubric_keys(record.get('rubrics', []))}
+            for item in change['rubrics']['modified']:
+                item['old_criterion'] = old_texts.get((item['criterion_id'], item['occurrence']))
+        if change['theme'] is None:
+            change['theme'] = tag_value(record.get('example_tags'), 'theme:')
+
+
+def diff_datasets(old_path: Path, new_path: Path) -> Dict[str, Any]:
+    """Diff two JSONL versions; returns a summary and the per-example changes."""
+    changes = {change['prompt_id']: change for change in iter_changes(old_path, new_path)}
+    _fill_removed_details(old_path, changes)
+    summary = {status: sum(c['status'] == status for c in changes.values()) for status in ('added', 'removed', 'changed')}
+    for kind in ('added', 'removed', 'modified', 'points_changed', 'tags_changed'):
+        summary[f'criteria_{kind}'] = sum(len(c['rubrics'][kind]) for c in changes.values())
+    for delta in ('n_criteria_delta', 'max_score_delta', 'max_penalty_delta'):
+        summary[delta] = sum(c[delta] for c in changes.values())
+    return {'old': str(old_path), 'new': str(new_path), 'summary': summary, 'examples': list(changes.values())}
+
+
+def save_diff(diff: Dict[str, Any], output_path: Path) -> None:
+    output_path = Path(output_path)
+    output_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(output_path, 'w') as f:
+        json.dump(diff, f)
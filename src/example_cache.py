@@ -0,0 +1,123 @@
+"""
+Byte-bounded LRU cache of examples in front of any example backend.
+
+An ExampleCache wraps a loader (prompt_id -> Example or None), such as
+ExampleStore.get_example or a reader of per-example files, and keeps the most
+recently used examples until their measured size reaches `max_bytes`; then the
+least recently used are evicted. Memory for examples is therefore capped however
+large the dataset is.
+
+Sizes come from `object_size`, which walks the example's slots, tuples, dicts
+and strings with sys.getsizeof. Objects reachable from more than one example
+(interned tag strings, a shared TextStore) are counted where they are met first
+or not at all, so the budget is an upper bound on what the cache alone keeps
+alive.
+
+Every lookup counts `cache.<name>.call`, misses `cache.<name>.miss` and evicted
+examples `cache.<name>.evict` (see instrumentation.py).
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict
+
+from instrumentation import count
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def object_size(obj, seen: set = None) -> int:
+    """Bytes of `obj` and what it references through __slots__, tuples, lists and dicts."""
+    seen = set() if seen is None else seen
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(object_size(k, seen) + object_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(object_size(item, seen) for item in obj)
+    elif hasattr(type(obj), '__slots__'):
+        for name in type(obj).__slots__:
+            value = getattr(obj, name, None)
+            # Only plain data is followed; stores, files and locks are shared
+            if value is None or isinstance(value, (str, int, float, tuple, list, dict)) or hasattr(type(value), '__slots__'):
+                size += object_size(value, seen)
+    return size
+
+
+class ExampleCache:
+    """LRU of loaded examples keyed by prompt_id, holding at most `max_bytes` of them. Thread-safe."""
+
+    def __init__(self, load: Callable[[str], Any], max_bytes: int = DEFAULT_MAX_BYTES, name: str = 'examples'):
+        self.load = load
+        self.max_bytes = max_bytes
+        self.name = name
+        self.bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __contains__(self, prompt_id: str) -> bool:
+        return prompt_id in self._items
+
+    def get(self, prompt_id: str):
+        """The example with this prompt_id from the cache or the backend, or None if the backend has none."""
+        count(f'cache.{self.name}.call')
+        with self._lock:
+            item = self._items.get(prompt_id)
+            if item is not None:
+                self._items.move_to_end(prompt_id)
+                self.hits += 1
+                return item[0]
+            self.misses += 1
+        count(f'cache.{self.name}.miss')
+        example = self.load(prompt_id)
+        if example is not None:
+            self.put(prompt_id, example)
+        return example
+
+    def put(self, prompt_id: str, example: Any) -> None:
+        size = object_size(example)
+        if size > self.max_bytes:
+            # Caching it would evict everything else and then itself
+            return
+        evicted = 0
+        with self._lock:
+            old = self._items.pop(prompt_id, None)
+            if old is not None:
+                self.bytes -= old[1]
+            self._items[prompt_id] = (example, size)
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                _, (_, old_size) = self._items.popitem(last=False)
+                self.bytes -= old_size
+                evicted += 1
+            self.evictions += evicted
+        if evicted:
+            count(f'cache.{self.name}.evict', evicted)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self.bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Lifetime counters and current occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            'name': self.name,
+            'items': len(self._items),
+            'bytes': self.bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': self.hits / lookups if lookups else None,
+        }
@@ -0,0 +1,256 @@
+"""
+Compact in-memory model of HealthBench examples.
+
+`Example`, `Turn` and `Rubric` replace the raw JSON dicts when examples are
+held in memory. They use __slots__, so an instance is a fixed-size record
+without a per-object dict. Tags are stored as tuples of small integer codes from
+one process-wide `TagTable`, so the few hundred distinct tag strings are kept
+once, however many rubrics carry them. The axis, theme and physician category
+are decoded from the tags once, at construction. `ideal_completions_data` may be
+given as its JSON text, as the example store holds it, and is parsed the first
+time it is read.
+
+`pack_examples` goes further for datasets held whole in memory: conversation and
+ideal-completion text is written to a block-compressed TextStore (see
+text_store.py) and the objects keep only integer handles into it, so text is
+decompressed when an example is shown rather than kept resident.
+
+Codes are only meaningful inside one process. Pickling (st.cache_data, worker
+processes) writes the tag strings and re-interns them on load.
+
+`as_example` and `as_rubrics` accept either form, so functions can take model
+objects and still be called with raw dicts (e.g. rows rebuilt from a CSV).
+"""
+
+import json
+import sys
+import threading
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+if TYPE_CHECKING:
+    # Imported by pack_examples when text is packed, so reading examples from a store skips the codecs
+    from text_store import TextStore
+
+
+class TagTable:
+    """Interns tag strings as integer codes; looking up a known tag takes no lock."""
+
+    def __init__(self):
+        self.codes: Dict[str, int] = {}
+        self.names: List[str] = []
+        self._lock = threading.Lock()
+
+    def code(self, tag: str) -> int:
+        code = self.codes.get(tag)
+        if code is None:
+            with self._lock:
+                code = self.codes.get(tag)
+                if code is None:
+                    self.names.append(sys.intern(tag))
+                    code = self.codes[tag] = len(self.names) - 1
+        return code
+
+    def encode(self, tags: Optional[Iterable[str]]) -> Tuple[int, ...]:
+        return tuple(self.code(tag) for tag in tags) if tags else ()
+
+    def decode(self, codes: Sequence[int]) -> List[str]:
+        names = self.names
+        return [names[code] for code in codes]
+
+    def value(self, codes: Sequence[int], prefix: str) -> str:
+        """Value of the first tag starting with `prefix` (e.g. 'axis:'), or ''."""
+        names = self.names
+        for code in codes:
+            name = names[code]
+            if name.startswith(prefix):
+                return sys.intern(name[len(prefix):])
+        return ''
+
+
+TAGS = TagTable()
+
+
+class Turn:
+    """One message of an example's conversation; with `texts`, `content` is a handle into that TextStore."""
+
+    __slots__ = ('role', '_content', '_texts')
+
+    def __init__(self, role: str, content: Union[str, int], texts: 'TextStore' = None):
+        self.role = sys.intern(role or '')
+        self._content = content if texts is not None else content or ''
+        self._texts = texts
+
+    @property
+    def content(self) -> str:
+        return self._content if self._texts is None else self._texts.get(self._content)
+
+    def __reduce__(self):
+        return Turn, (self.role, self.content)
+
+    def __repr__(self):
+        return f'Turn({self.role!r}, {self.content[:40]!r})'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'role': self.role, 'content': self.content}
+
+
+class Rubric:
+    """One rubric criterion with its points and tags."""
+
+    __slots__ = ('criterion', 'points', 'axis', 'tag_codes')
+
+    def __init__(self, criterion: str, points: int, tags: Optional[Iterable[str]] = None):
+        self.criterion = criterion or ''
+        self.points = points or 0
+        self.tag_codes = TAGS.encode(tags)
+        self.axis = TAGS.value(self.tag_codes, 'axis:')
+
+    @property
+    def tags(self) -> List[str]:
+        return TAGS.decode(self.tag_codes)
+
+    def __reduce__(self):
+        return Rubric, (self.criterion, self.points, self.tags)
+
+    def __repr__(self):
+        return f'Rubric({self.criterion[:40]!r}, {self.points})'
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'criterion': self.criterion, 'points': self.points, 'tags': self.tags}
+
+
+class Example:
+    """
+    A HealthBench example: its conversation, rubric and example-level tags.
+
+    With `texts`, `ideal_completions_data` is a handle to its JSON text in that TextStore (or None).
+    """
+
+    __slots__ = ('prompt_id', 'prompt', 'rubrics', 'tag_codes', 'theme', 'physician_category', '_ideal', '_texts')
+
+    def __init__(self, prompt_id: str, prompt: Sequence[Turn], rubrics: Sequence[Rubric], tags: Optional[Iterable[str]] = None,
+                 ideal_completions_data: Union[Dict[str, Any], str, int, None] = None, texts: 'TextStore' = None):
+        self.prompt_id = prompt_id
+        self.prompt = tuple(prompt)
+        self.rubrics = tuple(rubrics)
+        self.tag_codes = TAGS.encode(tags)
+        self.theme = TAGS.value(self.tag_codes, 'theme:')
+        self.physician_category = TAGS.value(self.tag_codes, 'physician_agreed_category:')
+        # A str is the JSON text, parsed on first access
+        self._ideal = ideal_completions_data
+        self._texts = texts
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], default_id: str = None) -> 'Example':
+        """Build an example from a line of the raw JSONL (or a dict of the same shape)."""
+        return cls(
+            data.get('prompt_id', default_id),
+            [Turn(t.get('role', ''), t.get('content', '')) for t in data.get('prompt') or []],
+            [Rubric(r.get('criterion', ''), r.get('points', 0), r.get('tags')) for r in data.get('rubrics') or []],
+            data.get('example_tags'),
+            data.get('ideal_completions_data'),
+        )
+
+    @property
+    def example_tags(self) -> List[str]:
+        return TAGS.decode(self.tag_codes)
+
+    @property
+    def ideal_completions_data(self) -> Optional[Dict[str, Any]]:
+        if self._texts is not None:
+            # Parsed on every access; caching it would keep the text resident
+            return json.loads(self._texts.get(self._ideal)) if self._ideal is not None else None
+        if isinstance(self._ideal, str):
+            self._ideal = json.loads(self._ideal)
+        return self._ideal
+
+    @property
+    def ideal_completion(self) -> str:
+        data = self.ideal_completions_data
+        return (data.get('ideal_completion') or '') if isinstance(data, dict) else ''
+
+    @property
+    def total_points(self) -> int:
+        return sum(r.points for r in self.rubrics)
+
+    def __reduce__(self):
+        ideal = self.ideal_completions_data if self._texts is not None else self._ideal
+        return Example, (self.prompt_id, self.prompt, self.rubrics, self.example_tags, ideal)
+
+    def __repr__(self):
+        return f'Example({self.prompt_id!r}, {len(self.prompt)} turns, {len(self.rubrics)} rubrics)'
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The example in the shape of a line of the raw JSONL."""
+        return {
+            'prompt': [t.to_dict() for t in self.prompt],
+            'prompt_id': self.prompt_id,
+            'rubrics': [r.to_dict() for r in self.rubrics],
+            'example_tags': self.example_tags,
+            'ideal_completions_data': self.ideal_completions_data,
+        }
+
+
+def as_example(example: Union[Example, Dict[str, Any]]) -> Example:
+    return example if isinstance(example, Example) else Example.from_dict(example)
+
+
+def as_rubrics(rubrics: Iterable[Union[Rubric, Dict[str, Any]]]) -> List[Rubric]:
+    return [r if isinstance(r, Rubric) else Rubric(r.get('criterion', ''), r.get('points', 0), r.get('tags')) for r in rubrics or []]
+
+
+def pack_examples(examples: Iterable[Dict[str, Any]], text_path: Path, codec: str = 'gzip') -> List[Example]:
+    """
+    Examples whose conversation and ideal-completion text live in a new TextStore at `text_path`.
+
+    Everything else (IDs, tags, rubrics) stays in memory, so filtering and metrics
+    never touch the text store.
+    """
+    from text_store import TextStore, TextStoreWriter
+
+    texts = TextStore(text_path)
+    packed = []
+    with TextStoreWriter(text_path, codec) as writer:
+        for i, data in enumerate(examples, start=1):
+            ideal = data.get('ideal_completions_data')
+            packed.append(Example(
+                data.get('prompt_id', f'example_{i}'),
+                [Turn(t.get('role', ''), writer.add(t.get('content', '')), texts) for t in data.get('prompt') or []],
+                [Rubric(r.get('criterion', ''), r.get('points', 0), r.get('tags')) for r in data.get('rubrics') or []],
+                data.get('example_tags'),
+                writer.add(json.dumps(ideal)) if ideal is not None else None,
+                texts,
+            ))
+    return packed
+
+
+def points_metrics(rubrics: Iterable[Rubric]) -> Dict[str, Any]:
+    """Total points, maximum score and maximum penalty of a rubric, overall and per axis (sorted by axis)."""
+    total_actual = max_possible_score = max_possible_penalty = 0
+    by_axis = {}
+    for r in rubrics:
+        points = r.points
+        total_actual += points
+        axis = by_axis.get(r.axis)
+        if axis is None:
+            axis = by_axis[r.axis] = {'max_score': 0, 'max_penalty': 0}
+        if points > 0:
+            max_possible_score += points
+            axis['max_score'] += points
+        elif points < 0:
+            max_possible_penalty -= points
+            axis['max_penalty'] -= points
+    return {
+        'total_actual': total_actual,
+        'max_possible_score': max_possible_score,
+        'max_possible_penalty': max_possible_penalty,
+        'by_axis': dict(sorted(by_axis.items())),
+    }
+
+
+def iter_examples(path: Path, max_rows: int = None) -> Iterator[Example]:
+    """Stream a HealthBench JSONL file as Example objects."""
+    from jsonl_reader import iter_jsonl
+    for i, data in enumerate(iter_jsonl(path, max_rows=max_rows), start=1):
+        yield Example.from_dict(data, f'example_{i}')
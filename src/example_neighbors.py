@@ -0,0 +1,76 @@
+"""
+Precomputed "more like this" neighbours of every example.
+
+At ingest, each conversation is vectorized with TF-IDF and its k most similar
+conversations (cosine similarity, brute-force k-NN over the sparse matrix) are
+written next to the example store as two arrays whose row i belongs to example
+id i + 1:
+
+    healthbench_<dataset>_neighbors.npy     int32 example ids, most similar first (0 = none)
+    healthbench_<dataset>_similarity.npy    float32 cosine similarities
+
+The viewer memory-maps them, so looking up an example's neighbours reads one row
+instead of querying the corpus.
+"""
+
+from pathlib import Path
+from typing import List, Tuple
+
+import numpy as np
+
+from example_store import ExampleStore
+
+DEFAULT_NEIGHBORS = 10
+QUERY_BATCH_SIZE = 1000
+
+
+def neighbors_paths(db_path: Path) -> Tuple[Path, Path]:
+    """Locations of the neighbour id and similarity arrays of an example store."""
+    db_path = Path(db_path)
+    stem = db_path.stem.replace('_data', '')
+    return db_path.with_name(f'{stem}_neighbors.npy'), db_path.with_name(f'{stem}_similarity.npy')
+
+
+def build_example_neighbors(db_path: Path, k: int = DEFAULT_NEIGHBORS) -> int:
+    """Compute the k nearest conversations of every example in a store; returns the number of examples."""
+    # Imported here so the viewer, which only reads the arrays, does not load scikit-learn
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.neighbors import NearestNeighbors
+
+    with ExampleStore(db_path) as store:
+        texts = list(store.conversation_texts())
+    n = len(texts)
+    ids = np.zeros((n, k), dtype=np.int32)
+    similarity = np.zeros((n, k), dtype=np.float32)
+    if n > 1:
+        matrix = TfidfVectorizer(stop_words='english', sublinear_tf=True, min_df=2 if n >= 1000 else 1, dtype=np.float32).fit_transform(texts)
+        # One extra neighbour, since every example is its own nearest
+        index = NearestNeighbors(n_neighbors=min(k + 1, n), metric='cosine', algorithm='brute').fit(matrix)
+        for start in range(0, n, QUERY_BATCH_SIZE):
+            distances, rows = index.kneighbors(matrix[start:start + QUERY_BATCH_SIZE])
+            for offset, (row_distances, row_neighbors) in enumerate(zip(distances, rows)):
+                keep = row_neighbors != start + offset
+                found = row_neighbors[keep][:k]
+                ids[start + offset, :len(found)] = found + 1
+                similarity[start + offset, :len(found)] = 1 - row_distances[keep][:k]
+    ids_path, similarity_path = neighbors_paths(db_path)
+    np.save(ids_path, ids)
+    np.save(similarity_path, similarity)
+    return n
+
+
+class ExampleNeighbors:
+    """Read-only, memory-mapped view of an example store's neighbour arrays."""
+
+    def __init__(self, db_path: Path):
+        ids_path, similarity_path = neighbors_paths(db_path)
+        self.ids = np.load(ids_path, mmap_mode='r')
+        self.similarity = np.load(similarity_path, mmap_mode='r')
+
+    def neighbors(self, example_id: int, k: int = None) -> List[Tuple[int, float]]:
+        """(example id, cosine similarity) of the most similar examples, most similar first."""
+        row = example_id - 1
+        if not 0 <= row < len(self.ids):
+            return []
+        found = [(int(i), float(s)) for i, s in zip(self.ids[row], self.similarity[row]) if i > 0]
+        return found[:k] if k is not None else found
@@ -0,0 +1,517 @@
+"""
+SQLite-backed store of HealthBench examples and rubrics.
+
+Ingest writes one database per dataset with `examples`, `turns`, `rubrics` and
+`tags` tables, indexes for the viewer's filters, and FTS5 tables over rubric
+criteria and conversation turns. The viewer then filters and looks up examples
+with indexed queries instead of loading a whole dataset into memory.
+
+The same pass builds a criterion catalog: every normalized criterion text gets a
+stable id (so ids match across datasets and re-ingests), and the
+(criterion_id, example_id) index on `rubrics` is the postings list from a
+criterion to the examples that use it. Finally, small aggregate cubes of example
+and rubric counts and points are materialized for the analysis dashboard.
+
+This module only uses the standard library so command-line tools can open a store
+without importing pandas or streamlit. The JSONL reader (orjson, the process pool)
+and hashlib are imported only by the functions that build a store, so reading one
+stays cheap to start.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from example_model import Example, Rubric, Turn
+
+INSERT_BATCH_SIZE = 1000
+
+SCHEMA = """
+CREATE TABLE metadata (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE TABLE examples (
+    id INTEGER PRIMARY KEY,
+    prompt_id TEXT NOT NULL,
+    theme TEXT,
+    physician_category TEXT,
+    n_turns INTEGER NOT NULL,
+    n_criteria INTEGER NOT NULL,
+    total_points INTEGER NOT NULL,
+    max_possible_score INTEGER NOT NULL,
+    max_possible_penalty INTEGER NOT NULL,
+    ideal_completion TEXT,
+    ideal_completions_data TEXT
+);
+CREATE TABLE turns (
+    id INTEGER PRIMARY KEY,
+    example_id INTEGER NOT NULL REFERENCES examples(id),
+    position INTEGER NOT NULL,
+    role TEXT,
+    content TEXT
+);
+CREATE TABLE rubrics (
+    id INTEGER PRIMARY KEY,
+    example_id INTEGER NOT NULL REFERENCES examples(id),
+    position INTEGER NOT NULL,
+    criterion TEXT,
+    criterion_id TEXT NOT NULL,
+    points INTEGER NOT NULL,
+    axis TEXT,
+    tags TEXT
+);
+CREATE TABLE criteria (
+    criterion_id TEXT PRIMARY KEY,
+    criterion TEXT NOT NULL,
+    n_examples INTEGER NOT NULL,
+    n_rubrics INTEGER NOT NULL
+);
+CREATE TABLE tags (
+    example_id INTEGER NOT NULL REFERENCES examples(id),
+    tag TEXT NOT NULL
+);
+"""
+
+# Created after the bulk insert, which is much faster than maintaining them row by row
+INDEXES = """
+CREATE UNIQUE INDEX idx_examples_prompt_id ON examples(prompt_id);
+CREATE INDEX idx_examples_theme ON examples(theme, physician_category);
+CREATE INDEX idx_turns_example ON turns(example_id, position);
+CREATE INDEX idx_rubrics_example ON rubrics(example_id, position);
+CREATE INDEX idx_rubrics_axis_points ON rubrics(axis, points);
+CREATE INDEX idx_rubrics_points ON rubrics(points);
+CREATE INDEX idx_rubrics_criterion ON rubrics(criterion_id, example_id);
+CREATE INDEX idx_tags_tag ON tags(tag, example_id);
+CREATE VIRTUAL TABLE rubrics_fts USING fts5(criterion, content='rubrics', content_rowid='id');
+CREATE VIRTUAL TABLE turns_fts USING fts5(content, content='turns', content_rowid='id');
+INSERT INTO rubrics_fts(rubrics_fts) VALUES('rebuild');
+INSERT INTO turns_fts(turns_fts) VALUES('rebuild');
+"""
+
+# Aggregate cubes for the analysis dashboard, filled once per ingest. Their cells are
+# small enough to slice in memory: example-level measures by theme, physician
+# category and example shape, and rubric-level measures by theme, physician
+# category, axis and point value.
+CUBES = """
+CREATE TABLE example_cube AS
+SELECT theme, physician_category, n_turns, n_criteria,
+       COUNT(*) AS n_examples,
+       SUM(max_possible_score) AS max_possible_score,
+       SUM(max_possible_penalty) AS max_possible_penalty
+FROM examples
+GROUP BY theme, physician_category, n_turns, n_criteria;
+CREATE TABLE rubric_cube AS
+SELECT e.theme, e.physician_category, r.axis, r.points,
+       COUNT(*) AS n_rubrics,
+       COUNT(DISTINCT r.example_id) AS n_examples
+FROM rubrics r
+JOIN examples e ON e.id = r.example_id
+GROUP BY e.theme, e.physician_category, r.axis, r.points;
+"""
+
+FACET_COLUMNS = ('theme', 'physician_category')
+
+SUMMARY_COLUMNS = [
+    'id', 'prompt_id', 'theme', 'physician_category', 'n_turns', 'n_criteria',
+    'total_points', 'max_possible_score', 'max_possible_penalty',
+]
+
+
+def store_path(data_dir: Path, dataset: str) -> Path:
+    """Location of a dataset's store inside its processed data directory."""
+    return Path(data_dir) / f'healthbench_{dataset}_data.sqlite'
+
+
+def normalize_criterion(text: str) -> str:
+    """Case- and whitespace-insensitive form of a criterion, used to recognise reused criteria."""
+    return ' '.join((text or '').lower().split()).rstrip('.')
+
+
+def criterion_id(text: str) -> str:
+    """Stable id of a criterion: the same normalized text gets the same id in every dataset and ingest."""
+    import hashlib
+    return hashlib.sha1(normalize_criterion(text).encode('utf-8')).hexdigest()[:16]
+
+
+class CriterionCatalog:
+    """Criterion ids and document frequencies, accumulated during the ingest pass."""
+
+    def __init__(self):
+        self.text = {}
+        self.examples = {}
+        self.rubrics = {}
+
+    def add(self, example_id: int, text: str) -> str:
+        cid = criterion_id(text)
+        if cid not in self.text:
+            self.text[cid] = text
+            self.examples[cid] = set()
+            self.rubrics[cid] = 0
+        self.examples[cid].add(example_id)
+        self.rubrics[cid] += 1
+        return cid
+
+    def rows(self):
+        return [(cid, self.text[cid], len(self.examples[cid]), self.rubrics[cid]) for cid in self.text]
+
+
+def _example_rows(example_id: int, example: Dict[str, Any], catalog: CriterionCatalog):
+    """Split one raw example into its examples/turns/rubrics/tags rows."""
+    from jsonl_reader import tag_value
+    tags = example.get('example_tags', []) or []
+    prompt = example.get('prompt', []) or []
+    rubrics = example.get('rubrics', []) or []
+    points = [r.get('points', 0) for r in rubrics]
+    ideal_data = example.get('ideal_completions_data')
+    ideal_completion = ideal_data.get('ideal_completion') if isinstance(ideal_data, dict) else None
+    example_row = (
+        example_id,
+        example.get('prompt_id', f'example_{example_id}'),
+        tag_value(tags, 'theme:') or '',
+        tag_value(tags, 'physician_agreed_category:') or '',
+        len(prompt),
+        len(rubrics),
+        sum(points),
+        sum(p for p in points if p > 0),
+        -sum(p for p in points if p < 0),
+        ideal_completion,
+        json.dumps(ideal_data) if ideal_data is not None else None,
+    )
+    turn_rows = [(example_id, i, turn.get('role', ''), turn.get('content', '')) for i, turn in enumerate(prompt)]
+    rubric_rows = [
+        (
+            example_id, i, r.get('criterion', ''), catalog.add(example_id, r.get('criterion', '')),
+            r.get('points', 0), tag_value(r.get('tags'), 'axis:') or '', json.dumps(r.get('tags', [])),
+        )
+        for i, r in enumerate(rubrics)
+    ]
+    tag_rows = [(example_id, tag) for tag in tags]
+    return example_row, turn_rows, rubric_rows, tag_rows
+
+
+def build_example_store(examples: Iterable[Dict[str, Any]], db_path: Path, metadata: Dict[str, Any] = None) -> int:
+    """
+    Write examples into a fresh SQLite store at `db_path`. Returns the number of examples.
+
+    The store is built next to `db_path` and moved into place when complete, so a
+    viewer reading the old store never sees a half-written one.
+    """
+    db_path = Path(db_path)
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = db_path.with_name(db_path.name + '.tmp')
+    if tmp_path.exists():
+        tmp_path.unlink()
+    conn = sqlite3.connect(str(tmp_path))
+    try:
+        conn.execute('PRAGMA journal_mode=OFF')
+        conn.execute('PRAGMA synchronous=OFF')
+        conn.executescript(SCHEMA)
+        count = 0
+        catalog = CriterionCatalog()
+        batch = ([], [], [], [])
+        for count, example in enumerate(examples, start=1):
+            for rows, new in zip(batch, _example_rows(count, example, catalog)):
+                if isinstance(new, tuple):
+                    rows.append(new)
+                else:
+                    rows.extend(new)
+            if len(batch[0]) >= INSERT_BATCH_SIZE:
+                _insert_batch(conn, batch)
+                batch = ([], [], [], [])
+        _insert_batch(conn, batch)
+        with conn:
+            conn.executemany('INSERT INTO criteria VALUES (?, ?, ?, ?)', catalog.rows())
+        conn.executescript(INDEXES)
+        conn.executescript(CUBES)
+        conn.executemany(
+            'INSERT INTO metadata VALUES (?, ?)',
+            [(key, json.dumps(value)) for key, value in {**(metadata or {}), 'num_examples': count}.items()],
+        )
+        conn.commit()
+        conn.execute('ANALYZE')
+        conn.commit()
+    finally:
+        conn.close()
+    os.replace(tmp_path, db_path)
+    return count
+
+
+def _insert_batch(conn: sqlite3.Connection, batch) -> None:
+    example_rows, turn_rows, rubric_rows, tag_rows = batch
+    with conn:
+        conn.executemany('INSERT INTO examples VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)', example_rows)
+        conn.executemany('INSERT INTO turns (example_id, position, role, content) VALUES (?, ?, ?, ?)', turn_rows)
+        conn.executemany('INSERT INTO rubrics (example_id, position, criterion, criterion_id, points, axis, tags) VALUES (?, ?, ?, ?, ?, ?, ?)', rubric_rows)
+        conn.executemany('INSERT INTO tags VALUES (?, ?)', tag_rows)
+
+
+def build_example_store_from_jsonl(jsonl_path: Path, db_path: Path, dataset: str, max_rows: int = None, version: str = None, progress: Callable = None) -> int:
+    """Ingest a HealthBench JSONL file into a store in one streaming pass; `progress` may wrap the example iterator (e.g. tqdm)."""
+    from jsonl_reader import iter_jsonl
+    metadata = {'dataset': dataset, 'source': str(jsonl_path), 'version': version, 'max_rows': max_rows}
+    examples = iter_jsonl(jsonl_path, max_rows=max_rows)
+    return build_example_store(progress(examples) if progress else examples, db_path, metadata)
+
+
+def fts_phrase(text: str) -> str:
+    """Quote free text as an FTS5 phrase so punctuation in user input is not parsed as query syntax."""
+    return '"' + text.replace('"', '""') + '"'
+
+
+class ExampleStore:
+    """Read-only access to one dataset's store. Each thread gets its own connection."""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Example store not found: {self.db_path}")
+        self._local = threading.local()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(f'file:{self.db_path}?mode=ro', uri=True)
+            conn.row_factory = sqlite3.Row
+            self._local.conn = conn
+        return conn
+
+    def close(self) -> None:
+        """Close this thread's connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def metadata(self) -> Dict[str, Any]:
+        return {row['key']: json.loads(row['value']) for row in self.conn.execute('SELECT key, value FROM metadata')}
+
+    def count(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM examples').fetchone()[0]
+
+    def themes(self) -> List[str]:
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT theme FROM examples ORDER BY theme')]
+
+    def physician_categories(self) -> List[str]:
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT physician_category FROM examples ORDER BY physician_category')]
+
+    def axes(self) -> List[str]:
+        return [row[0] for row in self.conn.execute('SELECT DISTINCT axis FROM rubrics ORDER BY axis')]
+
+    def _where(self, prompt_id=None, theme=None, physician_category=None, criterion_search=None, min_points=None, max_points=None, axis=None, text_search=None,
+               criterion_ids=None):
+        """Build the WHERE clause shared by query_examples and count_examples."""
+        clauses, params = [], []
+        if prompt_id:
+            clauses.append('e.prompt_id = ?')
+            params.append(prompt_id)
+        if theme:
+            clauses.append('e.theme = ?')
+            params.append(theme)
+        if physician_category:
+            clauses.append('e.physician_category = ?')
+            params.append(physician_category)
+        # Criterion text, points and axis must all hold for the same rubric item
+        rubric_clauses = []
+        if criterion_search:
+            rubric_clauses.append('r.id IN (SELECT rowid FROM rubrics_fts WHERE rubrics_fts MATCH ?)')
+            params.append(fts_phrase(criterion_search))
+        if min_points is not None:
+            rubric_clauses.append('r.points >= ?')
+            params.append(min_points)
+        if max_points is not None:
+            rubric_clauses.append('r.points <= ?')
+            params.append(max_points)
+        if axis:
+            rubric_clauses.append('r.axis = ?')
+            params.append(axis)
+        if criterion_ids:
+            rubric_clauses.append(f"r.criterion_id IN ({', '.join('?' * len(criterion_ids))})")
+            params.extend(criterion_ids)
+        if rubric_clauses:
+            clauses.append(f"EXISTS (SELECT 1 FROM rubrics r WHERE r.example_id = e.id AND {' AND '.join(rubric_clauses)})")
+        if text_search:
+            clauses.append('e.id IN (SELECT t.example_id FROM turns t WHERE t.id IN (SELECT rowid FROM turns_fts WHERE turns_fts MATCH ?))')
+            params.append(fts_phrase(text_search))
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ''
+        return where, params
+
+    def query_examples(self, prompt_id: str = None, theme: str = None, physician_category: str = None, criterion_search: str = None,
+                       min_points: int = None, max_points: int = None, axis: str = None, text_search: str = None,
+                       criterion_ids: List[str] = None, limit: int = None, offset: int = 0, random_order: bool = False) -> List[Dict[str, Any]]:
+        """
+        Summary rows of the examples matching every given filter.
+
+        `text_search` matches conversation turns; `criterion_search`, `min_points`, `max_points`, `axis` and
+        `criterion_ids` (any of these criteria) apply to a single rubric item, e.g. "a criterion mentioning dosage
+        worth <= -5 points".
+        """
+        where, params = self._where(prompt_id, theme, physician_category, criterion_search, min_points, max_points, axis, text_search, criterion_ids)
+        order = 'ORDER BY random()' if random_order else 'ORDER BY e.id'
+        sql = f"SELECT {', '.join('e.' + c for c in SUMMARY_COLUMNS)} FROM examples e {where} {order}"
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def count_examples(self, **filters) -> int:
+        """Number of examples matching the same filters as query_examples."""
+        where, params = self._where(**filters)
+        return self.conn.execute(f'SELECT COUNT(*) FROM examples e {where}', params).fetchone()[0]
+
+    def facet_counts(self, column: str, **filters) -> Dict[str, int]:
+        """Number of examples matching the query_examples filters per theme or physician category, most common first."""
+        if column not in FACET_COLUMNS:
+            raise ValueError(f"Unknown facet: {column}")
+        where, params = self._where(**filters)
+        rows = self.conn.execute(f'SELECT e.{column}, COUNT(*) FROM examples e {where} GROUP BY e.{column} ORDER BY 2 DESC, 1', params)
+        return {value: n for value, n in rows}
+
+    def get_example(self, prompt_id: str) -> Optional[Example]:
+        """The full example (see example_model; `to_dict()` gives the raw JSONL shape), or None."""
+        row = self.conn.execute('SELECT id, prompt_id, ideal_completions_data FROM examples WHERE prompt_id = ?', (prompt_id,)).fetchone()
+        if row is None:
+            return None
+        example_id = row['id']
+        prompt = [Turn(role, content) for role, content in self.conn.execute('SELECT role, content FROM turns WHERE example_id = ? ORDER BY position', (example_id,))]
+        rubrics = [
+            Rubric(criterion, points, json.loads(tags))
+            for criterion, points, tags in self.conn.execute('SELECT criterion, points, tags FROM rubrics WHERE example_id = ? ORDER BY position', (example_id,))
+        ]
+        tags = [t[0] for t in self.conn.execute('SELECT tag FROM tags WHERE example_id = ? ORDER BY rowid', (example_id,))]
+        # Left as JSON text; Example parses it only if the ideal completion is shown
+        return Example(row['prompt_id'], prompt, rubrics, tags, row['ideal_completions_data'])
+
+    def search_criteria(self, text: str, limit: int = 50) -> List[Dict[str, Any]]:
+        """Rubric items whose criterion matches `text`, with the prompt_id they belong to."""
+        rows = self.conn.execute(
+            """
+            SELECT e.prompt_id, e.theme, r.criterion, r.points, r.axis
+            FROM rubrics_fts f
+            JOIN rubrics r ON r.id = f.rowid
+            JOIN examples e ON e.id = r.example_id
+            WHERE rubrics_fts MATCH ?
+            ORDER BY f.rank
+            LIMIT ?
+            """,
+            (fts_phrase(text), limit),
+        )
+        return [dict(row) for row in rows]
+
+    def rubric_rows(self, **filters) -> Iterable[Dict[str, Any]]:
+        """Every rubric item of the examples matching the query_examples filters, with its example's prompt_id, theme and physician category."""
+        where, params = self._where(**filters)
+        rows = self.conn.execute(
+            f"""
+            SELECT e.prompt_id, e.theme, e.physician_category, r.axis, r.criterion, r.points
+            FROM examples e
+            JOIN rubrics r ON r.example_id = e.id
+            {where}
+            ORDER BY e.id, r.position
+            """,
+            params,
+        )
+        for row in rows:
+            yield dict(row)
+
+    def criterion(self, criterion_id: str) -> Optional[Dict[str, Any]]:
+        """Catalog entry of a criterion: its text and how many examples and rubric items use it."""
+        row = self.conn.execute('SELECT * FROM criteria WHERE criterion_id = ?', (criterion_id,)).fetchone()
+        return dict(row) if row is not None else None
+
+    def criterion_counts(self, criterion_ids: List[str]) -> Dict[str, int]:
+        """Number of examples using each of the given criteria."""
+        if not criterion_ids:
+            return {}
+        placeholders = ', '.join('?' * len(criterion_ids))
+        rows = self.conn.execute(f'SELECT criterion_id, n_examples FROM criteria WHERE criterion_id IN ({placeholders})', list(criterion_ids))
+        return {row[0]: row[1] for row in rows}
+
+    def examples_with_criterion(self, criterion_id: str, limit: int = None) -> List[Dict[str, Any]]:
+        """Summary rows of every example using a criterion, read from the postings index."""
+        sql = f"""
+            SELECT {', '.join('e.' + c for c in SUMMARY_COLUMNS)}
+            FROM examples e
+            WHERE e.id IN (SELECT example_id FROM rubrics WHERE criterion_id = ?)
+            ORDER BY e.id
+        """
+        params = [criterion_id]
+        if limit is not None:
+            sql += ' LIMIT ?'
+            params.append(limit)
+        return [dict(row) for row in self.conn.execute(sql, params)]
+
+    def top_criteria(self, limit: int = 50) -> List[Dict[str, Any]]:
+        """The most reused criteria of the dataset."""
+        rows = self.conn.execute('SELECT * FROM criteria ORDER BY n_examples DESC, criterion_id LIMIT ?', (limit,))
+        return [dict(row) for row in rows]
+
+    def criteria(self) -> Iterable[Dict[str, Any]]:
+        """Every catalog entry, in criterion id order."""
+        for row in self.conn.execute('SELECT * FROM criteria ORDER BY criterion_id'):
+            yield dict(row)
+
+    def criterion_usage(self) -> Iterable[Dict[str, Any]]:
+        """Each criterion with every axis and points value it is used with, and how many examples use that combination."""
+        rows = self.conn.execute(
+            """
+            SELECT r.criterion_id, c.criterion, r.axis, r.points, COUNT(DISTINCT r.example_id) AS n_examples
+            FROM rubrics r
+            JOIN criteria c ON c.criterion_id = r.criterion_id
+            GROUP BY r.criterion_id, r.axis, r.points
+            ORDER BY r.criterion_id
+            """
+        )
+        for row in rows:
+            yield dict(row)
+
+    def example_id(self, prompt_id: str) -> Optional[int]:
+        """Row id of an example (1-based, in ingest order), or None."""
+        row = self.conn.execute('SELECT id FROM examples WHERE prompt_id = ?', (prompt_id,)).fetchone()
+        return row[0] if row is not None else None
+
+    def summaries_by_id(self, example_ids: List[int]) -> List[Dict[str, Any]]:
+        """Summary rows of the given examples, in the order given."""
+        example_ids = [int(i) for i in example_ids]
+        if not example_ids:
+            return []
+        placeholders = ', '.join('?' * len(example_ids))
+        rows = self.conn.execute(f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM examples WHERE id IN ({placeholders})", example_ids)
+        by_id = {row['id']: dict(row) for row in rows}
+        return [by_id[i] for i in example_ids if i in by_id]
+
+    def conversation_texts(self) -> Iterable[str]:
+        """The text of every example's conversation (all turns joined), in example id order."""
+        rows = self.conn.execute(
+            """
+            SELECT e.id, group_concat(t.content, char(10))
+            FROM examples e
+            LEFT JOIN (SELECT example_id, content FROM turns ORDER BY example_id, position) t ON t.example_id = e.id
+            GROUP BY e.id
+            ORDER BY e.id
+            """
+        )
+        for _, text in rows:
+            yield text or ''
+
+    def example_cube(self) -> List[Dict[str, Any]]:
+        """Cells of the example cube: example counts and point totals by theme, physician category, turns and criteria."""
+        return [dict(row) for row in self.conn.execute('SELECT * FROM example_cube')]
+
+    def rubric_cube(self) -> List[Dict[str, Any]]:
+        """
+        Cells of the rubric cube: rubric item counts by theme, physician category, axis and point value.
+
+        `n_examples` counts examples with at least one such item, so unlike `n_rubrics` it cannot be summed across cells.
+        """
+        return [dict(row) for row in self.conn.execute('SELECT * FROM rubric_cube')]
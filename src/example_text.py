@@ -0,0 +1,82 @@
+"""
+Plain-text and Markdown renderings of one example, for the command line.
+
+Both take an `Example` (see example_model.py) and use only the standard library,
+so command-line tools can print an example without importing pandas or
+streamlit.
+"""
+
+import textwrap
+from typing import TYPE_CHECKING, Dict, List
+
+from example_model import Example, Rubric
+
+if TYPE_CHECKING:
+    # Imported by example_markdown only, so plain-text output skips it
+    from datetime import datetime
+
+
+def rubrics_by_axis(rubrics) -> Dict[str, List[Rubric]]:
+    """Rubric items grouped by axis in order of first appearance; items without an axis go under 'Unspecified'."""
+    groups = {}
+    for r in rubrics:
+        groups.setdefault(r.axis or 'Unspecified', []).append(r)
+    return groups
+
+
+def example_text(example: Example, width: int = 100) -> str:
+    """The example as wrapped plain text: header, conversation, ideal completion and rubric by axis."""
+    lines = [
+        f"Example {example.prompt_id}",
+        f"Theme: {example.theme or 'Unknown'}    Physician category: {example.physician_category or 'Unknown'}",
+        f"Turns: {len(example.prompt)}    Criteria: {len(example.rubrics)}    Total points: {example.total_points}",
+        '',
+        'Conversation',
+    ]
+    for turn in example.prompt:
+        lines.append(f"  [{turn.role}]")
+        for paragraph in turn.content.splitlines() or ['']:
+            lines.extend(textwrap.wrap(paragraph, width, initial_indent='    ', subsequent_indent='    ') or [''])
+    if example.ideal_completion:
+        lines += ['', 'Ideal completion']
+        for paragraph in example.ideal_completion.splitlines():
+            lines.extend(textwrap.wrap(paragraph, width, initial_indent='    ', subsequent_indent='    ') or [''])
+    lines += ['', 'Rubric']
+    for axis, group in rubrics_by_axis(example.rubrics).items():
+        lines.append(f"  {axis}")
+        for r in group:
+            lines.extend(textwrap.wrap(r.criterion, width, initial_indent=f"    {r.points:+4d}  ", subsequent_indent=' ' * 10))
+    return '\n'.join(lines) + '\n'
+
+
+def example_markdown(example: Example, dataset: str, generated: 'datetime' = None) -> str:
+    """The example as a Markdown page: metadata, conversation table and rubric criteria by axis."""
+    from datetime import datetime
+    generated = generated or datetime.now()
+    chat_lines = [f"| **{turn.role.capitalize()}** | {turn.content.replace(chr(10), ' ')} |" for turn in example.prompt]
+    chat_md = "| **Role** | **Message** |\n|---|---|\n" + "\n".join(chat_lines)
+    rubric_md = ""
+    for axis, group in rubrics_by_axis(example.rubrics).items():
+        rubric_md += f"\n### Axis: {axis}\n"
+        for r in group:
+            color = '#4ade80' if r.points >= 0 else '#f87171'
+            rubric_md += f"- **{r.criterion}**  "
+            rubric_md += f"<span style='color:{color};font-weight:bold;'>{r.points:+} pts</span>\n"
+    return f"""# Example: {example.prompt_id}
+**Theme:** {example.theme or 'Unknown'}  
+**Physician Category:** {example.physician_category or 'Unknown'}  
+**Dataset:** {dataset}  
+**Generated:** {generated.strftime("%Y-%m-%d %H:%M:%S")}
+
+---
+
+## Conversation
+
+{chat_md}
+
+---
+
+## Rubric Criteria
+{rubric_md}
+---
+"""
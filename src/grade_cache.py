@@ -0,0 +1,155 @@
+"""
+Persistent on-disk cache of rubric grades.
+
+A grade is keyed by (prompt_id, rubric item hash, completion hash, grader key),
+so re-grading the same completion against the same rubric item with the same
+grader configuration is a lookup instead of a grader call. The rubric item hash
+covers everything else the grader is shown: the criterion, its points and the
+conversation. Editing any of them under the same prompt_id misses the cache
+instead of returning a stale grade. (The column keeps its historical name,
+criterion_hash.) The cache is a single SQLite
+file in WAL mode, which lets several grading processes write to it at once.
+"""
+
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Tuple
+
+GradeKey = Tuple[str, str, str, str]
+
+# Keys per lookup statement; 4 bound parameters each keeps us well under SQLite's limit.
+LOOKUP_CHUNK_SIZE = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS grades (
+    prompt_id TEXT NOT NULL,
+    criterion_hash TEXT NOT NULL,
+    completion_hash TEXT NOT NULL,
+    grader_key TEXT NOT NULL,
+    criteria_met INTEGER NOT NULL,
+    explanation TEXT,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (prompt_id, criterion_hash, completion_hash, grader_key)
+) WITHOUT ROWID
+"""
+
+
+def hash_text(text: str) -> str:
+    """Return a stable hex digest for a criterion or completion text."""
+    return hashlib.sha256((text or '').encode('utf-8')).hexdigest()
+
+
+def grader_config_key(config: Dict[str, Any]) -> str:
+    """Return a stable digest of a grader configuration (model, template, sampling params)."""
+    return hash_text(json.dumps(config, sort_keys=True, default=str))
+
+
+def hash_rubric_item(prompt: List[Dict[str, str]], rubric: Dict[str, Any]) -> str:
+    """Return a stable digest of what the grader sees besides the completion: the conversation and the criterion with its points."""
+    return hash_text(json.dumps({
+        'prompt': [[turn.get('role', ''), turn.get('content', '')] for turn in prompt or []],
+        'criterion': rubric.get('criterion', ''),
+        'points': rubric.get('points', 0),
+    }, sort_keys=True))
+
+
+def make_grade_key(prompt_id: str, prompt: List[Dict[str, str]], rubric: Dict[str, Any], completion: str, grader_key: str) -> GradeKey:
+    """Build the cache key for grading `completion`, as the reply to `prompt`, against one rubric item."""
+    return (prompt_id, hash_rubric_item(prompt, rubric), hash_text(completion), grader_key)
+
+
+class GradeCache:
+    """SQLite-backed grade cache with batched lookups, inserts and hit-rate stats."""
+
+    def __init__(self, db_path: Path, timeout: float = 30.0):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(str(self.db_path), timeout=timeout, check_same_thread=False)
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute(SCHEMA)
+        self.conn.commit()
+        self.hits = 0
+        self.misses = 0
+        self.inserts = 0
+
+    def get_many(self, keys: Iterable[GradeKey]) -> Dict[GradeKey, Dict[str, Any]]:
+        """Look up many grades at once. Returns only the keys that were found."""
+        keys = list(dict.fromkeys(keys))
+        found = {}
+        for start in range(0, len(keys), LOOKUP_CHUNK_SIZE):
+            chunk = keys[start:start + LOOKUP_CHUNK_SIZE]
+            values = ', '.join(['(?, ?, ?, ?)'] * len(chunk))
+            params = [part for key in chunk for part in key]
+            rows = self.conn.execute(
+                f"""
+                WITH wanted(prompt_id, criterion_hash, completion_hash, grader_key) AS (VALUES {values})
+                SELECT g.prompt_id, g.criterion_hash, g.completion_hash, g.grader_key, g.criteria_met, g.explanation
+                FROM grades g
+                JOIN wanted w USING (prompt_id, criterion_hash, completion_hash, grader_key)
+                """,
+                params,
+            )
+            for prompt_id, criterion_hash, completion_hash, grader_key, criteria_met, explanation in rows:
+                found[(prompt_id, criterion_hash, completion_hash, grader_key)] = {
+                    'criteria_met': bool(criteria_met),
+                    'explanation': explanation,
+                }
+        self.hits += len(found)
+        self.misses += len(keys) - len(found)
+        return found
+
+    def get(self, key: GradeKey) -> Dict[str, Any]:
+        """Look up a single grade, or None if it has not been cached."""
+        return self.get_many([key]).get(key)
+
+    def put_many(self, items: Iterable[Tuple[GradeKey, Dict[str, Any]]]) -> int:
+        """Insert or replace many grades in one transaction. Returns the number written."""
+        now = time.time()
+        rows = [
+            (*key, int(bool(grade['criteria_met'])), grade.get('explanation'), now)
+            for key, grade in items
+        ]
+        if not rows:
+            return 0
+        with self.conn:
+            self.conn.executemany(
+                'INSERT OR REPLACE INTO grades VALUES (?, ?, ?, ?, ?, ?, ?)',
+                rows,
+            )
+        self.inserts += len(rows)
+        return len(rows)
+
+    def put(self, key: GradeKey, grade: Dict[str, Any]) -> None:
+        """Insert or replace a single grade."""
+        self.put_many([(key, grade)])
+
+    def __len__(self) -> int:
+        return self.conn.execute('SELECT COUNT(*) FROM grades').fetchone()[0]
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """Return lookup and insert counters for this session."""
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'inserts': self.inserts,
+            'hit_rate': self.hit_rate,
+            'size': len(self),
+        }
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
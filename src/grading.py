@@ -0,0 +1,151 @@
+"""
+Rubric grading harness.
+
+Each (completion, criterion) pair is graded by a grader callable. Grades already in
+the grade cache are reused, so a re-run after a partial failure or a small prompt
+change only grades the pairs that are actually new.
+"""
+
+import json
+import logging
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Callable, Dict, List, Tuple
+
+from grade_cache import GradeCache, grader_config_key, hash_text, make_grade_key
+
+logger = logging.getLogger(__name__)
+
+GradeFn = Callable[[List[Dict[str, str]], str, Dict[str, Any]], Dict[str, Any]]
+
+GRADER_TEMPLATE = """Your job is to look at a conversation and a rubric item, and score the last turn (i.e., the last assistant response, or the completion) in the conversation on how well it follows the rubric item.
+
+# Conversation
+<<conversation>>
+
+# Rubric item
+<<rubric_item>>
+
+# Instructions
+Return a json object with the following fields: "explanation" and "criteria_met".
+- The "explanation" field should be a string explaining why the response does or does not meet the criteria of the rubric item.
+- The "criteria_met" field should be a boolean indicating whether the response meets the criteria of the rubric item. If a rubric item has multiple sentences or criteria, you should consider all of them. If any of the criteria is not met, the answer should be false. Only return true if all of the criteria are met.
+- One important exception: if a criteria says "such as", "for example", or "including", the response does not have to include all of the examples listed to meet the criteria.
+- If the rubric item is undesirable (negative points), "criteria_met" should be true if the response contains the undesirable content.
+
+Return just the json object in markdown format. Do not include any other text in the response.
+"""
+
+
+def format_grader_prompt(prompt: List[Dict[str, str]], completion: str, rubric: Dict[str, Any]) -> str:
+    """Fill the grader template with the conversation (ending in `completion`) and one rubric item."""
+    turns = prompt + [{'role': 'assistant', 'content': completion}]
+    conversation = "\n\n".join(f"{turn['role']}: {turn['content']}" for turn in turns)
+    rubric_item = f"[{rubric.get('points', 0)}] {rubric.get('criterion', '')}"
+    return GRADER_TEMPLATE.replace('<<conversation>>', conversation).replace('<<rubric_item>>', rubric_item)
+
+
+def parse_grader_response(text: str) -> Dict[str, Any]:
+    """Parse the grader's JSON reply, tolerating a surrounding markdown code fence."""
+    cleaned = text.strip()
+    if cleaned.startswith('```'):
+        cleaned = cleaned.strip('`')
+        if cleaned.startswith('json'):
+            cleaned = cleaned[len('json'):]
+    data = json.loads(cleaned)
+    if not isinstance(data.get('criteria_met'), bool):
+        raise ValueError(f"Grader response has no boolean 'criteria_met': {text!r}")
+    return {'criteria_met': data['criteria_met'], 'explanation': data.get('explanation', '')}
+
+
+def make_openai_grader(model: str = 'gpt-4.1-2025-04-14', temperature: float = 0.0, max_retries: int = 3) -> Tuple[GradeFn, Dict[str, Any]]:
+    """Return an OpenAI-backed grade function and the config that identifies it in the grade cache."""
+    from openai import OpenAI
+
+    client = OpenAI()
+    config = {
+        'grader': 'openai',
+        'model': model,
+        'temperature': temperature,
+        'template': hash_text(GRADER_TEMPLATE),
+    }
+
+    def grade(prompt, completion, rubric):
+        message = format_grader_prompt(prompt, completion, rubric)
+        last_error = None
+        for _ in range(max_retries):
+            response = client.chat.completions.create(
+                model=model,
+                temperature=temperature,
+                messages=[{'role': 'user', 'content': message}],
+            )
+            try:
+                return parse_grader_response(response.choices[0].message.content)
+            except ValueError as e:
+                last_error = e
+        raise last_error
+
+    return grade, config
+
+
+def grade_completions(
+    examples: Dict[str, Dict[str, Any]],
+    completions: Dict[str, str],
+    grade_fn: GradeFn,
+    grader_config: Dict[str, Any],
+    cache: GradeCache = None,
+    max_workers: int = 8,
+    flush_every: int = 100,
+) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Grade every rubric criterion of every completion.
+
+    `examples` and `completions` are keyed by prompt_id. Returns, per prompt_id, the
+    list of grades aligned with the example's rubrics. Cached grades are looked up in
+    one batch; new grades are written back every `flush_every` calls so that a crash
+    loses at most that much work.
+    """
+    grader_key = grader_config_key(grader_config)
+    pending = {}
+    for prompt_id, completion in completions.items():
+        example = examples[prompt_id]
+        for idx, rubric in enumerate(example.get('rubrics', [])):
+            key = make_grade_key(prompt_id, example.get('prompt', []), rubric, completion, grader_key)
+            pending[(prompt_id, idx)] = key
+
+    cached = cache.get_many(pending.values()) if cache is not None else {}
+    grades = {}
+    to_grade = {}
+    for slot, key in pending.items():
+        if key in cached:
+            grades[slot] = cached[key]
+        else:
+            # Identical rubric items (criterion and points) within one example share a key and need only one call.
+            to_grade.setdefault(key, []).append(slot)
+    logger.info(f"Grading {len(to_grade)} criterion/completion pairs ({len(pending) - sum(map(len, to_grade.values()))} cached)")
+
+    new_grades = []
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {}
+        for key, slots in to_grade.items():
+            prompt_id, idx = slots[0]
+            example = examples[prompt_id]
+            future = executor.submit(grade_fn, example.get('prompt', []), completions[prompt_id], example['rubrics'][idx])
+            futures[future] = key
+        try:
+            for future in as_completed(futures):
+                key = futures[future]
+                grade = future.result()
+                for slot in to_grade[key]:
+                    grades[slot] = grade
+                new_grades.append((key, grade))
+                if cache is not None and len(new_grades) >= flush_every:
+                    cache.put_many(new_grades)
+                    new_grades = []
+        finally:
+            if cache is not None:
+                cache.put_many(new_grades)
+
+    return {
+        prompt_id: [grades[(prompt_id, idx)] for idx in range(len(examples[prompt_id].get('rubrics', [])))]
+        for prompt_id in completions
+    }
@@ -0,0 +1,104 @@
+"""
+Sparse incidence matrices of examples against criteria and axes.
+
+Built at ingest from an example store and saved next to it in CSR format. Row i
+is example id i + 1; entries count the example's rubric items with that
+criterion (or on that axis):
+
+    healthbench_<dataset>_criterion_incidence.npz   examples x criterion ids
+    healthbench_<dataset>_axis_incidence.npz        examples x axes
+    healthbench_<dataset>_incidence.json            column labels of both
+
+Co-occurrence within any subset of examples is a row slice and a sparse
+product, X[rows].T @ X[rows], over the binarized matrix, so it can be recomputed
+interactively for each filter.
+"""
+
+import json
+from pathlib import Path
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+
+from example_store import ExampleStore
+
+
+def incidence_paths(db_path: Path) -> Tuple[Path, Path, Path]:
+    """Locations of the criterion matrix, axis matrix and column labels of an example store."""
+    db_path = Path(db_path)
+    stem = db_path.stem.replace('_data', '')
+    return (
+        db_path.with_name(f'{stem}_criterion_incidence.npz'),
+        db_path.with_name(f'{stem}_axis_incidence.npz'),
+        db_path.with_name(f'{stem}_incidence.json'),
+    )
+
+
+def _csr(rows: np.ndarray, cols: np.ndarray, shape: Tuple[int, int]) -> sparse.csr_matrix:
+    # Duplicate (row, col) pairs are summed, so entries count rubric items
+    return sparse.csr_matrix((np.ones(len(rows), dtype=np.int32), (rows, cols)), shape=shape)
+
+
+def build_incidence(db_path: Path) -> Tuple[int, int]:
+    """Build and save both incidence matrices of a store; returns the number of criteria and axes."""
+    with ExampleStore(db_path) as store:
+        n_examples = store.count()
+        triples = store.conn.execute('SELECT example_id, criterion_id, axis FROM rubrics ORDER BY example_id, position').fetchall()
+    criterion_ids = sorted({t[1] for t in triples})
+    axes = sorted({t[2] for t in triples})
+    criterion_col = {cid: i for i, cid in enumerate(criterion_ids)}
+    axis_col = {axis: i for i, axis in enumerate(axes)}
+    rows = np.fromiter((t[0] - 1 for t in triples), dtype=np.int32, count=len(triples))
+    criterion_cols = np.fromiter((criterion_col[t[1]] for t in triples), dtype=np.int32, count=len(triples))
+    axis_cols = np.fromiter((axis_col[t[2]] for t in triples), dtype=np.int32, count=len(triples))
+
+    criterion_path, axis_path, labels_path = incidence_paths(db_path)
+    sparse.save_npz(criterion_path, _csr(rows, criterion_cols, (n_examples, len(criterion_ids))))
+    sparse.save_npz(axis_path, _csr(rows, axis_cols, (n_examples, len(axes))))
+    with open(labels_path, 'w') as f:
+        json.dump({'criterion_ids': criterion_ids, 'axes': axes}, f)
+    return len(criterion_ids), len(axes)
+
+
+def cooccurrence(matrix: sparse.csr_matrix, rows: Sequence[int] = None) -> sparse.csr_matrix:
+    """
+    Column co-occurrence among the selected rows: cell (i, j) is the number of
+    examples with both column i and column j; the diagonal counts each column.
+    """
+    if rows is not None:
+        matrix = matrix[np.asarray(rows, dtype=np.int64)]
+    binary = (matrix > 0).astype(np.int32)
+    return (binary.T @ binary).tocsr()
+
+
+def conditional_cooccurrence(counts: np.ndarray) -> np.ndarray:
+    """Turn dense co-occurrence counts into P(column j | column i), row by row."""
+    diagonal = np.diag(counts).astype(np.float64)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(diagonal[:, None] > 0, counts / diagonal[:, None], np.nan)
+
+
+class Incidence:
+    """The saved incidence matrices of one example store."""
+
+    def __init__(self, db_path: Path):
+        criterion_path, axis_path, labels_path = incidence_paths(db_path)
+        self.criteria = sparse.load_npz(criterion_path).tocsr()
+        self.axes_matrix = sparse.load_npz(axis_path).tocsr()
+        with open(labels_path, 'r') as f:
+            labels = json.load(f)
+        self.criterion_ids: List[str] = labels['criterion_ids']
+        self.axes: List[str] = labels['axes']
+
+    def group_matrix(self, groups: Dict[str, int], n_groups: int) -> sparse.csr_matrix:
+        """
+        Examples x groups incidence, for a mapping of criterion id to group (e.g.
+        taxonomy cluster); criteria without a group are dropped.
+        """
+        cols = [i for i, cid in enumerate(self.criterion_ids) if cid in groups]
+        membership = sparse.csr_matrix(
+            (np.ones(len(cols), dtype=np.int32), (cols, [groups[self.criterion_ids[i]] for i in cols])),
+            shape=(len(self.criterion_ids), n_groups),
+        )
+        return (self.criteria @ membership).tocsr()
@@ -0,0 +1,221 @@
+"""
+Lightweight timing and counters for the viewer.
+
+A page starts a rerun with `begin_rerun(page)`. Until it ends, `stage()` blocks,
+`@timed` functions, `count()` and `record_objects()` calls made on that thread
+are collected into it. Finished reruns go into a ring buffer of the last
+RING_SIZE, which the sidebar Performance panel (utils.performance_panel) shows
+and `chrome_trace()` exports for chrome://tracing or Perfetto. The panel passes
+each browser session its own ring, so sessions never see each other's reruns.
+
+Nothing is recorded on a thread without an active rerun. Then `stage()` returns
+a shared no-op context manager and `@timed` calls straight through, so while no
+page has the panel on, instrumented code costs one global lookup per call.
+
+Cache hit rates come from counter pairs: wrappers count `cache.<name>.call`, and
+the cached function's body counts `cache.<name>.miss` (it only runs on a miss).
+Caches that evict (example_cache.py) also count `cache.<name>.evict`.
+"""
+
+import contextlib
+import functools
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, Callable, Dict, List, Optional
+
+RING_SIZE = 50
+
+
+class _Local(threading.local):
+    # A class-level default keeps the lookup off the (slow) AttributeError path on threads that never started a rerun
+    rerun = None
+
+
+_local = _Local()
+# Number of unfinished reruns in the process; while it is 0, instrumented calls skip the thread-local lookup
+_active = 0
+# Unfinished reruns, so begin_rerun can close those a session abandoned; guards _active too
+_open = set()
+_lock = threading.Lock()
+# Ring of reruns begun without one of their own (outside Streamlit)
+_reruns = deque(maxlen=RING_SIZE)
+# An unfinished rerun with no activity for this long belongs to a closed or abandoned session
+STALE_SECONDS = 300
+_null_stage = contextlib.nullcontext()
+
+
+class Rerun:
+    """Stages, counters and object counts of one script run."""
+
+    def __init__(self, page: str, ring: deque = None):
+        self.page = page
+        self.ring = _reruns if ring is None else ring
+        self.wall_start = time.time()
+        self.start = time.perf_counter()
+        self.last = self.start
+        self.end = None
+        self.depth = 0
+        # (name, offset from start in seconds, duration in seconds, nesting depth)
+        self.stages = []
+        self.counters = {}
+        self.objects = {}
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.last) - self.start
+
+    def stage_totals(self) -> List[Dict[str, Any]]:
+        """Calls and total time per stage name, slowest first."""
+        totals = {}
+        for name, _, duration, depth in self.stages:
+            calls, seconds, top = totals.get(name, (0, 0.0, depth))
+            totals[name] = (calls + 1, seconds + duration, min(top, depth))
+        rows = [{'stage': name, 'calls': calls, 'total_ms': seconds * 1000, 'depth': depth} for name, (calls, seconds, depth) in totals.items()]
+        return sorted(rows, key=lambda r: -r['total_ms'])
+
+    def cache_stats(self) -> List[Dict[str, Any]]:
+        """Calls, misses, evictions and hit rate of every cache counted during the rerun."""
+        rows = []
+        for key, calls in self.counters.items():
+            if key.startswith('cache.') and key.endswith('.call'):
+                name = key[len('cache.'):-len('.call')]
+                misses = self.counters.get(f'cache.{name}.miss', 0)
+                evictions = self.counters.get(f'cache.{name}.evict', 0)
+                rows.append({'cache': name, 'calls': calls, 'misses': misses, 'evictions': evictions, 'hit_rate': 1 - misses / calls if calls else None})
+        return rows
+
+
+def current() -> Optional[Rerun]:
+    return _local.rerun
+
+
+def begin_rerun(page: str, ring: deque = None) -> Rerun:
+    """
+    Start recording a rerun of `page` on this thread; it ends up in `ring` (the module's ring by default).
+
+    Reruns left open by an earlier run on this thread, or idle for
+    STALE_SECONDS, are ended first, so a page that stopped early and was never
+    visited again does not keep instrumentation switched on.
+    """
+    global _active
+    now = time.perf_counter()
+    with _lock:
+        dangling = [r for r in _open if r is _local.rerun or now - r.last > STALE_SECONDS]
+    for r in dangling:
+        end_rerun(r, at_last_activity=True)
+    rerun = Rerun(page, ring)
+    with _lock:
+        _open.add(rerun)
+        _active += 1
+    _local.rerun = rerun
+    return rerun
+
+
+def end_rerun(rerun: Rerun = None, at_last_activity: bool = False) -> None:
+    """
+    Finish a rerun and add it to the ring buffer (once).
+
+    A page that stops early (st.stop, st.rerun) never reaches its own
+    end_rerun(); the next rerun ends it with `at_last_activity`, timing it up to
+    the end of its last recorded stage.
+    """
+    global _active
+    rerun = rerun or current()
+    if rerun is None:
+        return
+    with _lock:
+        if rerun not in _open:
+            return
+        _open.discard(rerun)
+        _active -= 1
+    rerun.end = rerun.last if at_last_activity else time.perf_counter()
+    rerun.ring.append(rerun)
+    if current() is rerun:
+        _local.rerun = None
+
+
+def recent_reruns(ring: deque = None) -> List[Rerun]:
+    """Finished reruns of `ring` (the module's ring by default), oldest first."""
+    return list(_reruns if ring is None else ring)
+
+
+class _Stage:
+    __slots__ = ('rerun', 'name', 'started')
+
+    def __init__(self, rerun: Rerun, name: str):
+        self.rerun = rerun
+        self.name = name
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.rerun.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        now = time.perf_counter()
+        rerun = self.rerun
+        rerun.depth -= 1
+        rerun.stages.append((self.name, self.started - rerun.start, now - self.started, rerun.depth))
+        rerun.last = now
+        return False
+
+
+def stage(name: str):
+    """Context manager timing a block as stage `name` of the current rerun."""
+    if not _active:
+        return _null_stage
+    rerun = _local.rerun
+    if rerun is None:
+        return _null_stage
+    return _Stage(rerun, name)
+
+
+def timed(name: str = None) -> Callable:
+    """Decorator timing every call of a function as a stage (named after the function by default)."""
+    def decorator(fn):
+        label = name or fn.__name__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _active:
+                return fn(*args, **kwargs)
+            rerun = _local.rerun
+            if rerun is None:
+                return fn(*args, **kwargs)
+            with _Stage(rerun, label):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def count(name: str, n: int = 1) -> None:
+    """Add `n` to a counter of the current rerun."""
+    rerun = _local.rerun if _active else None
+    if rerun is not None:
+        rerun.counters[name] = rerun.counters.get(name, 0) + n
+
+
+def record_objects(name: str, n: int) -> None:
+    """Record how many objects of a kind the current rerun holds or renders (last value wins)."""
+    rerun = _local.rerun if _active else None
+    if rerun is not None:
+        rerun.objects[name] = n
+
+
+def chrome_trace(reruns: List[Rerun]) -> str:
+    """Reruns in Chrome's Trace Event Format, one track per page."""
+    events = []
+    tids = {}
+    for rerun in reruns:
+        tid = tids.setdefault(rerun.page, len(tids) + 1)
+        base = rerun.wall_start * 1e6
+        events.append({
+            'name': rerun.page, 'cat': 'rerun', 'ph': 'X', 'pid': 1, 'tid': tid,
+            'ts': base, 'dur': rerun.duration * 1e6, 'args': {**rerun.counters, **rerun.objects},
+        })
+        for name, offset, duration, depth in rerun.stages:
+            events.append({'name': name, 'cat': 'stage', 'ph': 'X', 'pid': 1, 'tid': tid, 'ts': base + offset * 1e6, 'dur': duration * 1e6})
+    events += [{'name': 'thread_name', 'ph': 'M', 'pid': 1, 'tid': tid, 'args': {'name': page}} for page, tid in tids.items()]
+    return json.dumps({'traceEvents': events, 'displayTimeUnit': 'ms'})
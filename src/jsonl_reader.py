@@ -0,0 +1,261 @@
+"""
+Streaming readers for HealthBench-format JSONL files.
+
+Nothing here holds more than one batch of rows at a time, so memory depends on the
+batch size rather than the file size. Lines are parsed with orjson when it is
+installed and with the standard json module otherwise. gzip and zstd compressed
+files are decompressed as a stream (see compression.py).
+
+Column batches are dicts mapping a column name to either a list (for text and
+other objects) or an array.array (for numeric columns), built from a column spec:
+
+    columns = {
+        'prompt_id': (lambda ex: ex.get('prompt_id'), None),
+        'rubric_count': (lambda ex: len(ex.get('rubrics', [])), 'l'),
+    }
+"""
+
+import array
+import functools
+import json
+import os
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from compression import count_block_lines, detect_codec, iter_block_lines, open_binary, read_block_index
+
+ColumnSpec = Dict[str, Tuple[Callable[[Dict[str, Any]], Any], Optional[str]]]
+ColumnBatch = Dict[str, Union[list, array.array]]
+
+DEFAULT_BATCH_SIZE = 1000
+
+
+def json_backend() -> str:
+    """Name of the JSON parser in use."""
+    return 'orjson' if orjson is not None else 'json'
+
+
+def parse_line(line: Union[bytes, str]) -> Dict[str, Any]:
+    """Parse one JSONL line with the fastest available backend."""
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+
+def iter_jsonl(path: Path, fields: Sequence[str] = None, max_rows: int = None) -> Iterator[Dict[str, Any]]:
+    """Yield one record per non-blank line, keeping only `fields` (those present) when given."""
+    with open_binary(path) as f:
+        count = 0
+        for line in f:
+            if max_rows is not None and count >= max_rows:
+                break
+            if not line.strip():
+                continue
+            record = parse_line(line)
+            if fields is not None:
+                record = {field: record[field] for field in fields if field in record}
+            count += 1
+            yield record
+
+
+def iter_jsonl_batches(path: Path, batch_size: int = DEFAULT_BATCH_SIZE, fields: Sequence[str] = None, max_rows: int = None) -> Iterator[List[Dict[str, Any]]]:
+    """Yield lists of up to `batch_size` records."""
+    batch = []
+    for record in iter_jsonl(path, fields=fields, max_rows=max_rows):
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def records_to_columns(records: Sequence[Dict[str, Any]], columns: ColumnSpec) -> ColumnBatch:
+    """Project records into typed columns according to `columns`."""
+    batch = {}
+    for name, (extract, typecode) in columns.items():
+        values = [extract(record) for record in records]
+        batch[name] = array.array(typecode, values) if typecode else values
+    return batch
+
+
+def iter_column_batches(path: Path, columns: ColumnSpec, batch_size: int = DEFAULT_BATCH_SIZE, max_rows: int = None) -> Iterator[ColumnBatch]:
+    """Yield typed column batches of up to `batch_size` rows."""
+    for records in iter_jsonl_batches(path, batch_size=batch_size, max_rows=max_rows):
+        yield records_to_columns(records, columns)
+
+
+def concat_column_batches(batches, columns: ColumnSpec) -> ColumnBatch:
+    """Concatenate column batches into one set of columns (e.g. to build a DataFrame)."""
+    merged = {name: array.array(typecode) if typecode else [] for name, (_, typecode) in columns.items()}
+    for batch in batches:
+        for name, values in batch.items():
+            merged[name].extend(values)
+    return merged
+
+
+def tag_value(tags: Sequence[str], prefix: str) -> Optional[str]:
+    """Return the value of the first tag starting with `prefix` (e.g. 'theme:'), or None."""
+    for tag in tags or []:
+        if tag.startswith(prefix):
+            return tag[len(prefix):]
+    return None
+
+
+# --- Sharded parallel parsing ---
+#
+# A file is split into newline-aligned byte ranges and each range is parsed in a
+# worker process. Tasks are handed to the workers when the pool forks (so column
+# specs may use lambdas) and each worker returns one compact result per shard,
+# typically a column batch. Results come back in file order. Where fork is not
+# available, or the file is small, shards are processed in this process instead.
+#
+# Block-compressed files (see compression.py) are split on block boundaries, so
+# ranges are compressed byte offsets and each worker decompresses only its blocks.
+# A compressed file without a block index is read as a single shard.
+
+MIN_SHARD_BYTES = 4 * 1024 * 1024
+# Caps the size of a single shard's result, so memory stays bounded on huge files
+MAX_SHARD_BYTES = 64 * 1024 * 1024
+
+_worker_task = None
+
+
+def _block_index(path: Path):
+    """(True, index or None) for a compressed file, (False, None) for a plain one."""
+    if detect_codec(path) is None:
+        return False, None
+    return True, read_block_index(path)
+
+
+def split_byte_ranges(path: Path, n_shards: int) -> List[Tuple[int, int]]:
+    """Split a file into up to `n_shards` (start, end) byte ranges that begin at line (or block) starts."""
+    size = Path(path).stat().st_size
+    if size == 0:
+        return []
+    compressed, index = _block_index(path)
+    if compressed:
+        if index is None:
+            return [(0, size)]
+        starts = [block[0] for block in index['blocks']]
+        boundaries = sorted({starts[len(starts) * i // n_shards] for i in range(n_shards)})
+        return list(zip(boundaries, boundaries[1:] + [size]))
+    boundaries = [0]
+    with open(path, 'rb') as f:
+        for i in range(1, n_shards):
+            target = size * i // n_shards
+            if target <= boundaries[-1]:
+                continue
+            f.seek(target - 1)
+            # Finish the line that straddles the target so the next shard starts on a fresh line
+            f.readline()
+            position = f.tell()
+            if boundaries[-1] < position < size:
+                boundaries.append(position)
+    boundaries.append(size)
+    return list(zip(boundaries[:-1], boundaries[1:]))
+
+
+def iter_shard_records(path: Path, start: int, end: int, fields: Sequence[str] = None) -> Iterator[Dict[str, Any]]:
+    """Yield the records whose lines start within [start, end)."""
+    for line in _iter_shard_lines(path, start, end):
+        if not line.strip():
+            continue
+        record = parse_line(line)
+        if fields is not None:
+            record = {field: record[field] for field in fields if field in record}
+        yield record
+
+
+def _iter_shard_lines(path: Path, start: int, end: int) -> Iterator[bytes]:
+    compressed, index = _block_index(path)
+    if compressed:
+        if index is not None:
+            yield from iter_block_lines(path, start, end, index)
+        elif start == 0:
+            with open_binary(path) as f:
+                yield from f
+        return
+    with open(path, 'rb') as f:
+        f.seek(start)
+        position = start
+        for line in f:
+            if position >= end:
+                break
+            position += len(line)
+            yield line
+
+
+def count_shard_records(path: Path, start: int, end: int) -> int:
+    """Number of non-blank lines starting within [start, end), without parsing them."""
+    compressed, index = _block_index(path)
+    if index is not None:
+        return count_block_lines(path, start, end, index)
+    return sum(1 for line in _iter_shard_lines(path, start, end) if line.strip())
+
+
+def shard_columns(path: Path, start: int, end: int, columns: ColumnSpec) -> ColumnBatch:
+    """Parse one shard into a single column batch."""
+    return records_to_columns(list(iter_shard_records(path, start, end)), columns)
+
+
+def _init_worker(task):
+    global _worker_task
+    _worker_task = task
+
+
+def _run_worker(args):
+    return _worker_task(*args)
+
+
+def default_workers() -> int:
+    return os.cpu_count() or 1
+
+
+def shard_ranges(path: Path, workers: int = None, min_shard_bytes: int = MIN_SHARD_BYTES) -> List[Tuple[int, int]]:
+    """Roughly one shard per worker, but no shard smaller than `min_shard_bytes` or larger than MAX_SHARD_BYTES."""
+    workers = workers or default_workers()
+    size = Path(path).stat().st_size
+    n_shards = max(1, min(workers, size // max(min_shard_bytes, 1)), -(-size // MAX_SHARD_BYTES))
+    return split_byte_ranges(path, n_shards)
+
+
+def imap_shards(path: Path, task: Callable[..., Any], workers: int = None, ranges: Sequence[Tuple[int, int]] = None, shard_args: Sequence[tuple] = None) -> Iterator[Any]:
+    """
+    Yield task(path, start, end, *shard_args[i]) for each shard of `path`, in file order.
+
+    Shards default to shard_ranges(path, workers) and run in a forked pool of
+    `workers` processes (all cores by default).
+    """
+    workers = workers or default_workers()
+    if ranges is None:
+        ranges = shard_ranges(path, workers)
+    if shard_args is None:
+        shard_args = [()] * len(ranges)
+    jobs = [(path, start, end, *extra) for (start, end), extra in zip(ranges, shard_args)]
+    # Imported here: the process pool machinery is a large share of this module's import time
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    if workers <= 1 or len(jobs) <= 1 or 'fork' not in multiprocessing.get_all_start_methods():
+        for job in jobs:
+            yield task(*job)
+        return
+    context = multiprocessing.get_context('fork')
+    with ProcessPoolExecutor(max_workers=min(workers, len(jobs)), mp_context=context, initializer=_init_worker, initargs=(task,)) as executor:
+        yield from executor.map(_run_worker, jobs)
+
+
+def iter_column_batches_parallel(path: Path, columns: ColumnSpec, workers: int = None, min_shard_bytes: int = MIN_SHARD_BYTES) -> Iterator[ColumnBatch]:
+    """Parse shards in parallel, yielding one column batch per shard in file order."""
+    task = functools.partial(shard_columns, columns=columns)
+    yield from imap_shards(path, task, workers=workers, ranges=shard_ranges(path, workers, min_shard_bytes))
+
+
+def read_columns_parallel(path: Path, columns: ColumnSpec, workers: int = None, min_shard_bytes: int = MIN_SHARD_BYTES) -> ColumnBatch:
+    """Parse a whole file into columns using all cores."""
+    return concat_column_batches(iter_column_batches_parallel(path, columns, workers, min_shard_bytes), columns)
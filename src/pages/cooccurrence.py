@@ -0,0 +1,106 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from pathlib import Path
+from criterion_taxonomy import load_taxonomy, taxonomy_dir_for
+from incidence import conditional_cooccurrence, cooccurrence
+from utils import open_example_store, open_incidence, performance_panel
+from instrumentation import end_rerun
+
+# Number of most frequent criteria shown in the criterion heatmap
+TOP_CRITERIA = 30
+
+st.title("Co-occurrence")
+performance_panel("Co-occurrence")
+
+repo_root = Path(__file__).resolve().parent.parent.parent
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("Dataset Selection")
+dataset_type = st.sidebar.selectbox(
+    "Select Dataset",
+    ["default", "hard", "consensus"],
+    format_func=lambda x: x.capitalize(),
+    help="Choose which dataset's co-occurrence to show"
+)
+store = open_example_store(dataset_type)
+incidence = open_incidence(dataset_type)
+if store is None or incidence is None:
+    st.error(f"No incidence matrices found for the {dataset_type} dataset. Run scripts/download_and_process.py first.")
+    st.stop()
+
+
+def prettify(value):
+    return str(value).replace('_', ' ').title() if value else 'Unspecified'
+
+
+# --- Subsets ---
+st.sidebar.markdown("---")
+st.sidebar.subheader("Examples")
+themes = store.themes()
+theme = st.sidebar.selectbox("Theme", [None] + themes, format_func=lambda t: "All" if t is None else prettify(t))
+category = st.sidebar.selectbox("Physician category", [None] + store.physician_categories(), format_func=lambda c: "All" if c is None else prettify(c))
+compare_theme = st.sidebar.selectbox(
+    "Compare with theme", [None] + themes, format_func=lambda t: "None" if t is None else prettify(t),
+    help="Show the difference between the selected examples and this theme"
+)
+normalize = st.sidebar.checkbox("Conditional probability", value=True, help="Show P(column | row) instead of example counts")
+
+
+def subset_rows(theme: str, category: str):
+    # Incidence row i is example id i + 1
+    return [row['id'] - 1 for row in store.query_examples(theme=theme, physician_category=category)]
+
+
+rows = subset_rows(theme, category)
+compare_rows = subset_rows(compare_theme, category) if compare_theme else None
+st.caption(f"{len(rows)} examples selected" + (f", compared with {len(compare_rows)} in {prettify(compare_theme)}" if compare_rows is not None else ""))
+if not rows:
+    st.info("No examples match the current filters.")
+    st.stop()
+
+# --- Columns to co-occur ---
+taxonomy_dir = taxonomy_dir_for(repo_root)
+modes = ["Axes", "Top criteria"] + (["Criterion clusters"] if (taxonomy_dir / 'meta.json').exists() else [])
+mode = st.radio("Co-occurrence of", modes, horizontal=True)
+if mode == "Axes":
+    matrix = incidence.axes_matrix
+    labels = [prettify(axis) for axis in incidence.axes]
+elif mode == "Criterion clusters":
+    taxonomy, clusters = load_taxonomy(taxonomy_dir)
+    groups = dict(zip(taxonomy['criterion_id'], taxonomy['cluster']))
+    matrix = incidence.group_matrix(groups, len(clusters))
+    labels = [c['label'] for c in clusters]
+else:
+    # The most frequent criteria within the selected examples
+    frequency = np.asarray((incidence.criteria[rows] > 0).sum(axis=0)).ravel()
+    top = np.argsort(frequency)[::-1][:TOP_CRITERIA]
+    top = top[frequency[top] > 0]
+    matrix = incidence.criteria[:, top]
+    names = {c['criterion_id']: c['criterion'] for c in (store.criterion(incidence.criterion_ids[i]) for i in top)}
+    labels = [names[incidence.criterion_ids[i]][:60] for i in top]
+if matrix.shape[1] == 0:
+    st.info("No criteria to show for these examples.")
+    st.stop()
+
+
+def cooccurrence_frame(rows):
+    counts = cooccurrence(matrix, rows).toarray()
+    values = conditional_cooccurrence(counts) if normalize else counts
+    return pd.DataFrame(values, index=labels, columns=labels)
+
+
+values = cooccurrence_frame(rows)
+title = "P(column | row)" if normalize else "Examples with both"
+if compare_rows is not None:
+    values = values - cooccurrence_frame(compare_rows)
+    title = f"{title}, minus {prettify(compare_theme)}"
+    limit = float(np.nanmax(np.abs(values.to_numpy()))) if values.notna().any().any() else 1.0
+    fig = px.imshow(values, color_continuous_scale='RdBu', zmin=-limit, zmax=limit, aspect='auto', labels={'color': 'Difference'})
+else:
+    fig = px.imshow(values, color_continuous_scale='Blues', aspect='auto', labels={'color': 'Value'})
+fig.update_layout(title=title, height=max(450, 22 * len(labels)))
+st.plotly_chart(fig, use_container_width=True)
+
+end_rerun()
@@ -1,17 +1,29 @@
 import streamlit as st
 import pandas as pd
-from pathlib import Path
 from utils import (
-    get_all_examples,
+    open_example_store,
+    ingested_versions,
+    query_examples,
+    sample_examples,
+    get_example,
+    examples_with_criterion,
+    example_criterion_counts,
+    get_criterion_clusters,
+    similar_examples,
     display_conversation,
     display_ideal_completion,
     display_rubric_criteria,
     calculate_points_metrics,
     display_points_metrics,
-    create_examples_dataframe
+    performance_panel
 )
+from instrumentation import end_rerun, record_objects
+
+# Maximum number of examples a sidebar filter loads into the navigator
+FILTER_RESULT_LIMIT = 200
 
 st.title("Data Explorer")
+performance_panel("Data Explorer")
 
 # --- Sticky horizontal navigation bar ---
 st.markdown("""
@@ -46,15 +58,24 @@ st.markdown("""
   <a href="#conversation">Conversation</a>
   <a href="#rubric-criteria">Rubric Criteria</a>
   <a href="#points-analysis">Points Analysis</a>
+  <a href="#more-like-this">More Like This</a>
 </div>
 """, unsafe_allow_html=True)
 
+# Links from other pages (e.g. Model Comparison) pass ?dataset=...&prompt_id=...,
+# and rubric criterion links pass ?dataset=...&criterion_id=...
+query_dataset = st.query_params.get("dataset")
+query_prompt_id = st.query_params.get("prompt_id", "")
+query_criterion_id = st.query_params.get("criterion_id")
+
 # Dataset selection in sidebar
+dataset_options = ["default", "hard", "consensus"]
 st.sidebar.markdown("---")
 st.sidebar.subheader("Dataset Selection")
 dataset_type = st.sidebar.selectbox(
     "Select Dataset",
-    ["default", "hard", "consensus"],
+    dataset_options,
+    index=dataset_options.index(query_dataset) if query_dataset in dataset_options else 0,
     format_func=lambda x: x.capitalize(),
     help="Choose which dataset to explore"
 )
@@ -62,35 +83,92 @@ dataset_type = st.sidebar.selectbox(
 # Add prompt_id search (moved here after df is defined)
 st.sidebar.markdown("---")
 st.sidebar.subheader("Search by ID")
+# A linked prompt ID fills the search box once per link followed, then the box is the user's
+if query_prompt_id and st.session_state.get("applied_prompt_id") != query_prompt_id:
+    st.session_state.applied_prompt_id = query_prompt_id
+    st.session_state.search_id = query_prompt_id
 search_id = st.sidebar.text_input(
     "Enter prompt ID",
+    key="search_id",
     help="Enter a prompt ID to find a specific example"
 )
 
-# Robust repo root detection
-repo_root = Path(__file__).resolve().parent.parent.parent
-data_dir = repo_root / 'processed_data' / dataset_type
-examples = get_all_examples(data_dir)
+# Any ingested release of the dataset can be browsed; the current one by default
+versions = ingested_versions(dataset_type)
+version = None
+if len(versions) > 1:
+    version = st.sidebar.selectbox("Version", versions, index=len(versions) - 1, help="Dataset release to explore")
+store = open_example_store(dataset_type, version=version)
+
+# Examples picked from another dataset or version may not exist in this one
+if st.session_state.get("store_key") != (dataset_type, version):
+    st.session_state.store_key = (dataset_type, version)
+    st.session_state.pop("selected_theme", None)
 
-if not examples:
-    st.error(f"No examples found in the {dataset_type} dataset.")
+if store is None or store.count() == 0:
+    st.error(f"No examples found in the {dataset_type} dataset. Run scripts/download_and_process.py to build it.")
 else:
-    # Create DataFrame for initial view and theme selection
-    df = create_examples_dataframe(examples)
-    
-    # Add prompt_id search (moved here after df is defined)
-    if search_id:
-        matching_examples = df[df['ID'] == search_id]
+    # Look up the searched prompt ID with an indexed query, only when the search changes,
+    # so Previous/Next still move through the results on later reruns
+    if not search_id:
+        st.session_state.pop("searched_id", None)
+    elif st.session_state.get("searched_id") != (dataset_type, version, search_id):
+        st.session_state.searched_id = (dataset_type, version, search_id)
+        matching_examples = query_examples(store, prompt_id=search_id)
         if not matching_examples.empty:
-            st.session_state.current_examples = matching_examples.reset_index(drop=True)
+            st.session_state.selected_theme = None
+            st.session_state.current_examples = matching_examples
             st.session_state.current_index = 0
             st.sidebar.success(f"Found example with ID: {search_id}")
         else:
             st.sidebar.error(f"No example found with ID: {search_id}")
 
-    # Create a mapping of IDs to examples for quick lookup
-    example_map = {example.get('prompt_id', f'example_{i+1}'): example for i, example in enumerate(examples)}
-    
+    # Open every example sharing a criterion, once per link followed
+    if query_criterion_id and st.session_state.get("applied_criterion_id") != (dataset_type, query_criterion_id):
+        st.session_state.applied_criterion_id = (dataset_type, query_criterion_id)
+        criterion = store.criterion(query_criterion_id)
+        if criterion is not None:
+            st.session_state.selected_theme = None
+            st.session_state.current_examples = examples_with_criterion(store, query_criterion_id)
+            st.session_state.current_index = 0
+            st.sidebar.success(f"{criterion['n_examples']} examples with the criterion: {criterion['criterion']}")
+        else:
+            st.sidebar.error("Criterion not found in this dataset.")
+
+    # Filter examples by rubric content without loading the dataset
+    st.sidebar.markdown("---")
+    st.sidebar.subheader("Filter Examples")
+    with st.sidebar.form("filter_examples"):
+        filter_theme = st.selectbox("Theme", ["Any"] + store.themes(), format_func=lambda x: x.replace("_", " ").title() if x != "Any" else x)
+        filter_category = st.selectbox("Physician category", ["Any"] + store.physician_categories())
+        filter_criterion = st.text_input("Criterion mentions", help="Full-text search over rubric criteria")
+        filter_axis = st.selectbox("Criterion axis", ["Any"] + store.axes())
+        filter_max_points = st.number_input("Criterion worth at most (points)", value=None, step=1, help="Leave empty for any points")
+        criterion_clusters = get_criterion_clusters(dataset_type)
+        filter_cluster = st.selectbox(
+            "Near-duplicate criteria",
+            [None] + criterion_clusters,
+            format_func=lambda c: "Any" if c is None else f"({len(c['members'])}) {c['label'][:80]}",
+            help="Paraphrases of one criterion, found by scripts/analysis/find_near_duplicate_criteria.py",
+        )
+        apply_filter = st.form_submit_button("Apply filter")
+    if apply_filter:
+        filters = {
+            'theme': None if filter_theme == "Any" else filter_theme,
+            'physician_category': None if filter_category == "Any" else filter_category,
+            'criterion_search': filter_criterion or None,
+            'axis': None if filter_axis == "Any" else filter_axis,
+            'max_points': None if filter_max_points is None else int(filter_max_points),
+            'criterion_ids': None if filter_cluster is None else [m['criterion_id'] for m in filter_cluster['members']],
+        }
+        total_matches = store.count_examples(**filters)
+        st.session_state.current_examples = query_examples(store, limit=FILTER_RESULT_LIMIT, **filters)
+        st.session_state.current_index = 0
+        if total_matches:
+            st.sidebar.success(f"{total_matches} matching examples" + (f" (showing the first {FILTER_RESULT_LIMIT})" if total_matches > FILTER_RESULT_LIMIT else ""))
+        else:
+            st.sidebar.error("No examples match these filters.")
+
     # --- Anchor: Select Theme ---
     st.markdown('<a name="select-theme"></a>', unsafe_allow_html=True)
     st.markdown("---")
@@ -98,17 +176,13 @@ else:
 
     def prettify_theme(theme):
         return theme.replace("_", " ").title()
-    themes = sorted(df['Theme'].unique().tolist())
+    themes = store.themes()
     theme_options = ['Random'] + themes
     # Set a robust default theme
     default_theme = 'Emergency Referrals' if 'Emergency Referrals' in themes else (themes[0] if themes else 'Random')
     if 'selected_theme' not in st.session_state:
         st.session_state.selected_theme = default_theme
-        if default_theme == 'Random':
-            st.session_state.current_examples = df.sample(n=min(10, len(df))).reset_index(drop=True)
-        else:
-            filtered_df = df[df['Theme'] == default_theme]
-            st.session_state.current_examples = filtered_df.sample(n=min(10, len(filtered_df))).reset_index(drop=True)
+        st.session_state.current_examples = sample_examples(store, default_theme, n=10)
         st.session_state.current_index = 0
     # Two-row grid CSS (tight)
     st.markdown("""
@@ -151,11 +225,7 @@ else:
                 btn_key = f"theme_{theme}"
                 if st.button(btn_label, key=btn_key, use_container_width=True):
                     st.session_state.selected_theme = theme
-                    if theme == 'Random':
-                        st.session_state.current_examples = df.sample(n=10).reset_index(drop=True)
-                    else:
-                        filtered_df = df[df['Theme'] == theme]
-                        st.session_state.current_examples = filtered_df.sample(n=min(10, len(filtered_df))).reset_index(drop=True)
+                    st.session_state.current_examples = sample_examples(store, theme, n=10)
                     st.session_state.current_index = 0
                 # Add a marker div for JS/CSS to target the selected button
                 if is_selected:
@@ -220,18 +290,18 @@ else:
             if st.button("Next", disabled=st.session_state.current_index == len(st.session_state.current_examples) - 1):
                 st.session_state.current_index = min(len(st.session_state.current_examples) - 1, st.session_state.current_index + 1)
         
+        record_objects('examples_in_view', len(st.session_state.current_examples))
         # Get current example
         current_example_id = st.session_state.current_examples.iloc[st.session_state.current_index]['ID']
-        current_example = example_map.get(current_example_id)
+        current_example = get_example(store, current_example_id)
         
         if current_example:
             # --- Anchor: Conversation ---
             st.markdown('<a name="conversation"></a>', unsafe_allow_html=True)
             st.markdown("---")
             # Show prompt ID and theme above conversation
-            prompt_id = current_example.get('prompt_id', '')
-            theme = current_example.get('example_tags', [])
-            theme_str = next((tag[6:] for tag in theme if tag.startswith('theme:')), None)
+            prompt_id = current_example.prompt_id
+            theme_str = current_example.theme
             
             # Display theme and prompt ID (with native copy button)
             st.markdown(f"""
@@ -247,13 +317,36 @@ else:
             # --- Anchor: Rubric Criteria ---
             st.markdown('<a name="rubric-criteria"></a>', unsafe_allow_html=True)
             st.markdown("---")
-            display_rubric_criteria(current_example, sort_by, show_details, show_positive, show_negative)
+            display_rubric_criteria(
+                current_example, sort_by, show_details, show_positive, show_negative,
+                criterion_counts=example_criterion_counts(store, current_example), link_dataset=dataset_type,
+            )
             # --- Anchor: Points Analysis ---
             st.markdown('<a name="points-analysis"></a>', unsafe_allow_html=True)
             st.markdown("---")
-            metrics = calculate_points_metrics(current_example.get('rubrics', []))
+            metrics = calculate_points_metrics(current_example.rubrics)
             display_points_metrics(metrics)
+            # --- Anchor: More Like This ---
+            st.markdown('<a name="more-like-this"></a>', unsafe_allow_html=True)
+            st.markdown("---")
+            st.subheader("More Like This")
+            neighbors = similar_examples(store, prompt_id)
+            if neighbors.empty:
+                st.info("No similar examples available. Re-run scripts/download_and_process.py to build the neighbour index.")
+            else:
+                st.dataframe(
+                    neighbors[['ID', 'Similarity', 'Theme', 'Number of Turns', 'Number of Criteria']],
+                    use_container_width=True,
+                    hide_index=True,
+                    column_config={'Similarity': st.column_config.ProgressColumn("Similarity", min_value=0, max_value=1, format="%.2f")}
+                )
+                if st.button("Browse similar examples"):
+                    st.session_state.current_examples = neighbors
+                    st.session_state.current_index = 0
+                    st.rerun()
         else:
             st.error(f"Could not find example with ID: {current_example_id}")
     else:
-        st.info("No examples available to display.") 
\ No newline at end of file
+        st.info("No examples available to display.") 
+
+end_rerun()
@@ -0,0 +1,94 @@
+import streamlit as st
+import json
+import pandas as pd
+from pathlib import Path
+from utils import performance_panel
+from instrumentation import end_rerun
+
+st.title("Dataset Diff")
+performance_panel("Dataset Diff")
+
+diff_dir = Path(__file__).resolve().parent.parent.parent / 'outputs' / 'diffs'
+diff_files = sorted(diff_dir.glob('*.json'), key=lambda p: p.stat().st_mtime, reverse=True) if diff_dir.exists() else []
+if not diff_files:
+    st.error("No dataset diffs found. Run scripts/diff_datasets.py OLD.jsonl NEW.jsonl first.")
+    st.stop()
+
+
+@st.cache_data
+def load_diff(path: str, mtime: float):
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("Diff Selection")
+diff_path = st.sidebar.selectbox("Diff", diff_files, format_func=lambda p: p.stem.replace('__', ' → '))
+diff = load_diff(str(diff_path), diff_path.stat().st_mtime)
+summary = diff['summary']
+st.caption(f"{diff['old']} → {diff['new']}")
+
+# --- Summary ---
+st.header("Summary")
+col1, col2, col3 = st.columns(3)
+col1.metric("Examples added", summary['added'])
+col2.metric("Examples removed", summary['removed'])
+col3.metric("Examples changed", summary['changed'])
+col1, col2, col3, col4, col5 = st.columns(5)
+col1.metric("Criteria added", summary['criteria_added'])
+col2.metric("Criteria removed", summary['criteria_removed'])
+# Diffs saved before reworded criteria were tracked have no 'modified' entries
+col3.metric("Criteria reworded", summary.get('criteria_modified', 0))
+col4.metric("Criteria re-pointed", summary['criteria_points_changed'])
+col5.metric("Criteria re-tagged", summary['criteria_tags_changed'])
+col1, col2, col3 = st.columns(3)
+col1.metric("Criteria count delta", f"{summary['n_criteria_delta']:+d}")
+col2.metric("Max score delta", f"{summary['max_score_delta']:+d}")
+col3.metric("Max penalty delta", f"{summary['max_penalty_delta']:+d}")
+
+if not diff['examples']:
+    st.success("The two versions are identical.")
+    st.stop()
+
+# --- Changed examples ---
+st.markdown("---")
+st.header("Examples")
+examples = pd.DataFrame([
+    {
+        'prompt_id': e['prompt_id'],
+        'status': e['status'],
+        'theme': e['theme'],
+        'changed': ', '.join(e['changed_parts']),
+        'criteria +': len(e['rubrics']['added']),
+        'criteria -': len(e['rubrics']['removed']),
+        'criteria reworded': len(e['rubrics'].get('modified', [])),
+        'points changed': len(e['rubrics']['points_changed']),
+        'max score delta': e['max_score_delta'],
+        'max penalty delta': e['max_penalty_delta'],
+    }
+    for e in diff['examples']
+])
+statuses = st.multiselect("Status", ['added', 'removed', 'changed'], default=['added', 'removed', 'changed'])
+themes = sorted(t for t in examples['theme'].dropna().unique())
+selected_themes = st.multiselect("Themes", themes, default=themes, format_func=lambda t: t.replace('_', ' ').title())
+shown = examples[examples['status'].isin(statuses) & (examples['theme'].isin(selected_themes) | examples['theme'].isna())]
+st.dataframe(shown, use_container_width=True, hide_index=True)
+
+# --- One example ---
+st.markdown("---")
+st.header("Rubric Changes")
+if shown.empty:
+    st.info("No examples match the current filters.")
+    st.stop()
+by_id = {e['prompt_id']: e for e in diff['examples']}
+selected = by_id[st.selectbox("Example", shown['prompt_id'].tolist())]
+if selected['changed_parts']:
+    st.markdown(f"**Changed outside the rubric:** {', '.join(selected['changed_parts'])}")
+labels = {'added': "Added criteria", 'removed': "Removed criteria", 'modified': "Reworded criteria", 'points_changed': "Criteria with new points", 'tags_changed': "Criteria with new tags"}
+for kind, label in labels.items():
+    items = selected['rubrics'].get(kind, [])
+    if items:
+        st.subheader(label)
+        st.dataframe(pd.DataFrame(items).drop(columns=['criterion_id', 'occurrence'], errors='ignore'), use_container_width=True, hide_index=True)
+
+end_rerun()
@@ -1,13 +1,136 @@
 import streamlit as st
+import plotly.express as px
 from pathlib import Path
+from utils import load_analysis_cubes, performance_panel
+from instrumentation import end_rerun
 
 st.title("Main Analysis")
+performance_panel("Main Analysis")
 
-# Load the markdown content from the analysis output
+# Every chart below slices the aggregate cubes built at ingest, never the raw examples
+example_cube, rubric_cube = load_analysis_cubes(["default", "hard", "consensus"])
+if example_cube.empty:
+    st.error("No example stores found. Run scripts/download_and_process.py first.")
+    st.stop()
+# The example store writes a missing theme or category as '', not NULL
+for cube in (example_cube, rubric_cube):
+    cube[['theme', 'physician_category']] = cube[['theme', 'physician_category']].replace('', 'Unknown').fillna('Unknown')
+rubric_cube['axis'] = rubric_cube['axis'].replace('', 'unspecified')
+
+
+def prettify(value):
+    return str(value).replace('_', ' ').title()
+
+
+# --- Filters ---
+st.sidebar.markdown("---")
+st.sidebar.subheader("Filters")
+datasets = sorted(example_cube['dataset'].unique())
+selected_datasets = st.sidebar.multiselect("Datasets", datasets, default=datasets, format_func=prettify)
+themes = sorted(example_cube['theme'].unique())
+selected_themes = st.sidebar.multiselect("Themes", themes, default=themes, format_func=prettify)
+categories = sorted(example_cube['physician_category'].unique())
+selected_categories = st.sidebar.multiselect("Physician categories", categories, default=categories, format_func=prettify)
+axes = sorted(rubric_cube['axis'].unique())
+selected_axes = st.sidebar.multiselect("Axes", axes, default=axes, format_func=prettify)
+
+examples = example_cube[
+    example_cube['dataset'].isin(selected_datasets)
+    & example_cube['theme'].isin(selected_themes)
+    & example_cube['physician_category'].isin(selected_categories)
+]
+rubrics = rubric_cube[
+    rubric_cube['dataset'].isin(selected_datasets)
+    & rubric_cube['theme'].isin(selected_themes)
+    & rubric_cube['physician_category'].isin(selected_categories)
+    & rubric_cube['axis'].isin(selected_axes)
+]
+if examples.empty:
+    st.info("No examples match the current filters.")
+    st.stop()
+rubrics = rubrics.assign(
+    positive_points=rubrics['points'].clip(lower=0) * rubrics['n_rubrics'],
+    penalty_points=(-rubrics['points']).clip(lower=0) * rubrics['n_rubrics'],
+)
+
+# --- Headline numbers ---
+col1, col2, col3, col4 = st.columns(4)
+col1.metric("Examples", f"{int(examples['n_examples'].sum()):,}")
+col2.metric("Rubric items", f"{int(rubrics['n_rubrics'].sum()):,}")
+col3.metric("Possible points", f"{int(rubrics['positive_points'].sum()):,}")
+col4.metric("Possible penalty", f"{int(rubrics['penalty_points'].sum()):,}")
+
+# --- Examples by theme ---
+st.markdown("---")
+st.header("Examples by Theme")
+by_theme = examples.groupby(['theme', 'dataset'], as_index=False)['n_examples'].sum()
+fig = px.bar(
+    by_theme, x='n_examples', y='theme', color='dataset', orientation='h', barmode='group',
+    labels={'n_examples': 'Examples', 'theme': '', 'dataset': 'Dataset'}
+)
+fig.update_layout(yaxis={'categoryorder': 'total ascending'})
+st.plotly_chart(fig, use_container_width=True)
+
+# --- Points by axis ---
+st.markdown("---")
+st.header("Points and Penalties by Axis")
+by_axis = rubrics.groupby('axis', as_index=False)[['positive_points', 'penalty_points']].sum()
+fig = px.bar(
+    by_axis.melt(id_vars='axis', var_name='measure', value_name='points'),
+    x='axis', y='points', color='measure', barmode='group',
+    labels={'axis': 'Axis', 'points': 'Points', 'measure': ''}
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# --- Theme x axis heatmap ---
+st.markdown("---")
+st.header("Theme by Axis")
+measure = st.radio(
+    "Measure", ['n_rubrics', 'positive_points', 'penalty_points'], horizontal=True,
+    format_func={'n_rubrics': 'Rubric items', 'positive_points': 'Possible points', 'penalty_points': 'Possible penalty'}.get
+)
+heatmap = rubrics.pivot_table(index='theme', columns='axis', values=measure, aggfunc='sum', fill_value=0)
+fig = px.imshow(heatmap, text_auto=True, aspect='auto', color_continuous_scale='Blues', labels={'x': 'Axis', 'y': 'Theme', 'color': measure})
+st.plotly_chart(fig, use_container_width=True)
+
+# --- Distributions ---
+st.markdown("---")
+st.header("Distributions")
+col1, col2 = st.columns(2)
+with col1:
+    points_dist = rubrics.groupby(['points', 'dataset'], as_index=False)['n_rubrics'].sum()
+    fig = px.bar(points_dist, x='points', y='n_rubrics', color='dataset', labels={'points': 'Points per criterion', 'n_rubrics': 'Rubric items', 'dataset': 'Dataset'})
+    st.plotly_chart(fig, use_container_width=True)
+with col2:
+    shape = st.radio("Per example", ['n_criteria', 'n_turns'], horizontal=True, format_func={'n_criteria': 'Criteria', 'n_turns': 'Turns'}.get)
+    shape_dist = examples.groupby([shape, 'dataset'], as_index=False)['n_examples'].sum()
+    fig = px.bar(shape_dist, x=shape, y='n_examples', color='dataset', labels={shape: 'Criteria per example' if shape == 'n_criteria' else 'Turns per example', 'n_examples': 'Examples', 'dataset': 'Dataset'})
+    st.plotly_chart(fig, use_container_width=True)
+
+# --- Physician categories ---
+st.markdown("---")
+st.header("Physician Categories")
+by_category = examples.groupby('physician_category', as_index=False).agg(
+    n_examples=('n_examples', 'sum'), max_possible_score=('max_possible_score', 'sum'), max_possible_penalty=('max_possible_penalty', 'sum')
+)
+by_category['mean_max_score'] = by_category['max_possible_score'] / by_category['n_examples']
+by_category['mean_max_penalty'] = by_category['max_possible_penalty'] / by_category['n_examples']
+st.dataframe(
+    by_category[['physician_category', 'n_examples', 'mean_max_score', 'mean_max_penalty']],
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        'physician_category': "Physician category",
+        'n_examples': "Examples",
+        'mean_max_score': st.column_config.NumberColumn("Mean max score", format="%.1f"),
+        'mean_max_penalty': st.column_config.NumberColumn("Mean max penalty", format="%.1f"),
+    }
+)
+
+# The written report generated by the analysis scripts, if present
 analysis_path = Path(__file__).resolve().parent.parent.parent / 'outputs' / 'analysis' / 'computed_basic_analysis_default.md'
 if analysis_path.exists():
-    with open(analysis_path, 'r') as f:
-        content = f.read()
-    st.markdown(content)
-else:
-    st.error("Analysis file not found. Please run the analysis scripts first.") 
\ No newline at end of file
+    with st.expander("Generated analysis report (default dataset)"):
+        st.markdown(analysis_path.read_text())
+
+end_rerun()
@@ -0,0 +1,166 @@
+import streamlit as st
+import numpy as np
+import pandas as pd
+import plotly.express as px
+from datetime import datetime
+from pathlib import Path
+from results_store import ModelAggregates, ResultsStore, index_mismatch, store_dir_for
+from utils import performance_panel
+from instrumentation import end_rerun
+
+st.title("Model Comparison")
+performance_panel("Model Comparison")
+
+repo_root = Path(__file__).resolve().parent.parent.parent
+
+
+@st.cache_resource
+def load_results_store(store_dir: str, index_mtime: float) -> ResultsStore:
+    # One memory-mapped store per dataset, shared by every session; keyed on the index so added models appear
+    return ResultsStore(Path(store_dir))
+
+
+@st.cache_resource
+def load_model_aggregates(store_dir: str, index_mtime: float, model: str) -> ModelAggregates:
+    # Kept across reruns so a rewritten results file only re-scores the examples that changed
+    return ModelAggregates(load_results_store(store_dir, index_mtime), model)
+
+
+def aggregate_label(key: tuple) -> str:
+    return 'Overall' if key == ('overall',) else f"{key[0].capitalize()}: {key[1].replace('_', ' ').title() or 'None'}"
+
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("Dataset Selection")
+dataset_type = st.sidebar.selectbox(
+    "Select Dataset",
+    ["default", "hard", "consensus"],
+    format_func=lambda x: x.capitalize(),
+    help="Choose which dataset's model results to compare"
+)
+
+store_dir = store_dir_for(dataset_type, repo_root)
+if not (store_dir / 'index.json').exists():
+    st.error(f"No model results found for the {dataset_type} dataset. Run scripts/build_results_store.py first.")
+    st.stop()
+mismatch = index_mismatch(store_dir)
+if mismatch:
+    # Results are aligned to criteria by position, so they cannot be read against another version
+    st.error(f"The {mismatch}. Rebuild it with scripts/build_results_store.py --dataset {dataset_type} --rebuild and re-add the results.")
+    st.stop()
+index_mtime = (store_dir / 'index.json').stat().st_mtime
+store = load_results_store(str(store_dir), index_mtime)
+if store.raw_version:
+    st.caption(f"Results aligned to {dataset_type} version {store.raw_version}")
+if len(store.models) < 2:
+    st.info("At least two models are needed for a comparison. Add more results with scripts/build_results_store.py.")
+    st.stop()
+
+st.sidebar.markdown("---")
+st.sidebar.subheader("Models")
+baseline = st.sidebar.selectbox("Baseline model", store.models)
+others = [m for m in store.models if m != baseline]
+compared = st.sidebar.multiselect("Compare against", others, default=others[:1])
+if not compared:
+    st.info("Select at least one model to compare against the baseline.")
+    st.stop()
+models = [baseline] + compared
+
+# Bring each model's running aggregates up to date with its arrays on disk
+aggregates = {model: load_model_aggregates(str(store_dir), index_mtime, model) for model in models}
+for model_aggregates in aggregates.values():
+    model_aggregates.refresh()
+
+# --- Overall scores ---
+st.header("Overall Scores")
+overall = {model: aggregates[model].value(('overall',)) or 0.0 for model in models}
+cols = st.columns(len(models))
+for col, model in zip(cols, models):
+    with col:
+        delta = None if model == baseline else f"{overall[model] - overall[baseline]:+.3f}"
+        st.metric(model, f"{overall[model]:.3f}", delta)
+
+st.caption("Scores update when build_results_store.py rewrites a model's results; only the examples whose grades changed are re-scored.")
+
+# --- Recent changes ---
+changed_models = [m for m in models if aggregates[m].last_moved]
+if changed_models:
+    st.subheader("Recent Changes")
+    for model in changed_models:
+        model_aggregates = aggregates[model]
+        updated = datetime.fromtimestamp(model_aggregates.updated_at).strftime('%Y-%m-%d %H:%M:%S')
+        st.markdown(f"**{model}**: {model_aggregates.last_changed} examples changed ({updated})")
+        moved = pd.DataFrame([
+            {'Aggregate': aggregate_label(key), 'Before': before, 'After': after,
+             'Change': (after - before) if before is not None and after is not None else None}
+            for key, (before, after) in sorted(model_aggregates.last_moved.items(), key=lambda item: (item[0] != ('overall',), item[0]))
+        ])
+        st.dataframe(
+            moved, use_container_width=True, hide_index=True,
+            column_config={c: st.column_config.NumberColumn(c, format="%.3f") for c in ['Before', 'After', 'Change']}
+        )
+
+# --- Scores by theme and axis ---
+st.markdown("---")
+st.header("Scores by Theme and Axis")
+keys = sorted({key for m in models for key in aggregates[m].aggregates() if key[0] in ('theme', 'axis') and key[1]})
+st.dataframe(
+    pd.DataFrame([{'Group': aggregate_label(key), **{m: aggregates[m].value(key) for m in models}} for key in keys]),
+    use_container_width=True, hide_index=True,
+    column_config={m: st.column_config.NumberColumn(m, format="%.3f") for m in models}
+)
+
+# --- Per-example deltas ---
+st.markdown("---")
+st.header("Per-Example Score Deltas")
+delta_frames = []
+for model in compared:
+    delta = store.deltas(baseline, model)
+    delta_frames.append(pd.DataFrame({'Model': model, 'Delta': delta[~np.isnan(delta)]}))
+fig = px.histogram(
+    pd.concat(delta_frames, ignore_index=True),
+    x='Delta', color='Model', barmode='overlay', nbins=60,
+    labels={'Delta': f'Score minus {baseline}'}
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# --- Win/loss matrices ---
+st.markdown("---")
+st.header("Win/Loss Matrices")
+group_by = st.radio("Group by", ["theme", "axis"], horizontal=True, format_func=lambda x: x.capitalize())
+matrices = store.win_loss_matrix(models, by=group_by)
+groups = sorted(g for g in matrices if g)
+selected_group = st.selectbox(group_by.capitalize(), groups, format_func=lambda g: g.replace('_', ' ').title())
+fig = px.imshow(
+    matrices[selected_group],
+    x=models, y=models, zmin=0, zmax=1, text_auto='.2f', color_continuous_scale='RdYlGn',
+    labels={'x': 'Loses to row', 'y': 'Model', 'color': 'Win rate'}
+)
+st.plotly_chart(fig, use_container_width=True)
+
+# --- Worst regressions ---
+st.markdown("---")
+st.header("Worst Regressing Examples")
+regressed_model = st.selectbox("Model", compared)
+limit = st.slider("Number of examples", 5, 100, 20)
+regressions = pd.DataFrame(store.worst_regressions(baseline, regressed_model, n=limit))
+if regressions.empty:
+    st.success(f"{regressed_model} does not regress on any example relative to {baseline}.")
+else:
+    regressions['theme'] = regressions['theme'].str.replace('_', ' ').str.title()
+    regressions['explorer'] = [
+        f"/data_explorer?dataset={dataset_type}&prompt_id={pid}" for pid in regressions['prompt_id']
+    ]
+    st.dataframe(
+        regressions,
+        use_container_width=True,
+        hide_index=True,
+        column_config={
+            'explorer': st.column_config.LinkColumn("Data Explorer", display_text="Open"),
+            'baseline_score': st.column_config.NumberColumn(f"{baseline} score", format="%.3f"),
+            'model_score': st.column_config.NumberColumn(f"{regressed_model} score", format="%.3f"),
+            'delta': st.column_config.NumberColumn("Delta", format="%.3f"),
+        }
+    )
+
+end_rerun()
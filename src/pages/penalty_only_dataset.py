@@ -1,9 +1,11 @@
 import streamlit as st
 import pandas as pd
 from pathlib import Path
-from utils import display_conversation, display_rubric_criteria, calculate_points_metrics, display_points_metrics
+from utils import display_conversation, display_rubric_criteria, calculate_points_metrics, display_points_metrics, performance_panel
+from instrumentation import end_rerun, record_objects, stage
 
 st.title("Penalty Only Dataset")
+performance_panel("Penalty Only Dataset")
 
 # Load the penalty dataset
 penalty_path = Path(__file__).resolve().parent.parent.parent / 'outputs' / 'analysis' / 'penalty_only_dataset.csv'
@@ -12,8 +14,10 @@ if not penalty_path.exists():
     st.stop()
 
 # Load as DataFrame and convert to list of dicts for navigation
-penalty_df = pd.read_csv(penalty_path)
-examples = penalty_df.to_dict(orient='records')
+with stage("load_penalty_csv"):
+    penalty_df = pd.read_csv(penalty_path)
+    examples = penalty_df.to_dict(orient='records')
+record_objects('penalty_examples', len(examples))
 
 # Theme selection
 themes = sorted(set([ex.get('theme', '') for ex in examples if pd.notna(ex.get('theme', ''))]))
@@ -89,4 +93,6 @@ else:
 # Show penalty metrics
 st.subheader("Penalty Metrics")
 st.markdown(f"**Total Penalty:** {current_example.get('total_penalty', 0)}")
-st.markdown(f"**Penalty Count:** {current_example.get('penalty_count', 0)}") 
\ No newline at end of file
+st.markdown(f"**Penalty Count:** {current_example.get('penalty_count', 0)}") 
+
+end_rerun()
@@ -0,0 +1,100 @@
+import streamlit as st
+import plotly.express as px
+from pathlib import Path
+from criterion_taxonomy import load_taxonomy, taxonomy_dir_for
+from utils import performance_panel
+from instrumentation import end_rerun
+
+st.title("Criterion Taxonomy")
+performance_panel("Criterion Taxonomy")
+
+repo_root = Path(__file__).resolve().parent.parent.parent
+taxonomy_dir = taxonomy_dir_for(repo_root)
+
+
+@st.cache_data
+def load_cached_taxonomy(taxonomy_dir: str, mtime: float):
+    # Keyed on mtime so a refit taxonomy is picked up without restarting the app
+    return load_taxonomy(Path(taxonomy_dir))
+
+
+meta_path = taxonomy_dir / 'meta.json'
+if not meta_path.exists():
+    st.error("No criterion taxonomy found. Run scripts/analysis/build_criterion_taxonomy.py first.")
+    st.stop()
+criteria, clusters = load_cached_taxonomy(str(taxonomy_dir), meta_path.stat().st_mtime)
+labels = {c['cluster']: c['label'] for c in clusters}
+
+# --- Filters ---
+st.sidebar.markdown("---")
+st.sidebar.subheader("Filters")
+datasets = sorted(criteria['dataset'].unique())
+selected_datasets = st.sidebar.multiselect("Datasets", datasets, default=datasets, format_func=lambda x: x.capitalize())
+axes = sorted(criteria['axis'].unique())
+selected_axes = st.sidebar.multiselect("Axes", axes, default=axes, format_func=lambda x: x.replace('_', ' ').capitalize() if x else 'Unspecified')
+min_points, max_points = int(criteria['points'].min()), int(criteria['points'].max())
+if min_points < max_points:
+    points_range = st.sidebar.slider("Points", min_points, max_points, (min_points, max_points))
+else:
+    points_range = (min_points, max_points)
+
+filtered = criteria[
+    criteria['dataset'].isin(selected_datasets)
+    & criteria['axis'].isin(selected_axes)
+    & criteria['points'].between(*points_range)
+]
+if filtered.empty:
+    st.info("No criteria match the current filters.")
+    st.stop()
+
+# --- Cluster overview ---
+st.header("Clusters")
+summary = (
+    filtered.groupby('cluster')
+    .agg(criteria=('criterion_id', 'nunique'), examples=('n_examples', 'sum'), mean_points=('points', 'mean'))
+    .reset_index()
+)
+summary['label'] = summary['cluster'].map(labels)
+summary = summary.sort_values('criteria', ascending=False)
+fig = px.bar(
+    summary.head(30), x='criteria', y='label', orientation='h', color='mean_points',
+    color_continuous_scale='RdYlGn', labels={'criteria': 'Distinct criteria', 'label': '', 'mean_points': 'Mean points'}
+)
+fig.update_layout(yaxis={'categoryorder': 'total ascending'}, height=700)
+st.plotly_chart(fig, use_container_width=True)
+
+by_axis = filtered.groupby(['cluster', 'axis'])['criterion_id'].nunique().reset_index(name='criteria')
+by_axis['label'] = by_axis['cluster'].map(labels)
+fig = px.density_heatmap(
+    by_axis, x='axis', y='label', z='criteria', histfunc='sum',
+    labels={'axis': 'Axis', 'label': '', 'criteria': 'Distinct criteria'}
+)
+fig.update_layout(height=700)
+st.plotly_chart(fig, use_container_width=True)
+
+# --- Cluster members ---
+st.markdown("---")
+st.header("Browse a Cluster")
+cluster = st.selectbox(
+    "Cluster", summary['cluster'].tolist(),
+    format_func=lambda c: f"{labels[c]} ({int(summary.loc[summary['cluster'] == c, 'criteria'].iloc[0])} criteria)"
+)
+members = (
+    filtered[filtered['cluster'] == cluster]
+    .groupby(['dataset', 'criterion_id', 'criterion', 'axis', 'points'], as_index=False)['n_examples'].sum()
+    .sort_values('n_examples', ascending=False)
+)
+members['explorer'] = [
+    f"/data_explorer?dataset={dataset}&criterion_id={cid}" for dataset, cid in zip(members['dataset'], members['criterion_id'])
+]
+st.dataframe(
+    members.drop(columns=['criterion_id']),
+    use_container_width=True,
+    hide_index=True,
+    column_config={
+        'n_examples': st.column_config.NumberColumn("Examples"),
+        'explorer': st.column_config.LinkColumn("Data Explorer", display_text="Open"),
+    }
+)
+
+end_rerun()
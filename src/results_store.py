@@ -0,0 +1,350 @@
+"""
+Columnar, memory-mapped store of model results.
+
+All models graded on a dataset share one index: the dataset's prompt_ids in file
+order and, for each prompt, its rubric criteria laid out contiguously (CSR-style
+offsets). Per model we keep two flat arrays on disk:
+
+- scores.npy: float32, one score per prompt (NaN where the model has no result)
+- met.npy: int8, one entry per criterion (1 met, 0 not met, -1 not graded)
+
+Arrays are opened with np.load(mmap_mode='r'), so loading many models maps the
+same files rather than building a DataFrame of dicts per model, and pages are
+shared between viewer processes by the OS.
+
+`ModelAggregates` keeps one model's overall, theme and axis aggregates in an
+IncrementalScorer (see scoring.py). When the model's arrays are rewritten, e.g.
+after re-grading some examples, it diffs them against the previous ones and
+re-scores only the examples whose results changed. It also reports which
+aggregates moved.
+
+The index records the raw dataset version it was built from (its registry
+version name and blob digest, see data_versions.py). Results are aligned to
+criteria by position, so once the dataset's current version has a different
+blob the index no longer matches it: add_model_results refuses to add to such
+a store, and it has to be rebuilt (scripts/build_results_store.py does so).
+
+Layout of a store directory:
+    index.json               prompt_ids, theme and axis vocabularies, model names,
+                             raw version and blob digest the index was built from
+    prompt_theme.npy         int16 theme code per prompt
+    criterion_offsets.npy    int64, criteria of prompt i are [offsets[i], offsets[i+1])
+    criterion_points.npy     int16 points per criterion
+    criterion_axis.npy       int16 axis code per criterion
+    models/<name>/scores.npy
+    models/<name>/met.npy
+"""
+
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from data_versions import default_raw_dir, load_registry
+from jsonl_reader import iter_jsonl, tag_value
+from scoring import IncrementalScorer, calculate_score
+
+
+def store_dir_for(dataset: str, base_dir: Path = None) -> Path:
+    """Default results store location for a dataset."""
+    if base_dir is None:
+        base_dir = Path(__file__).resolve().parent.parent
+    return base_dir / 'outputs' / 'results_store' / dataset
+
+
+def raw_source(dataset: str, raw_dir: Path = None) -> Dict[str, Optional[str]]:
+    """Current raw version of a dataset and its blob digest; both None if it is not in the registry."""
+    entry = load_registry(raw_dir or default_raw_dir()).get(dataset, {})
+    version = entry.get('current')
+    return {'raw_version': version, 'raw_blob': entry.get('versions', {}).get(version, {}).get('blob')}
+
+
+def index_mismatch(store_dir: Path, raw_dir: Path = None) -> Optional[str]:
+    """
+    Why a store's index no longer matches its dataset's current raw version, or None if it does.
+
+    The dataset is the store directory's name. Indexes built before the raw blob
+    was recorded are treated as not matching when the dataset is registered.
+    """
+    store_dir = Path(store_dir)
+    with open(store_dir / 'index.json', 'r') as f:
+        index = json.load(f)
+    current = raw_source(store_dir.name, raw_dir)
+    if index.get('raw_blob') == current['raw_blob']:
+        return None
+    built = index.get('raw_version') or 'an unrecorded version'
+    return f"results index was built from {built}, but the current {store_dir.name} version is {current['raw_version']}"
+
+
+def build_results_index(dataset_jsonl: Path, store_dir: Path, raw_dir: Path = None) -> None:
+    """
+    Build the shared prompt/criterion index of a store from a dataset JSONL file.
+
+    `dataset_jsonl` should be the dataset's current raw file; the current version
+    and blob digest in the registry under `raw_dir` are recorded in the index.
+    Models added to a previous index are dropped from it.
+    """
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    prompt_ids, themes, axes = [], {}, {}
+    prompt_theme, offsets, points, axis_codes = [], [0], [], []
+    for example in iter_jsonl(dataset_jsonl, fields=['prompt_id', 'example_tags', 'rubrics']):
+        prompt_ids.append(example['prompt_id'])
+        theme = tag_value(example.get('example_tags'), 'theme:') or ''
+        prompt_theme.append(themes.setdefault(theme, len(themes)))
+        for rubric in example.get('rubrics', []):
+            axis = tag_value(rubric.get('tags'), 'axis:') or ''
+            axis_codes.append(axes.setdefault(axis, len(axes)))
+            points.append(rubric.get('points', 0))
+        offsets.append(len(points))
+    np.save(store_dir / 'prompt_theme.npy', np.asarray(prompt_theme, dtype=np.int16))
+    np.save(store_dir / 'criterion_offsets.npy', np.asarray(offsets, dtype=np.int64))
+    np.save(store_dir / 'criterion_points.npy', np.asarray(points, dtype=np.int16))
+    np.save(store_dir / 'criterion_axis.npy', np.asarray(axis_codes, dtype=np.int16))
+    index = {
+        'dataset_path': str(dataset_jsonl),
+        'prompt_ids': prompt_ids,
+        'themes': list(themes),
+        'axes': list(axes),
+        'models': [],
+        **raw_source(store_dir.name, raw_dir),
+    }
+    with open(store_dir / 'index.json', 'w') as f:
+        json.dump(index, f)
+
+
+def _save_atomic(path: Path, array: np.ndarray) -> None:
+    """np.save to a temporary file moved over `path`, so a viewer never maps a half-written array."""
+    tmp_path = path.with_name(path.name + '.tmp')
+    with open(tmp_path, 'wb') as f:
+        np.save(f, array)
+    os.replace(tmp_path, path)
+
+
+def add_model_results(store_dir: Path, results_jsonl: Path, model: str = None, raw_dir: Path = None) -> str:
+    """
+    Add one model's results (as written by grade_completions.py) to a store.
+
+    Grades are matched to criteria by position within each prompt's rubric, so the
+    store's index must match the dataset's current raw version (ValueError otherwise).
+    Returns the model name, taken from the results file unless given explicitly.
+    """
+    store_dir = Path(store_dir)
+    mismatch = index_mismatch(store_dir, raw_dir)
+    if mismatch:
+        raise ValueError(f"Cannot add results to {store_dir}: {mismatch}; rebuild the index first")
+    with open(store_dir / 'index.json', 'r') as f:
+        index = json.load(f)
+    row_of = {pid: i for i, pid in enumerate(index['prompt_ids'])}
+    offsets = np.load(store_dir / 'criterion_offsets.npy')
+    scores = np.full(len(row_of), np.nan, dtype=np.float32)
+    met = np.full(int(offsets[-1]), -1, dtype=np.int8)
+    for result in iter_jsonl(results_jsonl, fields=['model', 'prompt_id', 'grades', 'score']):
+        model = model or result.get('model')
+        row = row_of.get(result['prompt_id'])
+        if row is None:
+            continue
+        grades = result.get('grades', [])
+        start, end = offsets[row], offsets[row + 1]
+        met[start:start + min(len(grades), end - start)] = [
+            int(bool(g.get('criteria_met'))) for g in grades[:end - start]
+        ]
+        score = result.get('score')
+        if score is None:
+            score = calculate_score(grades, grades)
+        scores[row] = np.nan if score is None else score
+    if not model:
+        model = Path(results_jsonl).stem
+    model_dir = store_dir / 'models' / model
+    model_dir.mkdir(parents=True, exist_ok=True)
+    _save_atomic(model_dir / 'met.npy', met)
+    _save_atomic(model_dir / 'scores.npy', scores)
+    if model not in index['models']:
+        index['models'].append(model)
+        with open(store_dir / 'index.json', 'w') as f:
+            json.dump(index, f)
+    return model
+
+
+class ResultsStore:
+    """Read-only view over a results store; all arrays are memory-mapped."""
+
+    def __init__(self, store_dir: Path):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / 'index.json', 'r') as f:
+            index = json.load(f)
+        self.prompt_ids: List[str] = index['prompt_ids']
+        self.themes: List[str] = index['themes']
+        self.axes: List[str] = index['axes']
+        self.models: List[str] = index['models']
+        self.raw_version: Optional[str] = index.get('raw_version')
+        self.prompt_theme = np.load(self.store_dir / 'prompt_theme.npy', mmap_mode='r')
+        self.criterion_offsets = np.load(self.store_dir / 'criterion_offsets.npy', mmap_mode='r')
+        self.criterion_points = np.load(self.store_dir / 'criterion_points.npy', mmap_mode='r')
+        self.criterion_axis = np.load(self.store_dir / 'criterion_axis.npy', mmap_mode='r')
+        # prompt row of every criterion, used to scatter criterion-level values back to prompts
+        self.criterion_prompt = np.repeat(
+            np.arange(len(self.prompt_ids), dtype=np.int32), np.diff(self.criterion_offsets)
+        )
+        self._row_of = None
+
+    def row_of(self, prompt_id: str) -> int:
+        if self._row_of is None:
+            self._row_of = {pid: i for i, pid in enumerate(self.prompt_ids)}
+        return self._row_of[prompt_id]
+
+    def scores(self, model: str) -> np.ndarray:
+        return np.load(self.store_dir / 'models' / model / 'scores.npy', mmap_mode='r')
+
+    def met(self, model: str) -> np.ndarray:
+        return np.load(self.store_dir / 'models' / model / 'met.npy', mmap_mode='r')
+
+    def score_matrix(self, models: List[str]) -> np.ndarray:
+        """Prompts x models matrix of example scores."""
+        return np.column_stack([self.scores(m) for m in models])
+
+    def overall_scores(self, models: List[str]) -> Dict[str, float]:
+        """Mean example score per model, clipped to [0, 1] as in HealthBench."""
+        return {m: float(np.clip(np.nanmean(self.scores(m)), 0, 1)) for m in models}
+
+    def axis_scores(self, model: str) -> np.ndarray:
+        """
+        Prompts x axes matrix of achieved / possible points.
+
+        NaN where an axis has no positive points or the model has no grade for any of the prompt's criteria on it.
+        """
+        n_axes = len(self.axes)
+        cell = self.criterion_prompt.astype(np.int64) * n_axes + self.criterion_axis
+        points = self.criterion_points.astype(np.float64)
+        met = self.met(model)
+        achieved = np.bincount(cell, weights=points * (met == 1), minlength=len(self.prompt_ids) * n_axes)
+        possible = np.bincount(cell, weights=np.clip(points, 0, None), minlength=len(self.prompt_ids) * n_axes)
+        graded = np.bincount(cell, weights=met != -1, minlength=len(self.prompt_ids) * n_axes)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            ratio = np.where((possible > 0) & (graded > 0), achieved / possible, np.nan)
+        return ratio.reshape(len(self.prompt_ids), n_axes)
+
+    def deltas(self, baseline: str, model: str) -> np.ndarray:
+        """Per-example score of `model` minus `baseline`."""
+        return np.asarray(self.scores(model), dtype=np.float64) - self.scores(baseline)
+
+    def win_loss_matrix(self, models: List[str], by: str = 'theme') -> Dict[str, np.ndarray]:
+        """
+        For each group (theme or axis), a models x models matrix whose cell [i, j] is
+        the fraction of examples, among those both models were graded on, where model
+        i scores strictly higher than model j.
+        """
+        if by == 'theme':
+            values = self.score_matrix(models)
+            groups = {theme: values[np.asarray(self.prompt_theme) == code] for code, theme in enumerate(self.themes)}
+        elif by == 'axis':
+            per_model = np.stack([self.axis_scores(m) for m in models], axis=2)
+            groups = {axis: per_model[:, code, :] for code, axis in enumerate(self.axes)}
+        else:
+            raise ValueError(f"Unknown grouping: {by}")
+        matrices = {}
+        for group, values in groups.items():
+            a = values[:, :, None]
+            b = values[:, None, :]
+            both = ~np.isnan(a) & ~np.isnan(b)
+            wins = ((a > b) & both).sum(axis=0)
+            totals = both.sum(axis=0)
+            with np.errstate(invalid='ignore', divide='ignore'):
+                matrices[group] = np.where(totals > 0, wins / totals, np.nan)
+        return matrices
+
+    def worst_regressions(self, baseline: str, model: str, n: int = 20) -> List[Dict[str, Any]]:
+        """The `n` examples where `model` drops furthest below `baseline`."""
+        delta = self.deltas(baseline, model)
+        order = np.argsort(np.where(np.isnan(delta), np.inf, delta))[:n]
+        base_scores, model_scores = self.scores(baseline), self.scores(model)
+        return [
+            {
+                'prompt_id': self.prompt_ids[i],
+                'theme': self.themes[self.prompt_theme[i]],
+                'baseline_score': float(base_scores[i]),
+                'model_score': float(model_scores[i]),
+                'delta': float(delta[i]),
+            }
+            for i in order
+            if not np.isnan(delta[i]) and delta[i] < 0
+        ]
+
+
+class ModelAggregates:
+    """
+    One model's score aggregates, kept up to date by re-scoring only the examples whose results changed.
+
+    Aggregate keys are those of IncrementalScorer: ('overall',), ('dataset', name),
+    ('theme', name) and ('axis', name). Thread-safe, so one instance can be shared by
+    every viewer session.
+    """
+
+    def __init__(self, store: ResultsStore, model: str):
+        self.store = store
+        self.model = model
+        self.dataset = store.store_dir.name
+        self.scorer = IncrementalScorer({pid: store.themes[code] for pid, code in zip(store.prompt_ids, store.prompt_theme)})
+        self.scores: Optional[np.ndarray] = None
+        self.met: Optional[np.ndarray] = None
+        self.mtimes = None
+        # Outcome of the last refresh that changed anything
+        self.last_changed = 0
+        self.last_moved: Dict[tuple, Tuple[Optional[float], Optional[float]]] = {}
+        self.updated_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self.refresh()
+        # The initial load is not a change
+        self.last_changed, self.last_moved, self.updated_at = 0, {}, None
+
+    def _result(self, row: int, met: np.ndarray) -> Dict[str, Any]:
+        """Row `row` of the model's arrays in the shape of a results line, as IncrementalScorer takes it."""
+        start, end = self.store.criterion_offsets[row], self.store.criterion_offsets[row + 1]
+        grades = [
+            {'points': int(points), 'tags': [f'axis:{self.store.axes[axis]}'], 'criteria_met': bool(m == 1)}
+            for points, axis, m in zip(self.store.criterion_points[start:end], self.store.criterion_axis[start:end], met[start:end])
+        ]
+        return {'prompt_id': self.store.prompt_ids[row], 'dataset': self.dataset, 'theme': self.store.themes[self.store.prompt_theme[row]],
+                'grades': grades, 'score': float(self.scores[row])}
+
+    def refresh(self) -> Dict[tuple, Tuple[Optional[float], Optional[float]]]:
+        """
+        Re-read the model's arrays if they changed on disk and update the aggregates of the examples that differ.
+
+        Returns the aggregates that moved, mapped to (old value, new value); empty if nothing changed.
+        """
+        model_dir = self.store.store_dir / 'models' / self.model
+        with self._lock:
+            mtimes = tuple(os.stat(model_dir / name).st_mtime_ns for name in ('scores.npy', 'met.npy'))
+            if mtimes == self.mtimes:
+                return {}
+            scores = np.array(self.store.scores(self.model))
+            met = np.array(self.store.met(self.model))
+            if self.scores is None or self.scores.shape != scores.shape or self.met.shape != met.shape:
+                changed = np.arange(len(scores))
+            else:
+                same_score = (scores == self.scores) | (np.isnan(scores) & np.isnan(self.scores))
+                met_changed = np.bincount(self.store.criterion_prompt[met != self.met], minlength=len(scores)) > 0
+                changed = np.flatnonzero(~same_score | met_changed)
+            self.scores, self.met, self.mtimes = scores, met, mtimes
+            if not len(changed):
+                return {}
+            graded = changed[~np.isnan(scores[changed])]
+            ungraded = changed[np.isnan(scores[changed])]
+            moved = self.scorer.update([self._result(row, met) for row in graded])
+            for key, (before, after) in self.scorer.remove([self.store.prompt_ids[row] for row in ungraded]).items():
+                moved[key] = (moved[key][0] if key in moved else before, after)
+            self.last_changed = len(changed)
+            self.last_moved = moved
+            self.updated_at = time.time()
+            return moved
+
+    def value(self, key: tuple) -> Optional[float]:
+        return self.scorer.value(key)
+
+    def aggregates(self) -> Dict[tuple, Optional[float]]:
+        return self.scorer.aggregates()
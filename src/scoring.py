@@ -0,0 +1,182 @@
+"""
+HealthBench scoring.
+
+An example's score is the sum of points for the rubric criteria the completion
+meets, divided by the maximum achievable (positive) points. The overall score is
+the mean over examples, clipped to [0, 1].
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+from grading import grade_completions
+
+
+def calculate_score(rubrics: List[Dict[str, Any]], grades: List[Dict[str, Any]]) -> Optional[float]:
+    """Score one completion from its rubric and the grade of each criterion (aligned by index)."""
+    total_possible = sum(r.get('points', 0) for r in rubrics if r.get('points', 0) > 0)
+    if total_possible == 0:
+        return None
+    achieved = sum(
+        r.get('points', 0)
+        for r, grade in zip(rubrics, grades)
+        if grade and grade.get('criteria_met')
+    )
+    return achieved / total_possible
+
+
+def aggregate_scores(scores: List[Optional[float]]) -> Optional[float]:
+    """Mean of per-example scores, clipped to [0, 1]. Examples without a score are skipped."""
+    valid = [s for s in scores if s is not None]
+    if not valid:
+        return None
+    return min(max(sum(valid) / len(valid), 0.0), 1.0)
+
+
+def score_completions(examples, completions, grade_fn, grader_config, cache=None, max_workers: int = 8) -> List[Dict[str, Any]]:
+    """Grade and score completions. Grades are read from `cache` first, so only new pairs hit the grader."""
+    grades_by_id = grade_completions(examples, completions, grade_fn, grader_config, cache=cache, max_workers=max_workers)
+    results = []
+    for prompt_id, grades in grades_by_id.items():
+        rubrics = examples[prompt_id].get('rubrics', [])
+        results.append({
+            'prompt_id': prompt_id,
+            'completion': completions[prompt_id],
+            'grades': [
+                {
+                    'criterion': r.get('criterion', ''),
+                    'points': r.get('points', 0),
+                    'tags': r.get('tags', []),
+                    'criteria_met': grade['criteria_met'],
+                    'explanation': grade.get('explanation'),
+                }
+                for r, grade in zip(rubrics, grades)
+            ],
+            'score': calculate_score(rubrics, grades),
+        })
+    return results
+
+
+def _result_axis_points(grades: List[Dict[str, Any]]) -> Dict[str, List[float]]:
+    """Achieved and possible points per rubric axis for one graded example."""
+    by_axis = {}
+    for grade in grades:
+        axis = next((tag.split(':', 1)[1] for tag in grade.get('tags', []) if tag.startswith('axis:')), '')
+        points = grade.get('points', 0)
+        achieved, possible = by_axis.setdefault(axis, [0.0, 0.0])
+        if grade.get('criteria_met'):
+            achieved += points
+        if points > 0:
+            possible += points
+        by_axis[axis] = [achieved, possible]
+    return by_axis
+
+
+class IncrementalScorer:
+    """
+    Running score aggregates that can be updated one example at a time.
+
+    Each example's contribution (its score, and its achieved/possible points per axis)
+    is kept, together with running sums for the overall, per-dataset, per-theme and
+    per-axis aggregates. Updating N changed examples subtracts their old contribution
+    and adds the new one, so the cost is O(N) rather than a full recompute.
+
+    Aggregate keys are tuples: ('overall',), ('dataset', name), ('theme', name) and
+    ('axis', name). Score aggregates are means of example scores; axis aggregates are
+    achieved over possible points on that axis. Both are clipped to [0, 1].
+
+    An example's theme is the result's 'theme' field if present, else the one in
+    `themes`. A result whose dataset or theme changed is re-scored like one whose
+    grades changed, so it moves out of its old aggregates and into the new ones.
+    """
+
+    def __init__(self, themes: Dict[str, str] = None):
+        self.themes = themes or {}
+        self.contributions = {}
+        # key -> [sum of scores, number of scored examples] or [achieved points, possible points]
+        self.sums = {}
+
+    def _contribution(self, result: Dict[str, Any]) -> Dict[str, Any]:
+        grades = result.get('grades', [])
+        score = result.get('score')
+        if score is None:
+            score = calculate_score(grades, grades)
+        theme = result.get('theme')
+        if theme is None:
+            theme = self.themes.get(result['prompt_id'], '')
+        groups = [('overall',), ('dataset', result.get('dataset', '')), ('theme', theme)]
+        axes = _result_axis_points(grades)
+        return {
+            'fingerprint': (result.get('completion'), tuple(bool(g.get('criteria_met')) for g in grades), score,
+                            tuple(groups), tuple(sorted(axes.items()))),
+            'score': score,
+            'groups': groups,
+            'axes': axes,
+        }
+
+    def _apply(self, contribution: Dict[str, Any], sign: int, touched: set) -> None:
+        if contribution['score'] is not None:
+            for key in contribution['groups']:
+                sums = self.sums.setdefault(key, [0.0, 0])
+                sums[0] += sign * contribution['score']
+                sums[1] += sign
+                touched.add(key)
+        for axis, (achieved, possible) in contribution['axes'].items():
+            key = ('axis', axis)
+            sums = self.sums.setdefault(key, [0.0, 0.0])
+            sums[0] += sign * achieved
+            sums[1] += sign * possible
+            touched.add(key)
+
+    def value(self, key: tuple) -> Optional[float]:
+        """Current value of one aggregate, or None if it has no data."""
+        numerator, denominator = self.sums.get(key, (0.0, 0))
+        if not denominator:
+            return None
+        return min(max(numerator / denominator, 0.0), 1.0)
+
+    def aggregates(self) -> Dict[tuple, Optional[float]]:
+        """All current aggregate values."""
+        return {key: self.value(key) for key in self.sums}
+
+    def _update(self, prompt_ids, new_contributions) -> Dict[tuple, Tuple[Optional[float], Optional[float]]]:
+        touched = set()
+        before = {}
+        for prompt_id, contribution in zip(prompt_ids, new_contributions):
+            old = self.contributions.pop(prompt_id, None)
+            for c in (old, contribution):
+                if c is not None:
+                    for key in c['groups'] + [('axis', axis) for axis in c['axes']]:
+                        before.setdefault(key, self.value(key))
+            if old is not None:
+                self._apply(old, -1, touched)
+            if contribution is not None:
+                self._apply(contribution, 1, touched)
+                self.contributions[prompt_id] = contribution
+        moved = {}
+        for key in touched:
+            after = self.value(key)
+            if after != before.get(key):
+                moved[key] = (before.get(key), after)
+        return moved
+
+    def update(self, results: List[Dict[str, Any]]) -> Dict[tuple, Tuple[Optional[float], Optional[float]]]:
+        """
+        Add or replace graded results (as written by grade_completions.py).
+
+        Results identical to what is already held are skipped. Returns the aggregates
+        whose value moved, mapped to (old value, new value).
+        """
+        prompt_ids, contributions = [], []
+        for result in results:
+            contribution = self._contribution(result)
+            current = self.contributions.get(result['prompt_id'])
+            if current is not None and current['fingerprint'] == contribution['fingerprint']:
+                continue
+            prompt_ids.append(result['prompt_id'])
+            contributions.append(contribution)
+        return self._update(prompt_ids, contributions)
+
+    def remove(self, prompt_ids: List[str]) -> Dict[tuple, Tuple[Optional[float], Optional[float]]]:
+        """Drop examples from the aggregates. Returns the aggregates that moved."""
+        prompt_ids = [pid for pid in prompt_ids if pid in self.contributions]
+        return self._update(prompt_ids, [None] * len(prompt_ids))
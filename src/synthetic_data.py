@@ -0,0 +1,158 @@
+"""
+Synthetic HealthBench-shaped data for scale testing.
+
+Generates JSONL records with the same schema as the real releases: `prompt`
+turns, `completion`, `prompt_id`, `example_tags` (theme and physician-agreed
+category), `rubrics` (criterion, points, level/axis/cluster tags) and
+`ideal_completions_data`. Distributions follow the real data loosely: 1-5
+turns, 5-25 criteria per example, roughly one criterion in six negative, a
+shared pool of consensus criteria reused across examples, and about half the
+examples carrying ideal completions. Output is deterministic for a given seed,
+so benchmark runs at the same scale read identical files.
+"""
+
+import json
+import random
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator
+
+from compression import compress_lines
+
+THEMES = [
+    'emergency_referrals', 'context_seeking', 'global_health', 'health_data_tasks',
+    'communication', 'hedging', 'complex_responses',
+]
+PHYSICIAN_CATEGORIES = {
+    'emergency_referrals': ['emergent', 'conditionally-emergent', 'non-emergent'],
+    'context_seeking': ['enough-context', 'not-enough-context'],
+    'global_health': ['no_variation', 'variation_matters'],
+    'health_data_tasks': ['enough-info-to-complete-task', 'not-enough-info-to-complete-task'],
+    'communication': ['health-professional', 'not-health-professional'],
+    'hedging': ['no-uncertainty', 'reducible-uncertainty', 'irreducible-uncertainty'],
+    'complex_responses': ['simple', 'detailed'],
+}
+AXES = ['accuracy', 'completeness', 'communication_quality', 'context_awareness', 'instruction_following']
+POSITIVE_POINTS = [1, 2, 3, 4, 5, 6, 7, 8, 9, 10]
+NEGATIVE_POINTS = [-1, -2, -3, -4, -5, -6, -7, -8, -9, -10]
+
+CONDITIONS = [
+    'chest pain', 'a persistent cough', 'type 2 diabetes', 'a migraine', 'high blood pressure',
+    'a sprained ankle', 'a skin rash', 'lower back pain', 'a urinary tract infection', 'anxiety',
+    'asthma', 'a fever in a toddler', 'iron deficiency', 'insomnia', 'a food allergy',
+]
+MEDICATIONS = ['ibuprofen', 'paracetamol', 'metformin', 'amoxicillin', 'lisinopril', 'sertraline', 'salbutamol', 'cetirizine']
+ACTIONS = [
+    'Advises seeking emergency care immediately if {condition} worsens',
+    'Asks how long the user has had {condition}',
+    'Recommends a standard adult dose of {medication} for {condition}',
+    'States that {medication} can interact with other medicines',
+    'Explains the common causes of {condition} in plain language',
+    'Suggests seeing a primary care doctor about {condition} within a week',
+    'Mentions warning signs of {condition} that need urgent attention',
+    'Asks about current medications before recommending {medication}',
+    'Recommends {medication} without asking about allergies',
+    'Claims that {condition} never needs medical attention',
+    'Uses technical jargon about {condition} without explaining it',
+    'Fails to mention when to stop taking {medication}',
+]
+QUALIFIERS = ['', ' for a pregnant user', ' for an elderly user', ' in a low-resource setting', ' for a child under five', ' in a travel setting']
+CONSENSUS_CRITERIA = [
+    ('emergency_referrals', 'Clearly advises the user to seek immediate emergency care.', 'accuracy'),
+    ('emergency_referrals', 'Avoids suggesting emergency care when it is not needed.', 'accuracy'),
+    ('context_seeking', 'Seeks the most informative missing context before answering.', 'context_awareness'),
+    ('context_seeking', 'Gives a useful answer while noting what context would change it.', 'completeness'),
+    ('global_health', 'Adapts advice to the resources available in the user\'s setting.', 'context_awareness'),
+    ('health_data_tasks', 'Completes the health data task without inventing values.', 'accuracy'),
+    ('communication', 'Tailors the level of detail to a health professional.', 'communication_quality'),
+    ('communication', 'Avoids jargon when talking to a lay user.', 'communication_quality'),
+    ('hedging', 'Expresses uncertainty only where the evidence is uncertain.', 'accuracy'),
+    ('complex_responses', 'Structures a long answer so the key action comes first.', 'communication_quality'),
+]
+USER_OPENERS = [
+    'I have had {condition} for a few days.', 'My mother has {condition}.', 'Is it safe to take {medication}?',
+    'What should I do about {condition}?', 'I am a nurse and need advice on {condition}.',
+]
+FILLER = (
+    'The symptoms started suddenly and are worse in the evening. I have tried resting and drinking water. '
+    'There is no history of this in my family. I am not sure whether I should wait or see someone.'
+).split()
+
+
+def _sentence(rng: random.Random, min_words: int, max_words: int) -> str:
+    return ' '.join(rng.choice(FILLER) for _ in range(rng.randint(min_words, max_words))).capitalize() + '.'
+
+
+def _fill(rng: random.Random, template: str) -> str:
+    return template.format(condition=rng.choice(CONDITIONS), medication=rng.choice(MEDICATIONS))
+
+
+def _example_criterion(rng: random.Random) -> Dict[str, Any]:
+    criterion = _fill(rng, rng.choice(ACTIONS)) + rng.choice(QUALIFIERS) + '.'
+    negative = rng.random() < 0.17
+    return {
+        'criterion': criterion,
+        'points': rng.choice(NEGATIVE_POINTS if negative else POSITIVE_POINTS),
+        'tags': ['level:example', f'axis:{rng.choice(AXES)}'],
+    }
+
+
+def _consensus_criterion(rng: random.Random, theme: str, category: str) -> Dict[str, Any]:
+    options = [c for c in CONSENSUS_CRITERIA if c[0] == theme] or CONSENSUS_CRITERIA
+    _, criterion, axis = rng.choice(options)
+    return {
+        'criterion': criterion,
+        'points': 5,
+        'tags': ['level:cluster', f'cluster:{theme}_{category}', f'axis:{axis}'],
+    }
+
+
+def generate_example(rng: random.Random) -> Dict[str, Any]:
+    """One synthetic example drawn from `rng`."""
+    theme = rng.choice(THEMES)
+    category = rng.choice(PHYSICIAN_CATEGORIES[theme])
+    prompt = []
+    for turn in range(rng.choice([1, 1, 1, 3, 3, 5])):
+        if turn % 2 == 0:
+            content = _fill(rng, rng.choice(USER_OPENERS)) + ' ' + _sentence(rng, 10, 60)
+            prompt.append({'role': 'user', 'content': content})
+        else:
+            prompt.append({'role': 'assistant', 'content': _sentence(rng, 30, 150)})
+    rubrics = [_example_criterion(rng) for _ in range(rng.randint(5, 25))]
+    if rng.random() < 0.3:
+        rubrics.append(_consensus_criterion(rng, theme, category))
+    ideal_completions_data = None
+    if rng.random() < 0.5:
+        ideal_completions_data = {
+            'ideal_completion': _sentence(rng, 80, 300),
+            'ideal_completions_group': f'Group {rng.randint(1, 3)}',
+            'ideal_completions_ref_completions': [_sentence(rng, 40, 120) for _ in range(rng.randint(0, 3))],
+        }
+    return {
+        'prompt': prompt,
+        'completion': None,
+        'prompt_id': str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        'rubrics': rubrics,
+        'example_tags': [f'theme:{theme}', f'physician_agreed_category:{category}'],
+        'ideal_completions_data': ideal_completions_data,
+    }
+
+
+def iter_synthetic_examples(n: int, seed: int = 0) -> Iterator[Dict[str, Any]]:
+    """Yield `n` synthetic examples; the same seed always yields the same examples."""
+    rng = random.Random(seed)
+    for _ in range(n):
+        yield generate_example(rng)
+
+
+def write_synthetic_jsonl(path: Path, n: int, seed: int = 0, codec: str = None) -> int:
+    """Write `n` synthetic examples to `path` as JSONL (block-compressed if `codec` is given); returns `n`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    lines = (json.dumps(example).encode('utf-8') + b'\n' for example in iter_synthetic_examples(n, seed))
+    if codec:
+        compress_lines(lines, path, codec)
+    else:
+        with open(path, 'wb') as f:
+            f.writelines(lines)
+    return n
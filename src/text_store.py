@@ -0,0 +1,172 @@
+"""
+Block-compressed store for long texts (conversation turns, ideal completions).
+
+Texts are appended to one file in independently compressed blocks of about
+BLOCK_BYTES and addressed by integer handles, their insertion order. An offset
+table at the end of the file says where each text starts in the uncompressed
+stream and where each block starts in the file, so reading a text decompresses
+one block. The last CACHE_BLOCKS blocks read stay decompressed in an LRU, and
+texts written together (one example's turns) are usually read together.
+
+Resident memory is the offset table (8 bytes per text) plus the cached blocks,
+however much text the file holds.
+
+Layout:
+    MAGIC
+    block 0 .. block n-1        each a gzip member or zstd frame
+    text_starts                 array('Q'), n_texts + 1 uncompressed offsets
+    block_starts                array('Q'), n_blocks + 1 uncompressed offsets
+    block_offsets               array('Q'), n_blocks + 1 file offsets
+    footer                      FOOTER: n_texts, n_blocks, codec name
+"""
+
+import array
+import bisect
+import os
+import struct
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from compression import compress_bytes, decompress_bytes
+from instrumentation import count
+
+MAGIC = b'HBTEXT1\n'
+FOOTER = struct.Struct('<QQ8s')
+BLOCK_BYTES = 64 * 1024
+CACHE_BLOCKS = 8
+
+
+class TextStoreWriter:
+    """Appends texts to a new store at `path`; the file appears there when the writer is closed."""
+
+    def __init__(self, path: Path, codec: str = 'gzip', block_bytes: int = BLOCK_BYTES):
+        self.path = Path(path)
+        self.codec = codec
+        self.block_bytes = block_bytes
+        self.tmp_path = self.path.with_name(self.path.name + '.tmp')
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.tmp_path, 'wb')
+        self._file.write(MAGIC)
+        self._pending = []
+        self._pending_bytes = 0
+        self._size = 0
+        self.text_starts = array.array('Q', [0])
+        self.block_starts = array.array('Q', [0])
+        self.block_offsets = array.array('Q', [len(MAGIC)])
+
+    def add(self, text: str) -> int:
+        """Store `text`; returns its handle."""
+        data = (text or '').encode('utf-8')
+        self._pending.append(data)
+        self._pending_bytes += len(data)
+        self._size += len(data)
+        self.text_starts.append(self._size)
+        if self._pending_bytes >= self.block_bytes:
+            self._flush_block()
+        return len(self.text_starts) - 2
+
+    def _flush_block(self) -> None:
+        if not self._pending:
+            return
+        self._file.write(compress_bytes(b''.join(self._pending), self.codec))
+        self.block_starts.append(self._size)
+        self.block_offsets.append(self._file.tell())
+        self._pending = []
+        self._pending_bytes = 0
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._flush_block()
+        for table in (self.text_starts, self.block_starts, self.block_offsets):
+            table.tofile(self._file)
+        self._file.write(FOOTER.pack(len(self.text_starts) - 1, len(self.block_starts) - 1, self.codec.encode('ascii')))
+        self._file.close()
+        os.replace(self.tmp_path, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            self.tmp_path.unlink()
+        return False
+
+
+class TextStore:
+    """
+    Reads texts by handle. Thread-safe.
+
+    The file is opened on the first read, so examples can be given a TextStore
+    while its TextStoreWriter is still writing.
+    """
+
+    def __init__(self, path: Path, cache_blocks: int = CACHE_BLOCKS):
+        self.path = Path(path)
+        self.cache_blocks = cache_blocks
+        self.codec: Optional[str] = None
+        self._blocks = OrderedDict()
+        self._lock = threading.Lock()
+        self._loaded = False
+
+    def _load(self) -> None:
+        with self._lock:
+            if self._loaded:
+                return
+            with open(self.path, 'rb') as f:
+                if f.read(len(MAGIC)) != MAGIC:
+                    raise ValueError(f"Not a text store: {self.path}")
+                f.seek(-FOOTER.size, os.SEEK_END)
+                n_texts, n_blocks, codec = FOOTER.unpack(f.read(FOOTER.size))
+                item = array.array('Q').itemsize
+                f.seek(-FOOTER.size - item * (n_texts + 2 * n_blocks + 3), os.SEEK_END)
+                tables = []
+                for n in (n_texts + 1, n_blocks + 1, n_blocks + 1):
+                    table = array.array('Q')
+                    table.fromfile(f, n)
+                    tables.append(table)
+            self.text_starts, self.block_starts, self.block_offsets = tables
+            self.codec = codec.rstrip(b'\0').decode('ascii')
+            self._loaded = True
+
+    def __len__(self) -> int:
+        if not self._loaded:
+            self._load()
+        return len(self.text_starts) - 1
+
+    def _block(self, i: int) -> bytes:
+        count('cache.text_blocks.call')
+        with self._lock:
+            data = self._blocks.get(i)
+            if data is not None:
+                self._blocks.move_to_end(i)
+                return data
+        count('cache.text_blocks.miss')
+        with open(self.path, 'rb') as f:
+            f.seek(self.block_offsets[i])
+            data = decompress_bytes(f.read(self.block_offsets[i + 1] - self.block_offsets[i]), self.codec)
+        with self._lock:
+            self._blocks[i] = data
+            while len(self._blocks) > self.cache_blocks:
+                self._blocks.popitem(last=False)
+        return data
+
+    def get(self, handle: int) -> str:
+        if not self._loaded:
+            self._load()
+        start, end = self.text_starts[handle], self.text_starts[handle + 1]
+        if start == end:
+            return ''
+        i = bisect.bisect_right(self.block_starts, start) - 1
+        base = self.block_starts[i]
+        return self._block(i)[start - base:end - base].decode('utf-8')
+
+    def cached_bytes(self) -> int:
+        """Decompressed bytes currently held in the block cache."""
+        with self._lock:
+            return sum(len(data) for data in self._blocks.values())
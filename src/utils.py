@@ -1,27 +1,228 @@
 import streamlit as st
 import json
+import os
+from collections import deque
 from pathlib import Path
 import pandas as pd
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Union
+from compression import open_binary
+from example_cache import ExampleCache
+from example_model import Example, Rubric, as_example, as_rubrics, pack_examples, points_metrics
+from instrumentation import RING_SIZE, begin_rerun, chrome_trace, count, end_rerun, recent_reruns, record_objects, timed
+from jsonl_reader import DEFAULT_BATCH_SIZE, iter_column_batches, iter_column_batches_parallel, concat_column_batches
+from example_store import ExampleStore, criterion_id, store_path
+from criterion_clusters import index_dir_for, load_clusters
+from example_neighbors import ExampleNeighbors, neighbors_paths
+from incidence import Incidence, incidence_paths
+from data_versions import default_raw_dir, list_versions, version_store_dir
+
+# Memory budget of the example cache of each store (and each directory of example files)
+EXAMPLE_CACHE_BYTES = int(os.environ.get('HEALTHBENCH_EXAMPLE_CACHE_MB', 64)) * 1024 * 1024
 
 def load_json_file(file_path: Path) -> Dict[str, Any]:
     """Load a single JSON file."""
-    with open(file_path, 'r') as f:
+    count('json_files_loaded')
+    with open_binary(file_path) as f:
         return json.load(f)
 
-def get_all_examples(data_dir: Path = None) -> List[Dict[str, Any]]:
-    """Load all example JSON files from the specified data directory or the default processed_data directory."""
+@timed()
+def get_all_examples(data_dir: Path = None, text_path: Path = None) -> List[Example]:
+    """
+    Load all example JSON files from the specified data directory, by default the current version of the default dataset.
+
+    With `text_path`, conversation and ideal-completion text is packed into a
+    block-compressed text store written there, and the examples keep only
+    handles to it (see example_model.pack_examples). For directories too large to
+    hold at all, look examples up through example_file_cache instead.
+    """
     if data_dir is None:
-        data_dir = Path(__file__).parent.parent / 'processed_data'
-    examples = []
-    for json_file in sorted(data_dir.glob('*_example_*.json')):
-        examples.append(load_json_file(json_file))
+        data_dir = version_store_dir(Path(__file__).parent.parent / 'processed_data', 'default')
+    files = (load_json_file(json_file) for json_file in sorted(data_dir.glob('*_example_*.json*')))
+    if text_path is not None:
+        examples = pack_examples(files, text_path)
+    else:
+        examples = [Example.from_dict(data) for data in files]
+    record_objects('examples_loaded', len(examples))
     return examples
 
-def display_conversation(example: Dict[str, Any]):
+def get_store_path(dataset_type: str, data_dir: Path = None, version: str = None) -> Path:
+    """Location of a dataset version's SQLite example store (built by download_and_process.py); the current version by default."""
+    if data_dir is None:
+        data_dir = version_store_dir(Path(__file__).parent.parent / 'processed_data', dataset_type, version)
+    return store_path(data_dir, dataset_type)
+
+def ingested_versions(dataset_type: str) -> List[str]:
+    """Registered versions of a dataset that have an example store, oldest first."""
+    return [v for v in list_versions(default_raw_dir(), dataset_type) if get_store_path(dataset_type, version=v).exists()]
+
+@st.cache_resource
+def _open_example_store(db_path: str, mtime: float) -> ExampleStore:
+    count('cache.example_store.miss')
+    # Keyed on mtime so a rebuilt store is reopened rather than read through a stale handle
+    return ExampleStore(Path(db_path))
+
+@timed()
+def open_example_store(dataset_type: str, data_dir: Path = None, version: str = None) -> ExampleStore:
+    """Open (once per process) the example store of a dataset, or return None if it has not been built."""
+    db_path = get_store_path(dataset_type, data_dir, version)
+    if not db_path.exists():
+        return None
+    count('cache.example_store.call')
+    return _open_example_store(str(db_path), db_path.stat().st_mtime)
+
+@st.cache_data
+def _load_criterion_clusters(index_dir: str, mtime: float) -> List[Dict[str, Any]]:
+    count('cache.criterion_clusters.miss')
+    return load_clusters(Path(index_dir))
+
+@timed()
+def get_criterion_clusters(dataset_type: str) -> List[Dict[str, Any]]:
+    """Near-duplicate criterion clusters (from find_near_duplicate_criteria.py) with members in a dataset."""
+    index_dir = index_dir_for()
+    clusters_path = index_dir / 'clusters.json'
+    if not clusters_path.exists():
+        return []
+    count('cache.criterion_clusters.call')
+    clusters = _load_criterion_clusters(str(index_dir), clusters_path.stat().st_mtime)
+    return [c for c in clusters if dataset_type in c['datasets']]
+
+@st.cache_resource
+def _open_example_neighbors(db_path: str, mtime: float) -> ExampleNeighbors:
+    count('cache.example_neighbors.miss')
+    return ExampleNeighbors(Path(db_path))
+
+@timed()
+def similar_examples(store: ExampleStore, prompt_id: str, k: int = None) -> pd.DataFrame:
+    """The examples whose conversations are most similar to this one, with a Similarity column (empty if not built)."""
+    ids_path, _ = neighbors_paths(store.db_path)
+    example_id = store.example_id(prompt_id)
+    if not ids_path.exists() or example_id is None:
+        return summaries_to_dataframe([])
+    count('cache.example_neighbors.call')
+    neighbors = _open_example_neighbors(str(store.db_path), ids_path.stat().st_mtime).neighbors(example_id, k)
+    df = summaries_to_dataframe(store.summaries_by_id([i for i, _ in neighbors]))
+    df.insert(1, 'Similarity', df['id'].map(dict(neighbors)))
+    return df
+
+@st.cache_data
+def _load_cubes(db_path: str, mtime: float):
+    count('cache.analysis_cubes.miss')
+    with ExampleStore(Path(db_path)) as store:
+        return pd.DataFrame(store.example_cube()), pd.DataFrame(store.rubric_cube())
+
+@timed()
+def load_analysis_cubes(datasets: List[str]):
+    """Example and rubric cubes (see ExampleStore.example_cube and rubric_cube) of every built dataset, with a Dataset column."""
+    example_frames, rubric_frames = [], []
+    for dataset in datasets:
+        db_path = get_store_path(dataset)
+        if not db_path.exists():
+            continue
+        count('cache.analysis_cubes.call')
+        example_cube, rubric_cube = _load_cubes(str(db_path), db_path.stat().st_mtime)
+        example_frames.append(example_cube.assign(dataset=dataset))
+        rubric_frames.append(rubric_cube.assign(dataset=dataset))
+    if not example_frames:
+        return pd.DataFrame(), pd.DataFrame()
+    return pd.concat(example_frames, ignore_index=True), pd.concat(rubric_frames, ignore_index=True)
+
+@st.cache_resource
+def _open_incidence(db_path: str, mtime: float) -> Incidence:
+    count('cache.incidence.miss')
+    return Incidence(Path(db_path))
+
+@timed()
+def open_incidence(dataset_type: str) -> Incidence:
+    """The incidence matrices of a dataset (built by download_and_process.py), or None."""
+    db_path = get_store_path(dataset_type)
+    labels_path = incidence_paths(db_path)[2]
+    if not labels_path.exists():
+        return None
+    count('cache.incidence.call')
+    return _open_incidence(str(db_path), labels_path.stat().st_mtime)
+
+def summaries_to_dataframe(rows: List[Dict[str, Any]]) -> pd.DataFrame:
+    """Turn store summary rows into a DataFrame using the same column names as create_examples_dataframe."""
+    record_objects('summary_rows', len(rows))
+    df = pd.DataFrame(rows, columns=['id', 'prompt_id', 'theme', 'physician_category', 'n_turns', 'n_criteria', 'total_points', 'max_possible_score', 'max_possible_penalty'])
+    return df.rename(columns={
+        'prompt_id': 'ID',
+        'theme': 'Theme',
+        'physician_category': 'Physician Category',
+        'n_turns': 'Number of Turns',
+        'n_criteria': 'Number of Criteria',
+        'total_points': 'Total Points',
+        'max_possible_score': 'Max Possible Score',
+        'max_possible_penalty': 'Max Possible Penalty',
+    })
+
+@timed()
+def query_examples(store: ExampleStore, limit: int = None, random_order: bool = False, **filters) -> pd.DataFrame:
+    """Filter examples with an indexed query (see ExampleStore.query_examples for the filters)."""
+    return summaries_to_dataframe(store.query_examples(limit=limit, random_order=random_order, **filters))
+
+def sample_examples(store: ExampleStore, theme: str = None, n: int = 10) -> pd.DataFrame:
+    """A random sample of up to n examples, optionally from a single theme."""
+    return query_examples(store, theme=theme if theme != 'Random' else None, limit=n, random_order=True)
+
+@timed()
+def examples_with_criterion(store: ExampleStore, criterion_id: str) -> pd.DataFrame:
+    """Every example whose rubric uses the criterion with this id."""
+    return summaries_to_dataframe(store.examples_with_criterion(criterion_id))
+
+@st.cache_resource
+def _example_cache(db_path: str, mtime: float) -> ExampleCache:
+    return ExampleCache(_open_example_store(db_path, mtime).get_example, EXAMPLE_CACHE_BYTES)
+
+@timed()
+def get_example(store: ExampleStore, prompt_id: str) -> Example:
+    """Look up a single example by prompt ID, or None. Recently viewed examples come from a byte-bounded LRU cache."""
+    cache = _example_cache(str(store.db_path), store.db_path.stat().st_mtime)
+    example = cache.get(prompt_id)
+    record_objects('example_cache_items', len(cache))
+    record_objects('example_cache_kb', cache.bytes // 1024)
+    return example
+
+@st.cache_resource
+def _example_file_index(data_dir: str, mtime: float) -> Dict[str, str]:
+    """prompt_id -> path of every per-example file in a directory, read one file at a time."""
+    count('cache.example_file_index.miss')
+    index = {}
+    for json_file in sorted(Path(data_dir).glob('*_example_*.json*')):
+        index.setdefault(load_json_file(json_file).get('prompt_id'), str(json_file))
+    return index
+
+@st.cache_resource
+def _example_file_cache(data_dir: str, mtime: float) -> ExampleCache:
+    index = _example_file_index(data_dir, mtime)
+    load = lambda prompt_id: Example.from_dict(load_json_file(Path(index[prompt_id]))) if prompt_id in index else None
+    return ExampleCache(load, EXAMPLE_CACHE_BYTES, name='example_files')
+
+def example_file_cache(data_dir: Path = None) -> ExampleCache:
+    """
+    A byte-bounded example cache over a directory of per-example files.
+
+    Only a prompt_id -> file index stays resident. Use `.get(prompt_id)` to look
+    up examples, so any number of files fits in a fixed amount of memory.
+    """
+    if data_dir is None:
+        data_dir = version_store_dir(Path(__file__).parent.parent / 'processed_data', 'default')
+    # A new or removed file changes the directory's mtime and so rebuilds the index
+    count('cache.example_file_index.call')
+    return _example_file_cache(str(data_dir), Path(data_dir).stat().st_mtime)
+
+def example_file_ids(data_dir: Path = None) -> List[str]:
+    """prompt_ids of a directory's per-example files in file name order, the order get_all_examples loads them in."""
+    if data_dir is None:
+        data_dir = version_store_dir(Path(__file__).parent.parent / 'processed_data', 'default')
+    count('cache.example_file_index.call')
+    return list(_example_file_index(str(data_dir), Path(data_dir).stat().st_mtime))
+
+@timed()
+def display_conversation(example: Union[Example, Dict[str, Any]]):
     """Display the conversation in a chat-like interface from the 'prompt' field."""
     st.subheader("Conversation")
-    conversation = example.get('prompt', [])
+    conversation = as_example(example).prompt
     if not conversation:
         st.warning("No conversation found in this example.")
         return
@@ -61,8 +262,8 @@ def display_conversation(example: Dict[str, Any]):
     st.markdown(chat_css, unsafe_allow_html=True)
     st.markdown('<div class="chat-container">', unsafe_allow_html=True)
     for turn in conversation:
-        role = turn.get('role', 'unknown')
-        content = turn.get('content', '')
+        role = turn.role or 'unknown'
+        content = turn.content
         if role.lower() == 'user':
             bubble_class = 'chat-bubble user-bubble'
             role_label = 'User'
@@ -81,14 +282,13 @@ def display_conversation(example: Dict[str, Any]):
         st.markdown(html, unsafe_allow_html=True)
     st.markdown('</div>', unsafe_allow_html=True)
 
-def display_ideal_completion(example: Dict[str, Any]):
+@timed()
+def display_ideal_completion(example: Union[Example, Dict[str, Any]]):
     """Display the ideal completion if it exists."""
-    ideal_completions_data = example.get('ideal_completions_data')
-    if ideal_completions_data and isinstance(ideal_completions_data, dict):
-        ideal_completion = ideal_completions_data.get('ideal_completion')
-        if ideal_completion:
-            st.subheader("Ideal Completion")
-            st.markdown(ideal_completion)
+    ideal_completion = as_example(example).ideal_completion
+    if ideal_completion:
+        st.subheader("Ideal Completion")
+        st.markdown(ideal_completion)
 
 def extract_axis(tags):
     if not isinstance(tags, list):
@@ -113,22 +313,32 @@ def axis_display_name(axis: str) -> str:
         return 'Unspecified'
     return axis.replace('_', ' ').capitalize()
 
-def display_rubric_criteria(example: Dict[str, Any], sort_by: str = "axis", show_details: bool = True, show_positive: bool = True, show_negative: bool = True):
-    """Display and sort rubric criteria from the 'rubrics' field."""
+@timed()
+def example_criterion_counts(store: ExampleStore, example: Union[Example, Dict[str, Any]]) -> Dict[str, int]:
+    """Number of examples in the store using each criterion of `example`, keyed by criterion id."""
+    return store.criterion_counts([criterion_id(r.criterion) for r in as_example(example).rubrics])
+
+@timed()
+def display_rubric_criteria(example: Union[Example, Dict[str, Any]], sort_by: str = "axis", show_details: bool = True, show_positive: bool = True, show_negative: bool = True,
+                            criterion_counts: Dict[str, int] = None, link_dataset: str = None):
+    """
+    Display and sort rubric criteria from the 'rubrics' field.
+
+    With `criterion_counts` (see example_criterion_counts), criteria used by more than one
+    example get a link that opens all of them in the Data Explorer of `link_dataset`.
+    """
     st.subheader("Rubric Criteria")
-    rubrics = example.get('rubrics', [])
+    # Only the rubrics are needed, so a dict (e.g. a penalty CSV row) need not be a full raw example
+    rubrics = example.rubrics if isinstance(example, Example) else as_rubrics(example.get('rubrics', []))
     if not rubrics:
         st.warning("No rubric criteria found in this example.")
         return
-    df = pd.DataFrame([
-        {
-            'criterion': r.get('criterion', ''),
-            'points': r.get('points', 0),
-            'axis': extract_axis(r.get('tags', [])),
-            'tags': r.get('tags', []),
-        }
-        for r in rubrics
-    ])
+    df = pd.DataFrame({
+        'criterion': [r.criterion for r in rubrics],
+        'points': [r.points for r in rubrics],
+        'axis': [r.axis for r in rubrics],
+        'tags': [r.tags for r in rubrics],
+    })
     
     # Filter rubrics based on show_positive and show_negative
     if not show_positive:
@@ -139,12 +349,20 @@ def display_rubric_criteria(example: Dict[str, Any], sort_by: str = "axis", show
     if df.empty:
         st.info("No rubrics to display with the current filter settings.")
         return
+    record_objects('rubrics_rendered', len(df))
         
     def colored_header(criterion, points):
         badge_color = get_points_badge_color(points)
+        link = ''
+        if criterion_counts:
+            cid = criterion_id(criterion)
+            n_examples = criterion_counts.get(cid, 0)
+            if n_examples > 1:
+                link = f'<a href="?dataset={link_dataset or ""}&criterion_id={cid}" target="_self" style="color:#3b82f6;font-size:0.9rem;white-space:nowrap;">Show all {n_examples} examples</a>'
         html = f'''
         <div style="display:flex;align-items:center;gap:1rem;background:#18181b;padding:0.7rem 1.2rem;border-radius:0.7rem;margin-bottom:0.2rem;">
             <span style="flex:1;font-weight:600;font-size:1.1rem;color:#fff;">{criterion}</span>
+            {link}
             <span style="background:{badge_color};color:#18181b;padding:0.3rem 0.9rem;border-radius:1.2rem;font-weight:700;font-size:1.05rem;box-shadow:0 1px 4px rgba(0,0,0,0.10);min-width:60px;text-align:center;">{points} pts</span>
         </div>
         '''
@@ -168,41 +386,12 @@ def display_rubric_criteria(example: Dict[str, Any], sort_by: str = "axis", show
                     st.markdown(f"**Axis:** {row['axis']}")
                     st.markdown(f"**Tags:** {', '.join(row['tags'])}")
 
-def calculate_points_metrics(rubrics: List[Dict[str, Any]]) -> Dict[str, Any]:
+@timed()
+def calculate_points_metrics(rubrics: List[Union[Rubric, Dict[str, Any]]]) -> Dict[str, Any]:
     """Calculate points metrics from rubrics."""
-    if not rubrics:
-        return {
-            'total_actual': 0,
-            'max_possible_score': 0,
-            'max_possible_penalty': 0,
-            'by_axis': {}
-        }
-    df = pd.DataFrame([
-        {
-            'criterion': r.get('criterion', ''),
-            'points': r.get('points', 0),
-            'axis': extract_axis(r.get('tags', [])),
-        }
-        for r in rubrics
-    ])
-    total_actual = df['points'].sum()
-    max_possible_score = df[df['points'] > 0]['points'].sum()
-    max_possible_penalty = df[df['points'] < 0]['points'].abs().sum()
-    by_axis = {}
-    for axis, group in df.groupby('axis'):
-        axis_score = group[group['points'] > 0]['points'].sum()
-        axis_penalty = group[group['points'] < 0]['points'].abs().sum()
-        by_axis[axis] = {
-            'max_score': axis_score,
-            'max_penalty': axis_penalty
-        }
-    return {
-        'total_actual': total_actual,
-        'max_possible_score': max_possible_score,
-        'max_possible_penalty': max_possible_penalty,
-        'by_axis': by_axis
-    }
+    return points_metrics(as_rubrics(rubrics))
 
+@timed()
 def display_points_metrics(metrics: Dict[str, Any]):
     """Display points metrics in a visually appealing way."""
     st.subheader("Points Analysis")
@@ -257,58 +446,60 @@ def format_conversation(prompt):
     # prompt is a list of dicts with 'role' and 'content'
     return " | ".join(f'{turn["role"].capitalize()}: "{turn["content"]}"' for turn in prompt)
 
-def jsonl_to_dataframe(jsonl_path, max_rows=None):
-    import pandas as pd
-    import json
-    rows = []
-    with open(jsonl_path, "r") as f:
-        for i, line in enumerate(f):
-            if max_rows and i >= max_rows:
-                break
-            data = json.loads(line)
-            prompt_id = data.get("prompt_id")
-            tags = data.get("example_tags", [])
-            theme, physician_agreed_category = parse_tags(tags)
-            example = format_conversation(data.get("prompt", []))
-            rows.append({
-                "prompt_id": prompt_id,
-                "theme": theme,
-                "physician_agreed_category": physician_agreed_category,
-                "example": example
-            })
-    return pd.DataFrame(rows)
+CSV_COLUMNS = {
+    "prompt_id": (lambda data: data.get("prompt_id"), None),
+    "theme": (lambda data: parse_tags(data.get("example_tags", []))[0], None),
+    "physician_agreed_category": (lambda data: parse_tags(data.get("example_tags", []))[1], None),
+    "example": (lambda data: format_conversation(data.get("prompt", [])), None),
+}
+
+@timed()
+def jsonl_to_dataframe(jsonl_path, max_rows=None, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """Build the per-example CSV DataFrame. Whole files are parsed in parallel shards, prefixes in batches."""
+    if max_rows:
+        batches = iter_column_batches(jsonl_path, CSV_COLUMNS, batch_size=batch_size, max_rows=max_rows)
+    else:
+        batches = iter_column_batches_parallel(jsonl_path, CSV_COLUMNS, workers=workers)
+    return pd.DataFrame(concat_column_batches(batches, CSV_COLUMNS))
+
+def jsonl_to_csv(jsonl_path, csv_path, max_rows=None, batch_size=DEFAULT_BATCH_SIZE, workers=None) -> int:
+    """Stream the per-example CSV to disk one batch (or parallel shard) at a time. Returns the number of rows written."""
+    if max_rows:
+        batches = iter_column_batches(jsonl_path, CSV_COLUMNS, batch_size=batch_size, max_rows=max_rows)
+    else:
+        batches = iter_column_batches_parallel(jsonl_path, CSV_COLUMNS, workers=workers)
+    rows_written = 0
+    for batch in batches:
+        pd.DataFrame(batch, columns=list(CSV_COLUMNS)).to_csv(csv_path, mode='w' if rows_written == 0 else 'a', header=rows_written == 0, index=False)
+        rows_written += len(batch["prompt_id"])
+    if rows_written == 0:
+        pd.DataFrame(columns=list(CSV_COLUMNS)).to_csv(csv_path, index=False)
+    return rows_written
 
-def create_examples_dataframe(examples: List[Dict[str, Any]]) -> pd.DataFrame:
+@timed()
+def create_examples_dataframe(examples: List[Union[Example, Dict[str, Any]]]) -> pd.DataFrame:
     """Create a DataFrame from the examples."""
     rows = []
     for i, example in enumerate(examples):
-        # Extract basic information
-        prompt_id = example.get('prompt_id', f'example_{i+1}')
-        tags = example.get('example_tags', [])
-        theme = next((tag[6:] for tag in tags if tag.startswith('theme:')), '')
-        physician_category = next((tag[len('physician_agreed_category:'):] for tag in tags if tag.startswith('physician_agreed_category:')), '')
+        example = as_example(example)
+        prompt_id = example.prompt_id or f'example_{i+1}'
         
         # Extract conversation
-        conversation_full = format_conversation(example.get('prompt', []))
+        conversation_full = " | ".join(f'{turn.role.capitalize()}: "{turn.content}"' for turn in example.prompt)
         conversation_preview = conversation_full[:500] + ("..." if len(conversation_full) > 500 else "")
         
-        # Extract ideal completion with proper null checks
-        ideal_completions_data = example.get('ideal_completions_data')
-        ideal_completion_full = ''
-        if ideal_completions_data and isinstance(ideal_completions_data, dict):
-            ideal_completion_full = ideal_completions_data.get('ideal_completion', '')
+        ideal_completion_full = example.ideal_completion
         ideal_completion_preview = ideal_completion_full[:500] + ("..." if len(ideal_completion_full) > 500 else "")
         
         # Extract rubric information
-        rubrics = example.get('rubrics', [])
-        total_points = sum(r.get('points', 0) for r in rubrics)
-        axes = [extract_axis(r.get('tags', [])) for r in rubrics]
-        unique_axes = list(set(axes))
+        rubrics = example.rubrics
+        total_points = sum(r.points for r in rubrics)
+        unique_axes = list(set(r.axis for r in rubrics))
         
         rows.append({
             'ID': prompt_id,
-            'Theme': theme,
-            'Physician Category': physician_category,
+            'Theme': example.theme,
+            'Physician Category': example.physician_category,
             'Conversation Preview': conversation_preview,
             'Conversation Full': conversation_full,
             'Ideal Completion Preview': ideal_completion_preview,
@@ -318,4 +509,48 @@ def create_examples_dataframe(examples: List[Dict[str, Any]]) -> pd.DataFrame:
             'Number of Criteria': len(rubrics)
         })
     
-    return pd.DataFrame(rows) 
\ No newline at end of file
+    record_objects('dataframe_rows', len(rows))
+    return pd.DataFrame(rows)
+
+def performance_panel(page: str):
+    """
+    Opt-in sidebar "Performance" panel; call it at the top of a page.
+
+    While it is switched on, each rerun of the page is recorded (see
+    instrumentation.py) and the panel shows stage timings, cache hit rates and
+    object counts of recent reruns, with a Chrome trace export. Reruns are
+    kept per browser session. Every page calls this and
+    instrumentation.end_rerun() at its end; a rerun cut short by st.stop,
+    st.rerun or an exception is closed here on the session's next rerun, timed
+    up to its last stage.
+    """
+    previous = st.session_state.get('performance_rerun')
+    if previous is not None:
+        end_rerun(previous, at_last_activity=True)
+        st.session_state.performance_rerun = None
+    st.sidebar.markdown("---")
+    if not st.sidebar.checkbox("Performance panel", key="performance_enabled", help="Time each rerun of this page"):
+        return
+    ring = st.session_state.setdefault('performance_reruns', deque(maxlen=RING_SIZE))
+    st.session_state.performance_rerun = begin_rerun(page, ring)
+    reruns = recent_reruns(ring)[::-1]
+    with st.sidebar.expander("Performance", expanded=True):
+        if not reruns:
+            st.caption("Timings appear from the next rerun on.")
+            return
+        st.dataframe(pd.DataFrame([
+            {'Page': r.page, 'Total (ms)': round(r.duration * 1000), 'Top stage': (r.stage_totals() or [{'stage': ''}])[0]['stage']}
+            for r in reruns
+        ]), use_container_width=True, hide_index=True)
+        index = st.selectbox("Rerun", range(len(reruns)), format_func=lambda i: f"{reruns[i].page} ({reruns[i].duration * 1000:.0f} ms)", key="performance_rerun_index")
+        rerun = reruns[index]
+        st.markdown("**Stages**")
+        st.dataframe(pd.DataFrame(rerun.stage_totals()).round({'total_ms': 1}), use_container_width=True, hide_index=True)
+        if rerun.cache_stats():
+            st.markdown("**Caches**")
+            st.dataframe(pd.DataFrame(rerun.cache_stats()), use_container_width=True, hide_index=True)
+        counts = {**{k: v for k, v in rerun.counters.items() if not k.startswith('cache.')}, **rerun.objects}
+        if counts:
+            st.markdown("**Objects**")
+            st.dataframe(pd.DataFrame({'Name': list(counts), 'Count': list(counts.values())}), use_container_width=True, hide_index=True)
+        st.download_button("Export Chrome trace", chrome_trace(recent_reruns(ring)), file_name="healthbench_trace.json", mime="application/json")
@@ -5,11 +5,12 @@ Provides an interactive interface to view conversations and rubric criteria.
 """
 
 import streamlit as st
-import json
 from pathlib import Path
 import pandas as pd
 from typing import Dict, List, Any
 import plotly.express as px
+from data_versions import version_store_dir
+from utils import example_file_cache, example_file_ids
 
 # Custom CSS for better presentation
 st.set_page_config(
@@ -53,18 +54,9 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-def load_json_file(file_path: Path) -> Dict[str, Any]:
-    """Load a single JSON file."""
-    with open(file_path, 'r') as f:
-        return json.load(f)
-
-def get_all_examples() -> List[Dict[str, Any]]:
-    """Load all example JSON files from the processed_data directory."""
-    data_dir = Path(__file__).parent.parent / 'processed_data'
-    examples = []
-    for json_file in sorted(data_dir.glob('*_example_*.json')):
-        examples.append(load_json_file(json_file))
-    return examples
+def examples_dir() -> Path:
+    """Directory of the per-example JSON files of the current default dataset version."""
+    return version_store_dir(Path(__file__).parent.parent / 'processed_data', 'default')
 
 def display_conversation(example: Dict[str, Any]):
     """Display the conversation in a chat-like interface from the 'prompt' field."""
@@ -356,10 +348,11 @@ def main():
     else:  # Data Explorer
         st.title("Data Explorer")
         
-        # Get all examples
-        examples = get_all_examples()
-        if not examples:
-            st.error("No examples found in the processed_data directory.")
+        # Only the prompt_id -> file index is held; examples are read when selected, through a byte-bounded cache
+        data_dir = examples_dir()
+        example_ids = example_file_ids(data_dir) if data_dir.is_dir() else []
+        if not example_ids:
+            st.error("No examples found for the current default dataset version in processed_data.")
             return
         
         # Move all options to sidebar
@@ -367,7 +360,7 @@ def main():
         st.sidebar.subheader("Data Explorer Options")
         
         # Example selector in sidebar
-        example_names = [f"Example {i+1}" for i in range(len(examples))]
+        example_names = [f"Example {i+1}" for i in range(len(example_ids))]
         selected_example = st.sidebar.selectbox(
             "Select an example:",
             example_names,
@@ -392,7 +385,7 @@ def main():
         
         # Get the selected example
         example_index = int(selected_example.split()[1]) - 1
-        example = examples[example_index]
+        example = example_file_cache(data_dir).get(example_ids[example_index]).to_dict()
         
         # Main content area
         # Display conversation